@@ -1,79 +1,186 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from app.db.base import get_db
 from app.models.nutrition_model import (
     NutritionRequest,
+    BatchNutritionRequest,
     ProfileRequest,
     CalorieRequest,
     CalorieResponse,
+    DietPlanRequest,
+    MAKRO_HEDEFLERI,
     NutritionProfile,
-    calculate_bke,
-    mifflin_st_jeor,
-    harris_benedict,
     ideal_weight,
     daily_calorie_requirements,
     meal_distribution,
     calculate_macros,
-    model_yukle,
-    veri_yukle,
-    diyet_oner,
-    hazir_profil_degerlerini_al
+    goal_from_text,
+    calorie_responses_array,
+    ClientCalorieResponse,
+    hazir_profil_degerlerini_al,
+    etkin_filtre,
+    ModelVersionRequest,
+    SimilarRecipesRequest,
+    TrafficSplitRequest,
+    izinli_model_yolu,
+    izinli_veri_yolu,
+    nutrition_models
 )
-from app.core.security import get_current_active_user
+from app.core.security import get_current_active_user, get_current_admin, get_token_payload_optional
+from app.services.recommendation_batcher import recommendation_batcher
+from app.services.inference_pool import inference_pool
+from app.services.recommendation_cache import recommendation_cache
+from app.services.ai_output_writer import ai_output_writer
+from app.services.calorie_cache import calorie_cache
+from app.services.user_analytics import kullanici_analizi
+from app.services.diet_plan import plan_cozucusu
+from app.services.similar_recipes import similar_recipes
+from app.models.recipe_filter import satir_kayitlari
+from app.core.exceptions import ServiceUnavailableException
+from app.core.config import settings
 from app.models.user import User
-import os
-import pandas as pd
-import joblib
+from app.models.dietitian import Dietitian
+from app.models.appointment import Appointment
+import json
+import numpy as np
 
 router = APIRouter()
 
+FIELDS_QUERY = Query(None, description="Yanıtta döndürülecek sütunlar, virgülle ayrılmış (örn. Name,Calories,ProteinContent)")
+
+def model_version_header(artifacts) -> Dict[str, str]:
+    """A/B karşılaştırması için yanıtı üreten model sürümünü başlıkta bildirir"""
+    return {"X-Model-Version": artifacts.version}
+
+def record_output(token_payload: Optional[dict], artifacts, kind: str, indices, **details):
+    """Verilen öneriyi AIModelOutput tablosuna yazılmak üzere kuyruğa ekler (istek beklemez)"""
+    if not ai_output_writer.etkin:
+        return
+    email = token_payload.get("sub") if token_payload and token_payload.get("type") == "user" else None
+    ai_output_writer.ekle(email, {
+        "type": kind,
+        "model_version": artifacts.version,
+        **details,
+        "recipe_ids": artifacts.tarif_kimlikleri(indices)
+    })
+
+def resolve_fields(artifacts, fields: Optional[str]) -> Optional[List[int]]:
+    """fields parametresini sütun konumlarına çevirir; bilinmeyen sütunlar için 400 döndürür"""
+    try:
+        return artifacts.sutun_konumlari_coz(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.post("/recommend", response_model=List[Dict[str, Any]])
-def recommend_nutrition(request: NutritionRequest):
+async def recommend_nutrition(request: NutritionRequest, fields: Optional[str] = FIELDS_QUERY,
+                              token_payload: Optional[dict] = Depends(get_token_payload_optional)):
     """Besin değerlerine göre diyet önerisi yapar"""
     try:
-        # Model yükleme
-        model = model_yukle()
-        if model is None:
-            raise HTTPException(status_code=500, detail="Model yüklenemedi")
-        
-        # Veri yükleme
-        data = veri_yukle()
-        if data is None:
-            raise HTTPException(status_code=500, detail="Veri seti yüklenemedi")
-        
-        # Diyet önerisi için girdi değerlerini al
-        input_values = [
-            request.kalori,
-            request.yag,
-            request.doymus_yag,
-            request.kolesterol,
-            request.sodyum,
-            request.karbonhidrat,
-            request.lif,
-            request.seker,
-            request.protein
-        ]
-        
-        # Diyet önerisi yap
-        recommendations = diyet_oner(
-            model=model,
-            veri=data,
-            girdi_degerleri=input_values,
-            n_neighbors=request.n_recommendations
-        )
+        # Süreç genelinde yüklenmiş model ve veri setini al (yeniden yükleme olay döngüsünü bloklamasın)
+        artifacts = await run_in_threadpool(nutrition_models.get)
+        if artifacts is None:
+            raise HTTPException(status_code=500, detail="Model veya veri seti yüklenemedi")
+        columns = resolve_fields(artifacts, fields)
+        
+        query_filter = etkin_filtre(request.filters)
+        input_values = request.girdi_degerleri()
+        neighbour_indices = None
         
-        if recommendations is None or len(recommendations) == 0:
+        # Yuvarlanmış girdi önbellekteyse ölçekleme ve komşu araması atlanır
+        if recommendation_cache.etkin:
+            input_values = recommendation_cache.yuvarla(input_values)
+            cache_key = recommendation_cache.anahtar(
+                artifacts.version,
+                input_values,
+                request.n_recommendations,
+                query_filter.anahtar() if query_filter else None
+            )
+            neighbour_indices = recommendation_cache.al(cache_key)
+        
+        if neighbour_indices is None:
+            # Aynı anda gelen isteklerle birlikte tek matris sorgusunda komşuları bul
+            neighbour_indices = await recommendation_batcher.komsular(
+                artifacts,
+                list(input_values),
+                request.n_recommendations,
+                query_filter
+            )
+            if recommendation_cache.etkin:
+                recommendation_cache.koy(cache_key, neighbour_indices)
+        
+        if len(neighbour_indices) == 0:
             raise HTTPException(status_code=404, detail="Uygun öneri bulunamadı")
         
-        # Veriyi JSON formatına dönüştür
-        result = recommendations.to_dict(orient="records")
-        return result
+        record_output(
+            token_payload, artifacts, "recommend", neighbour_indices,
+            input=list(input_values), n_recommendations=request.n_recommendations,
+            filters=query_filter.model_dump(mode="json", exclude_defaults=True) if query_filter else None
+        )
+        
+        # Seçilen satırların önceden serileştirilmiş JSON'larını doğrudan döndür
+        return Response(content=artifacts.oneri_json(neighbour_indices, columns), media_type="application/json", headers=model_version_header(artifacts))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Diyet önerisi oluşturma hatası: {str(e)}")
 
+@router.post("/recommend/batch", response_model=List[List[Dict[str, Any]]])
+async def recommend_nutrition_batch(request: BatchNutritionRequest, fields: Optional[str] = FIELDS_QUERY,
+                                    token_payload: Optional[dict] = Depends(get_token_payload_optional)):
+    """Birden çok besin değeri vektörü için tek çağrıda diyet önerisi yapar"""
+    try:
+        # Süreç genelinde yüklenmiş model ve veri setini al
+        artifacts = await run_in_threadpool(nutrition_models.get)
+        if artifacts is None:
+            raise HTTPException(status_code=500, detail="Model veya veri seti yüklenemedi")
+        columns = resolve_fields(artifacts, fields)
+        
+        # Aynı filtreyi paylaşan sorgular tek bir matris olarak çıkarım havuzunda işlenir
+        groups: Dict[Optional[str], List[int]] = {}
+        for i, item in enumerate(request.items):
+            item_filter = etkin_filtre(item.filters)
+            groups.setdefault(item_filter.anahtar() if item_filter else None, []).append(i)
+        
+        neighbour_indices = [None] * len(request.items)
+        inference_pool.rezerve(len(request.items))
+        try:
+            for positions in groups.values():
+                items = [request.items[i] for i in positions]
+                group_indices = await inference_pool.komsu_indeksleri(
+                    artifacts,
+                    [item.girdi_degerleri() for item in items],
+                    max(item.n_recommendations for item in items),
+                    etkin_filtre(items[0].filters)
+                )
+                for i, row in zip(positions, group_indices):
+                    neighbour_indices[i] = row
+        finally:
+            inference_pool.birak(len(request.items))
+        
+        for row, item in zip(neighbour_indices, request.items):
+            item_filter = etkin_filtre(item.filters)
+            record_output(
+                token_payload, artifacts, "recommend_batch", row[:item.n_recommendations],
+                input=item.girdi_degerleri(), n_recommendations=item.n_recommendations,
+                filters=item_filter.model_dump(mode="json", exclude_defaults=True) if item_filter else None
+            )
+        
+        # Her sorgunun sonucunu kendi öneri sayısına kesip önceden serileştirilmiş JSON'larla birleştir
+        content = b"[" + b",".join(
+            artifacts.oneri_json(row[:item.n_recommendations], columns)
+            for row, item in zip(neighbour_indices, request.items)
+        ) + b"]"
+        return Response(content=content, media_type="application/json", headers=model_version_header(artifacts))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Toplu diyet önerisi oluşturma hatası: {str(e)}")
+
 @router.post("/recommend-by-profile", response_model=List[Dict[str, Any]])
-def recommend_by_profile(request: ProfileRequest):
+async def recommend_by_profile(request: ProfileRequest, fields: Optional[str] = FIELDS_QUERY,
+                               token_payload: Optional[dict] = Depends(get_token_payload_optional)):
     """Hazır profillere göre diyet önerisi yapar"""
     try:
         # Profil değerlerini al
@@ -81,39 +188,231 @@ def recommend_by_profile(request: ProfileRequest):
         if profile_values is None:
             raise HTTPException(status_code=400, detail="Geçersiz profil tipi")
         
-        # Model yükleme
-        model = model_yukle()
-        if model is None:
-            raise HTTPException(status_code=500, detail="Model yüklenemedi")
-        
-        # Veri yükleme
-        data = veri_yukle()
-        if data is None:
-            raise HTTPException(status_code=500, detail="Veri seti yüklenemedi")
-        
-        # Diyet önerisi yap
-        recommendations = diyet_oner(
-            model=model,
-            veri=data,
-            girdi_degerleri=profile_values,
-            n_neighbors=request.n_recommendations
-        )
+        # Süreç genelinde yüklenmiş model ve veri setini al
+        artifacts = await run_in_threadpool(nutrition_models.get)
+        if artifacts is None:
+            raise HTTPException(status_code=500, detail="Model veya veri seti yüklenemedi")
+        columns = resolve_fields(artifacts, fields)
+        
+        # Filtre yoksa ve yükleme sırasında hesaplanmış tablo yeterliyse doğrudan döndür
+        profile_filter = etkin_filtre(request.filters)
+        if profile_filter is None and request.n_recommendations > 0:
+            profile_json = artifacts.profil_onerileri(request.profile, request.n_recommendations, columns)
+            if profile_json is not None:
+                record_output(
+                    token_payload, artifacts, "recommend_by_profile",
+                    artifacts.profil_komsulari[request.profile][:request.n_recommendations],
+                    profile=request.profile.value, n_recommendations=request.n_recommendations
+                )
+                return Response(content=profile_json, media_type="application/json", headers=model_version_header(artifacts))
+        
+        # Tablo yetmiyorsa komşu aramasını çıkarım havuzunda yap
+        inference_pool.rezerve()
+        try:
+            neighbour_indices = await inference_pool.komsu_indeksleri(
+                artifacts,
+                [profile_values],
+                request.n_recommendations,
+                profile_filter
+            )
+        finally:
+            inference_pool.birak()
         
-        if recommendations is None or len(recommendations) == 0:
+        if len(neighbour_indices[0]) == 0:
             raise HTTPException(status_code=404, detail="Uygun öneri bulunamadı")
         
-        # Veriyi JSON formatına dönüştür
-        result = recommendations.to_dict(orient="records")
-        return result
+        record_output(
+            token_payload, artifacts, "recommend_by_profile", neighbour_indices[0],
+            profile=request.profile.value, n_recommendations=request.n_recommendations,
+            filters=profile_filter.model_dump(mode="json", exclude_defaults=True) if profile_filter else None
+        )
+        
+        # Seçilen satırların önceden serileştirilmiş JSON'larını doğrudan döndür
+        return Response(content=artifacts.oneri_json(neighbour_indices[0], columns), media_type="application/json", headers=model_version_header(artifacts))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Diyet önerisi oluşturma hatası: {str(e)}")
 
+@router.get("/model-info")
+def get_model_info(current_admin = Depends(get_current_admin)):
+    """Şu an hizmet veren sürümleri (etkin sürüm, trafik dağılımı) ve yüklenme bilgilerini döndürür (dosya yolları ve bellek bilgisi içerdiğinden yalnızca yöneticiler)"""
+    return nutrition_models.bilgi()
+
+@router.get("/models")
+def list_model_versions(current_admin = Depends(get_current_admin)):
+    """Yüklü model sürümlerini, etkin sürümü ve trafik dağılımını döndürür"""
+    return nutrition_models.bilgi()
+
+@router.post("/models", status_code=status.HTTP_202_ACCEPTED)
+def load_model_version(request: ModelVersionRequest, current_admin = Depends(get_current_admin)):
+    """Yeni bir model sürümünü arka planda yükler"""
+    # Yalnızca yapılandırılmış dizinlerdeki dosyalar yüklenir (model dosyası pickle'dır, yüklenmesi kod çalıştırır)
+    model_path = izinli_model_yolu(request.model_path)
+    if model_path is None:
+        raise HTTPException(status_code=400, detail="Model dosyası model dizininde bulunamadı")
+    data_path = None
+    if request.data_path is not None:
+        data_path = izinli_veri_yolu(request.data_path)
+        if data_path is None:
+            raise HTTPException(status_code=400, detail="Veri dosyası veri dizininde bulunamadı")
+    try:
+        nutrition_models.surum_yukle(request.name, model_path, data_path)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"name": request.name, "state": "loading"}
+
+@router.post("/models/{name}/activate")
+def activate_model_version(name: str, current_admin = Depends(get_current_admin)):
+    """Hazır bir model sürümünü etkin sürüm yapar"""
+    try:
+        nutrition_models.aktif_yap(name)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return nutrition_models.bilgi()
+
+@router.put("/models/traffic")
+def set_model_traffic_split(request: TrafficSplitRequest, current_admin = Depends(get_current_admin)):
+    """Sürümlere yüzde olarak trafik ayırır; kalan trafik etkin sürüme gider"""
+    try:
+        nutrition_models.trafik_dagilimi_ayarla(request.weights)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return nutrition_models.bilgi()
+
+@router.delete("/models/{name}", status_code=status.HTTP_204_NO_CONTENT)
+def unload_model_version(name: str, current_admin = Depends(get_current_admin)):
+    """Kullanılmayan bir model sürümünü bellekten bırakır"""
+    try:
+        nutrition_models.surum_kaldir(name)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Model sürümü bulunamadı")
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@router.get("/batching-stats")
+def get_batching_stats(current_admin = Depends(get_current_admin)):
+    """/recommend mikro-partileme ve çıkarım havuzu metriklerini döndürür"""
+    return {
+        **recommendation_batcher.istatistikler(),
+        "inference_pool": inference_pool.istatistikler(),
+        "output_writer": ai_output_writer.istatistikler()
+    }
+
+@router.get("/cache-stats")
+def get_cache_stats(current_admin = Depends(get_current_admin)):
+    """/recommend öneri önbelleğinin isabet/ıska metriklerini döndürür"""
+    return recommendation_cache.istatistikler()
+
+def similar_recipes_json(artifacts, indices, scores, fields: Optional[str]) -> bytes:
+    """Benzer tarif satırlarını skorlarıyla birlikte JSON dizisine çevirir"""
+    columns = list(artifacts.sutun_konumlari)
+    positions = resolve_fields(artifacts, fields)
+    if positions is not None:
+        columns = [columns[i] for i in positions]
+    records = satir_kayitlari(artifacts.veri, indices, columns)
+    for record, score in zip(records, np.round(np.asarray(scores, dtype=float), 4).tolist()):
+        record["similarity"] = score
+    return json.dumps(records, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+async def similarity_index(artifacts):
+    """Sunulan veri setinin TF-IDF indeksini döndürür; hazır değilse 503 (istek yolunda oluşturulmaz)"""
+    index = await run_in_threadpool(similar_recipes.indeks, artifacts)
+    if index is None:
+        raise ServiceUnavailableException(detail="Tarif benzerlik indeksi hazır değil", retry_after=30)
+    return index
+
+@router.get("/similar-recipes/{recipe_index}", response_model=Dict[str, Any])
+async def similar_recipes_for_one(
+    recipe_index: int,
+    n: int = Query(5, ge=1, le=50, description="Döndürülecek benzer tarif sayısı"),
+    fields: Optional[str] = FIELDS_QUERY
+):
+    """Malzemeleri verilen tarife en çok benzeyen tarifleri döndürür (TF-IDF kosinüs benzerliği)"""
+    try:
+        # Satır numaraları /recommend ile aynı veri setine göredir
+        artifacts = await run_in_threadpool(nutrition_models.get)
+        if artifacts is None:
+            raise ServiceUnavailableException(detail="Model veya veri seti yüklenemedi", retry_after=30)
+        index = await similarity_index(artifacts)
+        if not 0 <= recipe_index < len(index):
+            raise HTTPException(status_code=404, detail="Tarif bulunamadı")
+        
+        # Komşu tablosu yoksa yalnızca tek satırın katalogla seyrek çarpımı (sınırlı çıkarım havuzunda)
+        inference_pool.rezerve()
+        try:
+            indices, scores = await inference_pool.benzer_tarifler(artifacts.veri_yolu, index, [recipe_index], n)
+        finally:
+            inference_pool.birak()
+        content = (
+            f'{{"recipe_index":{recipe_index},"recipes":'.encode()
+            + similar_recipes_json(artifacts, indices, scores, fields)
+            + b"}"
+        )
+        return Response(content=content, media_type="application/json", headers=model_version_header(artifacts))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Benzer tarif hatası: {str(e)}")
+
+@router.post("/similar-recipes", response_model=Dict[str, Any])
+async def similar_recipes_for_many(request: SimilarRecipesRequest, fields: Optional[str] = FIELDS_QUERY):
+    """Verilen tariflerin tümüne (örn. favoriler) birlikte benzeyen tarifleri döndürür"""
+    try:
+        artifacts = await run_in_threadpool(nutrition_models.get)
+        if artifacts is None:
+            raise ServiceUnavailableException(detail="Model veya veri seti yüklenemedi", retry_after=30)
+        index = await similarity_index(artifacts)
+        invalid = [i for i in request.recipe_indices if not 0 <= i < len(index)]
+        if invalid:
+            raise HTTPException(status_code=404, detail=f"Tarif bulunamadı: {', '.join(map(str, invalid[:10]))}")
+        
+        # Tüm tohumlar için tek seyrek çarpım, birleştirme ve kısmi seçim (sınırlı çıkarım havuzunda)
+        inference_pool.rezerve()
+        try:
+            indices, scores = await inference_pool.benzer_tarifler(
+                artifacts.veri_yolu,
+                index,
+                request.recipe_indices,
+                request.n_recommendations,
+                request.aggregation.value
+            )
+        finally:
+            inference_pool.birak()
+        content = (
+            f'{{"aggregation":"{request.aggregation.value}","recipes":'.encode()
+            + similar_recipes_json(artifacts, indices, scores, fields)
+            + b"}"
+        )
+        return Response(content=content, media_type="application/json", headers=model_version_header(artifacts))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Benzer tarif hatası: {str(e)}")
+
+@router.get("/analytics/users")
+def get_user_analytics(
+    chunk_size: int = Query(None, ge=100, le=100000, description="Veritabanından bir seferde okunan kullanıcı sayısı"),
+    db: Session = Depends(get_db),
+    current_admin = Depends(get_current_admin)
+):
+    """Tüm kullanıcılar için BKİ, bazal metabolizma, kalori, makro ve hedef dağılımlarını döndürür"""
+    try:
+        return kullanici_analizi(db, parca_boyutu=chunk_size or settings.ANALYTICS_CHUNK_SIZE)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Kullanıcı analizi hatası: {str(e)}")
+
 @router.get("/calculate-calories", response_model=CalorieResponse)
 def calculate_daily_calories(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Giriş yapmış kullanıcının profil bilgilerine göre günlük kalori ihtiyacını hesaplar"""
+    # Profil değişmediyse önceden serileştirilmiş yanıtı doğrudan döndür
+    cached = calorie_cache.al(current_user.user_id, current_user.updated_at) if isinstance(current_user, User) else None
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+    
     try:
         # Kullanıcı bilgilerini kontrol et
         if not current_user.weight or not current_user.height or not current_user.age or not current_user.gender or not current_user.activity_level:
@@ -138,12 +437,7 @@ def calculate_daily_calories(
         ideal_weight_value = ideal_weight(current_user.height, current_user.gender.lower())
         
         # Makro besinleri hesapla - kullanıcının hedefine göre belirle
-        goal = "maintenance"
-        if current_user.goal:
-            if "kas" in current_user.goal.lower() or "muscle" in current_user.goal.lower():
-                goal = "muscle_building"
-            elif "kilo verme" in current_user.goal.lower() or "weight loss" in current_user.goal.lower():
-                goal = "weight_loss"
+        goal = goal_from_text(current_user.goal)
         
         macros = calculate_macros(total_calories, current_user.weight, goal)
         
@@ -158,7 +452,10 @@ def calculate_daily_calories(
             "fat_need": round(macros["fat_g"], 2)
         }
         
-        return response
+        body = CalorieResponse(**response).model_dump_json().encode()
+        if isinstance(current_user, User):
+            calorie_cache.koy(current_user.user_id, current_user.updated_at, body)
+        return Response(content=body, media_type="application/json")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Kalori hesaplama hatası: {str(e)}")
         
@@ -198,4 +495,86 @@ def calculate_daily_calories_by_request(request: CalorieRequest):
         
         return response
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Kalori hesaplama hatası: {str(e)}") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Kalori hesaplama hatası: {str(e)}")
+
+# Kalori hesabında kullanılan profil alanları
+CALORIE_PROFILE_FIELDS = ("weight", "height", "age", "gender", "activity_level")
+
+@router.get("/calculate-calories/clients", response_model=List[ClientCalorieResponse])
+def calculate_client_calories(
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_user)
+):
+    """Diyetisyenin tüm danışanlarının günlük kalori ve makro ihtiyaçlarını tek seferde hesaplar"""
+    if not isinstance(current_user, Dietitian):
+        raise HTTPException(status_code=403, detail="Bu işlem yalnızca diyetisyenler içindir")
+    
+    # Yalnızca gerekli sütunları çek; randevusu olan her danışan bir kez
+    clients = db.query(
+        User.user_id, User.name, User.weight, User.height, User.age,
+        User.gender, User.activity_level, User.goal
+    ).join(
+        Appointment, Appointment.user_id == User.user_id
+    ).filter(
+        Appointment.dietitian_id == current_user.dietitian_id
+    ).distinct().order_by(User.user_id).all()
+    
+    results = []
+    complete = []
+    for client in clients:
+        missing = [field for field in CALORIE_PROFILE_FIELDS if not getattr(client, field)]
+        results.append({"user_id": client.user_id, "name": client.name, "calories": None, "missing_fields": missing})
+        if not missing:
+            complete.append(client)
+    
+    if complete:
+        try:
+            # Tüm danışanlar için sütun bazında tek bir vektörel hesaplama
+            calories = calorie_responses_array(
+                weight=[c.weight for c in complete],
+                height=[c.height for c in complete],
+                age=[c.age for c in complete],
+                gender=[c.gender.lower() for c in complete],
+                activity_level=[c.activity_level.lower() for c in complete],
+                goal=[goal_from_text(c.goal) for c in complete]
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Kalori hesaplama hatası: {str(e)}")
+        by_user = {c.user_id: values for c, values in zip(complete, calories)}
+        for result in results:
+            result["calories"] = by_user.get(result["user_id"])
+    
+    return results
+
+@router.post("/diet-plan", response_model=Dict[str, Any])
+async def create_diet_plan(request: DietPlanRequest):
+    """Kalori ve makro hedeflerine en yakın, tarif tekrarı olmayan çok günlük diyet planı oluşturur"""
+    try:
+        total_calories, _ = daily_calorie_requirements(
+            weight=request.weight,
+            height=request.height,
+            age=request.age,
+            gender=request.gender,
+            activity_level=request.activity_level
+        )
+        goal = request.goal if request.goal in MAKRO_HEDEFLERI else goal_from_text(request.goal)
+        macros = calculate_macros(total_calories, request.weight, goal)
+        targets = {"calories": total_calories, **macros}
+        
+        artifacts = await run_in_threadpool(nutrition_models.get)
+        if artifacts is None:
+            raise HTTPException(status_code=500, detail="Model veya veri seti yüklenemedi")
+        # Çözücü ısınmada/sürüm etkinleşirken kurulur; istek yolunda yalnızca aranır
+        solver = plan_cozucusu(artifacts)
+        if solver is None:
+            raise ServiceUnavailableException(detail="Diyet planı çözücüsü hazırlanıyor", retry_after=5)
+        plan = await run_in_threadpool(
+            solver.plan, targets, request.days, request.snacks_per_day,
+            request.seed, settings.DIET_PLAN_BUDGET_MS
+        )
+        plan["goal"] = goal
+        return plan
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Diyet planı oluşturma hatası: {str(e)}")
@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from typing import List
+from math import ceil
 
 from app.db.session import get_db
-from app.schemas.recipe import Recipe
+from app.schemas.recipe import Recipe, RecipeSearchItem, TermSuggestion
+from app.schemas.pagination import PaginatedResponse
 from app.services.recipe_service import get_breakfast_recipes, get_lunch_recipes, get_dinner_recipes
+from app.services.recipe_search import recipe_search
 
 router = APIRouter()
 
@@ -22,3 +25,40 @@ def get_lunch(db: Session = Depends(get_db)):
 def get_dinner(db: Session = Depends(get_db)):
     """Akşam yemeği için tarif önerileri getirir"""
     return get_dinner_recipes()
+
+@router.get("/search", response_model=PaginatedResponse[RecipeSearchItem])
+def search_recipes(
+    q: str = Query(..., min_length=1, max_length=200, description="Aranacak kelimeler; son kelime önek olarak eşleşir"),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    prefix: bool = Query(True, description="Son kelimeyi önek olarak eşleştir (yazarken arama)")
+):
+    """Tarifleri ad, kategori ve anahtar kelimelerinde arar (sayfalı)"""
+    index = recipe_search.indeks()
+    if index is None:
+        raise HTTPException(status_code=503, detail="Tarif veri seti yüklenemedi")
+    
+    rows = index.ara(q, onek=prefix)
+    total = len(rows)
+    pages = ceil(total / page_size) if total > 0 else 0
+    skip = (page - 1) * page_size
+    
+    # Yalnızca istenen sayfanın satırları okunur
+    return {
+        "items": index.satirlar(rows[skip:skip + page_size]),
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "pages": pages
+    }
+
+@router.get("/autocomplete", response_model=List[TermSuggestion])
+def autocomplete_recipes(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50)
+):
+    """Yazılan öneke uyan arama terimlerini tarif sayısına göre önerir"""
+    index = recipe_search.indeks()
+    if index is None:
+        raise HTTPException(status_code=503, detail="Tarif veri seti yüklenemedi")
+    return index.tamamla(q, limit)
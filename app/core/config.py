@@ -19,12 +19,49 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7  # 1 hafta
     
+    # Yönetici işlemlerine (ör. model sürümü değiştirme) yetkili e-posta adresleri, JSON dizi olarak
+    ADMIN_EMAILS: list = []
+    
     # Backblaze B2 ayarları
     BACKBLAZE_KEY_ID: str = os.getenv("BACKBLAZE_KEY_ID")
     BACKBLAZE_APPLICATION_KEY: str = os.getenv("BACKBLAZE_APPLICATION_KEY")
     BACKBLAZE_BUCKET_NAME: str = os.getenv("BACKBLAZE_BUCKET_NAME")
     BACKBLAZE_ENDPOINT: str = os.getenv("BACKBLAZE_ENDPOINT")
     
+    # Beslenme AI model ayarları
+    NUTRITION_MODEL_PATH: Optional[str] = os.getenv("NUTRITION_MODEL_PATH")
+    NUTRITION_DATA_PATH: Optional[str] = os.getenv("NUTRITION_DATA_PATH")
+    # /nutrition/ai/models ile yüklenebilecek model ve veri dosyalarının dizinleri (boşsa varsayılan model/veri dosyasının dizini)
+    NUTRITION_MODELS_DIR: Optional[str] = os.getenv("NUTRITION_MODELS_DIR")
+    NUTRITION_DATA_DIR: Optional[str] = os.getenv("NUTRITION_DATA_DIR")
+    NUTRITION_RELOAD_CHECK_SECONDS: float = 5.0  # Dosya değişikliği kontrol aralığı
+    NUTRITION_PROFILE_MAX_RECOMMENDATIONS: int = 50  # Hazır profiller için önceden hesaplanan öneri sayısı
+    NUTRITION_INDEX_BACKEND: str = "exact"  # "exact" (sklearn KNN) veya "ivf" (yaklaşık)
+    NUTRITION_IVF_NLIST: int = 0  # 0 ise satır sayısının karekökü kullanılır
+    NUTRITION_IVF_NPROBE: int = 8
+    NUTRITION_MODEL_MMAP: bool = True  # Model dizilerini worker'lar arasında mmap ile paylaş
+    NUTRITION_PRELOAD: bool = False  # gunicorn --preload ile fork öncesi ana süreçte yükle
+    NUTRITION_PRESERIALIZE_ROWS: bool = False  # Sütunsal kopyada satır JSON bloğu yoksa her worker belleğinde üret (veri seti JSON boyutu kadar ek bellek/worker)
+    NUTRITION_BATCH_WINDOW_MS: float = 2.0  # Eşzamanlı /recommend isteklerini toplama penceresi
+    NUTRITION_BATCH_MAX_SIZE: int = 64  # 1 verilirse mikro-partileme kapanır
+    NUTRITION_CACHE_SIZE: int = 10000  # Öneri önbelleğindeki en fazla kayıt; 0 ise önbellek kapalı
+    NUTRITION_CACHE_TTL_SECONDS: float = 300.0
+    # Önbellek anahtarı için besin değerlerinin yuvarlanma adımları (model girdi sırasıyla)
+    NUTRITION_CACHE_STEPS: str = "10,1,1,5,10,1,1,1,1"
+    NUTRITION_WARMUP_TFIDF: bool = True  # Açılışta TF-IDF benzerlik indeksini aç (yoksa oluştur); kapalıysa indeks script.convert_dataset ile hazırlanmalı
+    INFERENCE_POOL_WORKERS: int = 2  # AI çıkarımı için süreç sayısı; 0 ise thread havuzu kullanılır
+    INFERENCE_MAX_PENDING: int = 256  # Bu sayıdan fazla bekleyen sorguda 503 döner
+    
+    # Öneri çıktılarının AIModelOutput tablosuna arka planda toplu yazılması
+    AI_OUTPUT_LOG_ENABLED: bool = True
+    AI_OUTPUT_MAX_PENDING: int = 10000  # Kuyruk doluysa yeni kayıtlar düşürülür
+    AI_OUTPUT_BATCH_SIZE: int = 500  # Bu kadar kayıt birikince hemen yazılır
+    AI_OUTPUT_FLUSH_SECONDS: float = 2.0  # Parti dolmasa da bu aralıkla yazılır
+    CALORIE_CACHE_SIZE: int = 50000  # Önbellekte tutulan kullanıcı kalori profili sayısı; 0 ise kapalı
+    ANALYTICS_CHUNK_SIZE: int = 5000  # Kullanıcı analizinde veritabanından bir seferde okunan satır sayısı
+    DIET_PLAN_BUDGET_MS: float = 50.0  # Diyet planı üretim süresi bütçesi; aşılınca kalan günler açgözlü seçilir
+    DIET_PLAN_CANDIDATES: int = 200  # Diyet planında öğün başına kalori bandından çekilen aday tarif sayısı
+    
     # CORS ayarları
     CORS_ORIGINS: list = ["*"]
     CORS_CREDENTIALS: bool = True
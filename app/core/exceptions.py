@@ -34,4 +34,12 @@ class DatabaseException(HTTPException):
         super().__init__(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=detail
-        ) 
\ No newline at end of file
+        )
+
+class ServiceUnavailableException(HTTPException):
+    def __init__(self, detail: str = "Sunucu şu anda yoğun, lütfen daha sonra tekrar deneyin", retry_after: int = 1):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail,
+            headers={"Retry-After": str(retry_after)}
+        )
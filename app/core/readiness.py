@@ -0,0 +1,77 @@
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+# Artefakt durumları
+BEKLIYOR = "pending"
+YUKLENIYOR = "loading"
+HAZIR = "ready"
+HATALI = "failed"
+ATLANDI = "skipped"
+
+class ReadinessTracker:
+    """
+    Uygulamanın trafik almaya hazır olup olmadığını artefakt bazında izler.
+
+    Zorunlu artefaktların tümü hazır olmadan `hazir_mi()` False döner;
+    yük dengeleyici /ready üzerinden yalnızca ısınmış örneklere trafik yönlendirir.
+    """
+
+    def __init__(self):
+        self._kilit = threading.Lock()
+        self._durumlar: Dict[str, Dict[str, Any]] = {}
+        self._zorunlu: Dict[str, bool] = {}
+
+    def kaydet(self, ad: str, zorunlu: bool = True):
+        """İzlenecek artefaktı bekliyor durumunda kaydeder"""
+        with self._kilit:
+            self._zorunlu[ad] = zorunlu
+            self._durumlar.setdefault(ad, {"state": BEKLIYOR})
+
+    def basladi(self, ad: str):
+        with self._kilit:
+            self._zorunlu.setdefault(ad, True)
+            self._durumlar[ad] = {"state": YUKLENIYOR, "_baslangic": time.perf_counter()}
+
+    def tamamlandi(self, ad: str, detay: Optional[Dict[str, Any]] = None):
+        self._bitir(ad, HAZIR, detay=detay)
+
+    def basarisiz(self, ad: str, hata: str):
+        self._bitir(ad, HATALI, hata=hata)
+
+    def atlandi(self, ad: str, neden: str):
+        self._bitir(ad, ATLANDI, detay={"reason": neden})
+
+    def _bitir(self, ad: str, durum: str, hata: Optional[str] = None, detay: Optional[Dict[str, Any]] = None):
+        with self._kilit:
+            onceki = self._durumlar.get(ad, {})
+            kayit = {"state": durum, "finished_at": datetime.now().isoformat()}
+            if "_baslangic" in onceki:
+                kayit["duration_seconds"] = round(time.perf_counter() - onceki["_baslangic"], 3)
+            if hata:
+                kayit["error"] = hata
+            if detay:
+                kayit.update(detay)
+            self._durumlar[ad] = kayit
+
+    def hazir_mi(self) -> bool:
+        """Tüm zorunlu artefaktlar hazır (veya bilinçli olarak atlanmış) ise True döndürür"""
+        with self._kilit:
+            if not self._durumlar:
+                return False
+            return all(
+                kayit["state"] in (HAZIR, ATLANDI)
+                for ad, kayit in self._durumlar.items()
+                if self._zorunlu.get(ad, True)
+            )
+
+    def rapor(self) -> Dict[str, Any]:
+        with self._kilit:
+            artefaktlar = {
+                ad: {**{k: v for k, v in kayit.items() if not k.startswith("_")}, "required": self._zorunlu.get(ad, True)}
+                for ad, kayit in self._durumlar.items()
+            }
+        return {"ready": self.hazir_mi(), "artifacts": artefaktlar}
+
+readiness = ReadinessTracker()
@@ -15,6 +15,8 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 # OAuth2 şeması
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/token")
+# Kimlik doğrulamanın isteğe bağlı olduğu uç noktalar için
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/token", auto_error=False)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Şifre doğrulama"""
@@ -102,8 +104,23 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+def get_token_payload_optional(token: Optional[str] = Depends(optional_oauth2_scheme)) -> Optional[dict]:
+    """Geçerli token varsa veritabanına gitmeden token içeriğini, yoksa None döndürür"""
+    if not token:
+        return None
+    try:
+        return verify_token(token)
+    except HTTPException:
+        return None
+
 async def get_current_active_user(current_user: User = Depends(get_current_user)):
     """Aktif kullanıcıyı getirir"""
     if not current_user:
         raise HTTPException(status_code=400, detail="Kullanıcı aktif değil")
-    return current_user 
\ No newline at end of file
+    return current_user 
+
+async def get_current_admin(current_user: User = Depends(get_current_active_user)):
+    """Yönetici yetkisine sahip kullanıcıyı getirir"""
+    if getattr(current_user, "email", None) not in settings.ADMIN_EMAILS:
+        raise HTTPException(status_code=403, detail="Bu işlem için yönetici yetkisi gerekli")
+    return current_user
\ No newline at end of file
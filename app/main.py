@@ -1,8 +1,14 @@
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.api.router import api_router
 from app.db.base import Base, engine
+from app.models.nutrition_model import nutrition_registry
+from app.services.inference_pool import inference_pool
+from app.services.warmup import isinmayi_baslat
+from app.services.ai_output_writer import ai_output_writer
+from app.core.readiness import readiness
 
 # Veritabanı tablolarını oluştur
 Base.metadata.create_all(bind=engine)
@@ -26,11 +32,38 @@ app.add_middleware(
 # API router'ını ekle
 app.include_router(api_router, prefix="/api")
 
+# gunicorn --preload ile modül ana süreçte içe aktarılır; burada yüklenen model
+# ve veri fork sonrası worker'lara kopyalanmadan (copy-on-write/mmap) geçer
+if settings.NUTRITION_PRELOAD:
+    nutrition_registry.yukle()
+
+# Beslenme modeli, veri seti ve TF-IDF artefaktlarını açılışı bekletmeden arka planda yükle ve ısıt
+@app.on_event("startup")
+def load_nutrition_artifacts():
+    isinmayi_baslat()
+    # Modeli yerleşik tutan çıkarım süreçlerini önceden başlat
+    inference_pool.baslat()
+    # Öneri çıktılarını toplu yazan arka plan iş parçacığını başlat
+    ai_output_writer.baslat()
+
+@app.on_event("shutdown")
+def stop_inference_pool():
+    inference_pool.kapat()
+    # Kuyrukta kalan öneri çıktılarını yaz
+    ai_output_writer.kapat()
+
 # Sağlık kontrolü
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
 
+# Hazırlık kontrolü: AI artefaktları ısınana kadar 503 döner
+@app.get("/ready")
+async def readiness_check():
+    report = readiness.rapor()
+    report["inference_pool"] = inference_pool.istatistikler()
+    return JSONResponse(status_code=200 if report["ready"] else 503, content=report)
+
 # Ana sayfa
 @app.get("/")
 async def root():
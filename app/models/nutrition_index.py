@@ -0,0 +1,204 @@
+"""
+Diet App API - Nutrition Index
+
+Ölçeklenmiş besin değeri uzayında komşu araması için değiştirilebilir indeksler
+"""
+
+import logging
+import numpy as np
+from typing import List, Optional
+from sklearn.metrics import pairwise_distances
+
+# Loglama ayarları
+logger = logging.getLogger(__name__)
+
+class ExactKNNIndex:
+    """Eğitilmiş sklearn KNN modeliyle tam (kesin) komşu araması"""
+
+    backend = "exact"
+
+    def __init__(self, knn):
+        self.knn = knn
+
+    def __len__(self):
+        return self.knn.n_samples_fit_
+
+    def search(self, sorgular, k: int, maske: Optional[np.ndarray] = None):
+        """Ölçeklenmiş sorgu matrisi için en yakın k komşunun indekslerini döndürür"""
+        if maske is None:
+            return self.knn.kneighbors(sorgular, n_neighbors=k, return_distance=False)
+        return self._maskeli_ara(sorgular, k, maske)
+
+    def _maskeli_ara(self, sorgular, k: int, maske: np.ndarray, parca: int = 65536) -> List[np.ndarray]:
+        """Yalnızca maskedeki satırlar arasında kaba kuvvet araması yapar"""
+        adaylar = np.flatnonzero(maske)
+        sorgular = np.atleast_2d(sorgular)
+        k = min(k, len(adaylar))
+        if k == 0:
+            return [np.empty(0, dtype=np.int64) for _ in sorgular]
+
+        veriler = self.knn._fit_X
+        metrik = self.knn.effective_metric_
+        metrik_parametreleri = self.knn.effective_metric_params_ or {}
+        en_iyi_uzaklik = np.full((len(sorgular), 0), np.inf)
+        en_iyi_indeks = np.empty((len(sorgular), 0), dtype=np.int64)
+        # Adaylar parça parça taranır; her parçada yalnızca en iyi k aday tutulur
+        for bas in range(0, len(adaylar), parca):
+            blok = adaylar[bas:bas + parca]
+            uzakliklar = pairwise_distances(sorgular, veriler[blok], metric=metrik, **metrik_parametreleri)
+            uzakliklar = np.hstack([en_iyi_uzaklik, uzakliklar])
+            indeksler = np.hstack([en_iyi_indeks, np.broadcast_to(blok, (len(sorgular), len(blok)))])
+            if uzakliklar.shape[1] > k:
+                secim = np.argpartition(uzakliklar, k - 1, axis=1)[:, :k]
+                uzakliklar = np.take_along_axis(uzakliklar, secim, axis=1)
+                indeksler = np.take_along_axis(indeksler, secim, axis=1)
+            en_iyi_uzaklik, en_iyi_indeks = uzakliklar, indeksler
+
+        sira = np.argsort(en_iyi_uzaklik, axis=1, kind="stable")
+        return list(np.take_along_axis(en_iyi_indeks, sira, axis=1))
+
+    def bilgi(self):
+        return {"backend": self.backend, "rows": len(self)}
+
+class IVFIndex:
+    """
+    IVF (inverted file) tarzı yaklaşık komşu indeksi.
+
+    Satırlar k-means ile `nlist` kümeye ayrılır ve küme sırasına göre
+    bitişik saklanır. Sorgu sırasında yalnızca sorguya en yakın `nprobe`
+    kümenin satırları taranır; nprobe arttıkça isabet (recall) artar,
+    gecikme de artar.
+    """
+
+    backend = "ivf"
+
+    def __init__(self, veriler, nlist: Optional[int] = None, nprobe: int = 8,
+                 iterasyon: int = 15, ornek_sayisi: int = 256, seed: int = 42):
+        veriler = np.ascontiguousarray(veriler, dtype=np.float32)
+        n = len(veriler)
+        if nlist is None or nlist <= 0:
+            nlist = max(1, int(np.sqrt(n)))
+        self.nlist = min(nlist, n)
+        self.nprobe = max(1, min(nprobe, self.nlist))
+
+        self.merkezler = self._kmeans(veriler, self.nlist, iterasyon, ornek_sayisi, seed)
+        atamalar = self._en_yakin_merkez(veriler, self.merkezler)
+
+        # Satırları küme sırasına göre diz; her kümenin satırları [baslangic[c], baslangic[c+1]) aralığında.
+        # Yalnızca sıralı kopya tutulur, asıl satır numarasına self.sira ile dönülür
+        self.sira = np.argsort(atamalar, kind="stable").astype(np.int64)
+        self.sirali_veriler = veriler[self.sira]
+        sayilar = np.bincount(atamalar, minlength=self.nlist)
+        self.baslangic = np.concatenate(([0], np.cumsum(sayilar)))
+        self._sirali_normlar = np.einsum("ij,ij->i", self.sirali_veriler, self.sirali_veriler)
+
+    def __len__(self):
+        return len(self.sirali_veriler)
+
+    @staticmethod
+    def _en_yakin_merkez(veriler, merkezler, parca: int = 65536) -> np.ndarray:
+        """Her satır için en yakın küme merkezinin indeksini bulur"""
+        merkez_normlari = np.einsum("ij,ij->i", merkezler, merkezler)
+        sonuc = np.empty(len(veriler), dtype=np.int64)
+        for bas in range(0, len(veriler), parca):
+            blok = veriler[bas:bas + parca]
+            # ||x - c||^2 = ||x||^2 - 2 x.c + ||c||^2; ||x||^2 sıralamayı etkilemez
+            uzakliklar = merkez_normlari[None, :] - 2.0 * (blok @ merkezler.T)
+            sonuc[bas:bas + parca] = np.argmin(uzakliklar, axis=1)
+        return sonuc
+
+    @classmethod
+    def _kmeans(cls, veriler, nlist, iterasyon, ornek_sayisi, seed) -> np.ndarray:
+        """Rastgele örneklenmiş alt küme üzerinde Lloyd k-means çalıştırır"""
+        rng = np.random.default_rng(seed)
+        n = len(veriler)
+        egitim = veriler
+        if n > nlist * ornek_sayisi:
+            egitim = veriler[rng.choice(n, size=nlist * ornek_sayisi, replace=False)]
+
+        merkezler = egitim[rng.choice(len(egitim), size=nlist, replace=False)].copy()
+        for _ in range(iterasyon):
+            atamalar = cls._en_yakin_merkez(egitim, merkezler)
+            sayilar = np.bincount(atamalar, minlength=nlist)
+            toplamlar = np.zeros_like(merkezler)
+            np.add.at(toplamlar, atamalar, egitim)
+            dolu = sayilar > 0
+            merkezler[dolu] = toplamlar[dolu] / sayilar[dolu, None]
+            # Boş kalan kümeler rastgele bir noktaya yeniden yerleştirilir
+            bos = np.flatnonzero(~dolu)
+            if len(bos):
+                merkezler[bos] = egitim[rng.choice(len(egitim), size=len(bos), replace=False)]
+        return merkezler
+
+    def _aday_araliklari(self, sorgu, k: int, nprobe: int, kume_boyutlari=None):
+        """Sorguya en yakın kümelerden en az k satır içeren aralıkları seçer"""
+        if kume_boyutlari is None:
+            kume_boyutlari = np.diff(self.baslangic)
+        merkez_uzakliklari = np.einsum("ij,ij->i", self.merkezler - sorgu, self.merkezler - sorgu)
+        kumeler = np.argsort(merkez_uzakliklari)
+        secilen = []
+        toplam = 0
+        for i, kume in enumerate(kumeler):
+            bas, son = self.baslangic[kume], self.baslangic[kume + 1]
+            if kume_boyutlari[kume] > 0:
+                secilen.append((bas, son))
+                toplam += kume_boyutlari[kume]
+            # nprobe küme tarandıktan sonra da k satıra ulaşılmadıysa devam edilir
+            if i + 1 >= nprobe and toplam >= k:
+                break
+        return secilen
+
+    def search(self, sorgular, k: int, nprobe: Optional[int] = None, maske: Optional[np.ndarray] = None):
+        """Ölçeklenmiş sorgu matrisi için yaklaşık en yakın k komşunun indekslerini döndürür"""
+        sorgular = np.atleast_2d(np.asarray(sorgular, dtype=np.float32))
+        nprobe = self.nprobe if nprobe is None else max(1, nprobe)
+
+        kume_boyutlari = None
+        sirali_maske = None
+        if maske is not None:
+            # Maske küme sırasına çevrilir; kümeler yalnızca filtreyi geçen satırlarıyla sayılır
+            sirali_maske = np.asarray(maske, dtype=bool)[self.sira]
+            birikimli = np.concatenate(([0], np.cumsum(sirali_maske)))
+            kume_boyutlari = birikimli[self.baslangic[1:]] - birikimli[self.baslangic[:-1]]
+            k = min(k, int(birikimli[-1]))
+            if k == 0:
+                return [np.empty(0, dtype=np.int64) for _ in sorgular]
+        k = min(k, len(self))
+        sonuc = np.empty((len(sorgular), k), dtype=np.int64)
+
+        for i, sorgu in enumerate(sorgular):
+            araliklar = self._aday_araliklari(sorgu, k, nprobe, kume_boyutlari)
+            pozisyonlar = np.concatenate([np.arange(bas, son) for bas, son in araliklar])
+            if sirali_maske is not None:
+                pozisyonlar = pozisyonlar[sirali_maske[pozisyonlar]]
+            uzakliklar = self._sirali_normlar[pozisyonlar] - 2.0 * (self.sirali_veriler[pozisyonlar] @ sorgu)
+            # Tam sıralama yerine kısmi seçim, ardından yalnızca k eleman sıralanır
+            if len(pozisyonlar) > k:
+                secim = np.argpartition(uzakliklar, k - 1)[:k]
+            else:
+                secim = np.arange(len(pozisyonlar))
+            secim = secim[np.argsort(uzakliklar[secim], kind="stable")]
+            sonuc[i] = self.sira[pozisyonlar[secim]]
+        return sonuc
+
+    def bilgi(self):
+        return {"backend": self.backend, "rows": len(self), "nlist": self.nlist, "nprobe": self.nprobe}
+
+INDEKS_TIPLERI = {
+    ExactKNNIndex.backend: ExactKNNIndex,
+    IVFIndex.backend: IVFIndex,
+}
+
+def indeks_olustur(knn, backend: str = "exact", **parametreler):
+    """Yapılandırmaya göre KNN modelinin eğitim matrisi üzerinde arama indeksi oluşturur"""
+    if backend == ExactKNNIndex.backend:
+        return ExactKNNIndex(knn)
+    if backend not in INDEKS_TIPLERI:
+        raise ValueError(f"Bilinmeyen indeks tipi: {backend}")
+
+    # Yaklaşık indeksler öklid uzaklığı varsayar; farklı metrikte tam aramaya dönülür
+    if getattr(knn, "effective_metric_", "euclidean") != "euclidean":
+        logger.warning(f"'{knn.effective_metric_}' metriği {backend} indeksiyle desteklenmiyor, tam arama kullanılıyor")
+        return ExactKNNIndex(knn)
+
+    return INDEKS_TIPLERI[backend](knn._fit_X, **parametreler)
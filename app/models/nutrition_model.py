@@ -8,15 +8,101 @@ import joblib
 import numpy as np
 import pandas as pd
 import os
+import time
+import json
+import hashlib
 import logging
-from typing import List, Optional, Dict, Any
+import random
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, List, Optional, Dict, Any, Tuple
 from enum import Enum
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from app.core.config import settings
+from app.models.nutrition_index import ExactKNNIndex, indeks_olustur
+from app.models.recipe_filter import RecipeFilterIndex
+from app.models.recipe_store import RecipeStore, satirlari_json_olarak, sutunsal_dizin, sutunsal_meta_oku, sutunsal_veri_ac, META_DOSYASI
 
 # Loglama ayarları
 logger = logging.getLogger(__name__)
 
 # Yeni istek ve yanıt modelleri için sınıflar
+class MealType(str, Enum):
+    KAHVALTI = "kahvalti"
+    OGLE = "ogle"
+    AKSAM = "aksam"
+    ARA_OGUN = "ara_ogun"
+    TATLI = "tatli"
+    ICECEK = "icecek"
+
+# Öğün tiplerinin veri setindeki kategori/etiket karşılıkları
+OGUN_IFADELERI = {
+    MealType.KAHVALTI: ["breakfast", "brunch"],
+    MealType.OGLE: ["lunch"],
+    MealType.AKSAM: ["main dish", "one dish meal", "stew"],
+    MealType.ARA_OGUN: ["snacks", "appetizer"],
+    MealType.TATLI: ["dessert"],
+    MealType.ICECEK: ["beverages"],
+}
+
+# Filtre alanı -> veri seti sütunu
+FILTRE_SUTUNLARI = {
+    "kalori": "Calories",
+    "yag": "FatContent",
+    "karbonhidrat": "CarbohydrateContent",
+    "protein": "ProteinContent",
+    "seker": "SugarContent",
+    "sodyum": "SodiumContent",
+    "lif": "FiberContent",
+}
+
+class RecommendationFilter(BaseModel):
+    kalori_min: Optional[float] = None
+    kalori_max: Optional[float] = None
+    yag_min: Optional[float] = None
+    yag_max: Optional[float] = None
+    karbonhidrat_min: Optional[float] = None
+    karbonhidrat_max: Optional[float] = None
+    protein_min: Optional[float] = None
+    protein_max: Optional[float] = None
+    seker_min: Optional[float] = None
+    seker_max: Optional[float] = None
+    sodyum_min: Optional[float] = None
+    sodyum_max: Optional[float] = None
+    lif_min: Optional[float] = None
+    lif_max: Optional[float] = None
+    include_keywords: List[str] = Field(default_factory=list, max_length=20)
+    exclude_keywords: List[str] = Field(default_factory=list, max_length=20)
+    meal_type: Optional[MealType] = None
+
+    def araliklar(self) -> Dict[str, Tuple[Optional[float], Optional[float]]]:
+        """Tanımlı aralıkları veri seti sütun adlarıyla döndürür"""
+        araliklar = {}
+        for alan, sutun in FILTRE_SUTUNLARI.items():
+            en_az, en_cok = getattr(self, f"{alan}_min"), getattr(self, f"{alan}_max")
+            if en_az is not None or en_cok is not None:
+                araliklar[sutun] = (en_az, en_cok)
+        return araliklar
+
+    def bos_mu(self) -> bool:
+        return not (self.araliklar() or self.include_keywords or self.exclude_keywords or self.meal_type)
+
+    def anahtar(self) -> str:
+        """Aynı koşullar için aynı olan, sıralamadan bağımsız filtre anahtarı"""
+        return json.dumps({
+            "araliklar": sorted(self.araliklar().items()),
+            "icermeli": sorted(k.lower() for k in self.include_keywords),
+            "icermemeli": sorted(k.lower() for k in self.exclude_keywords),
+            "ogun": self.meal_type.value if self.meal_type else None
+        })
+
+def etkin_filtre(filtre: Optional[RecommendationFilter]) -> Optional[RecommendationFilter]:
+    """Koşul içermeyen filtreyi None'a çevirir"""
+    if filtre is None or filtre.bos_mu():
+        return None
+    return filtre
+
 class NutritionRequest(BaseModel):
     kalori: float
     yag: float
@@ -28,6 +114,24 @@ class NutritionRequest(BaseModel):
     seker: float
     protein: float
     n_recommendations: int = 5
+    filters: Optional[RecommendationFilter] = None
+
+    def girdi_degerleri(self) -> List[float]:
+        """Modelin beklediği sırada besin değerleri vektörünü döndürür"""
+        return [
+            self.kalori,
+            self.yag,
+            self.doymus_yag,
+            self.kolesterol,
+            self.sodyum,
+            self.karbonhidrat,
+            self.lif,
+            self.seker,
+            self.protein
+        ]
+
+class BatchNutritionRequest(BaseModel):
+    items: List[NutritionRequest] = Field(..., min_length=1, max_length=100)
 
 class NutritionProfile(str, Enum):
     DUSUK_KALORILI = "dusuk_kalorili"
@@ -38,6 +142,25 @@ class NutritionProfile(str, Enum):
 class ProfileRequest(BaseModel):
     profile: NutritionProfile
     n_recommendations: int = 5
+    filters: Optional[RecommendationFilter] = None
+
+class SimilarityAggregation(str, Enum):
+    MEAN = "mean"
+    SUM = "sum"
+    MAX = "max"
+
+class SimilarRecipesRequest(BaseModel):
+    recipe_indices: List[int] = Field(..., min_length=1, max_length=500)  # örn. favori tarifler
+    n_recommendations: int = Field(10, ge=1, le=50)
+    aggregation: SimilarityAggregation = SimilarityAggregation.MEAN
+
+class ModelVersionRequest(BaseModel):
+    name: str = Field(..., min_length=1, max_length=64, pattern=r"^[A-Za-z0-9_.-]+$")
+    model_path: str  # Model dizinindeki dosya adı veya bu dizin altındaki yol
+    data_path: Optional[str] = None  # Veri dizinindeki dosya adı veya bu dizin altındaki yol
+
+class TrafficSplitRequest(BaseModel):
+    weights: Dict[str, float] = Field(default_factory=dict)  # sürüm adı -> yüzde
 
 class CalorieRequest(BaseModel):
     weight: float  # kg cinsinden ağırlık
@@ -46,6 +169,12 @@ class CalorieRequest(BaseModel):
     gender: str    # "male" veya "female"
     activity_level: str  # "sedentary", "active", "very active"
 
+class DietPlanRequest(CalorieRequest):
+    goal: Optional[str] = None  # "weight_loss", "muscle_building", "maintenance" ya da serbest metin
+    days: int = Field(7, ge=1, le=14)
+    snacks_per_day: int = Field(1, ge=0, le=3)
+    seed: Optional[int] = None  # Aynı plan için sabit tohum
+
 class CalorieResponse(BaseModel):
     total_calories: float
     meals: Dict[str, float]
@@ -55,6 +184,12 @@ class CalorieResponse(BaseModel):
     carbs_need: float
     fat_need: float
 
+class ClientCalorieResponse(BaseModel):
+    user_id: int
+    name: Optional[str] = None
+    calories: Optional[CalorieResponse] = None
+    missing_fields: List[str] = Field(default_factory=list)
+
 # Kalori hesaplama fonksiyonları
 def calculate_bke(weight, height):
     """Calculate Body Mass Index (BMI)"""
@@ -145,25 +280,231 @@ def calculate_macros(total_calories, weight, goal="maintenance"):
         "fat_g": fat_g
     }
 
+def goal_from_text(goal_text):
+    """Kullanıcının serbest metin hedefini makro hesaplama hedefine çevirir"""
+    if goal_text:
+        goal_text = goal_text.lower()
+        if "kas" in goal_text or "muscle" in goal_text:
+            return "muscle_building"
+        if "kilo verme" in goal_text or "weight loss" in goal_text:
+            return "weight_loss"
+    return "maintenance"
+
+# Toplu (vektörel) kalori hesaplama fonksiyonları
+# Skaler fonksiyonlarla aynı formüller, dallanmalar maskelerle tüm sütuna bir kerede uygulanır
+AKTIVITE_CARPANLARI = {"sedentary": 1.3, "active": 1.7}
+VARSAYILAN_AKTIVITE_CARPANI = 2.0  # Very active
+MAKRO_HEDEFLERI = {
+    "muscle_building": (2.0, 0.25),  # (kg başına protein, yağ oranı)
+    "weight_loss": (1.8, 0.20),
+    "maintenance": (1.4, 0.30),
+}
+
+def _erkek_maskesi(gender):
+    return np.char.lower(np.asarray(gender, dtype=str)) == "male"
+
+def calculate_bke_array(weight, height):
+    """Calculate BMI for arrays of weights and heights."""
+    height_m = np.asarray(height, dtype=float) / 100
+    return np.asarray(weight, dtype=float) / (height_m ** 2)
+
+def mifflin_st_jeor_array(weight, height, age, gender):
+    """Vectorized Mifflin-St Jeor BMR."""
+    taban = 10 * np.asarray(weight, dtype=float) + 6.25 * np.asarray(height, dtype=float) - 5 * np.asarray(age, dtype=float)
+    return taban + np.where(_erkek_maskesi(gender), 5.0, -161.0)
+
+def harris_benedict_array(weight, height, age, gender):
+    """Vectorized Harris-Benedict BMR."""
+    weight = np.asarray(weight, dtype=float)
+    height = np.asarray(height, dtype=float)
+    age = np.asarray(age, dtype=float)
+    return np.where(
+        _erkek_maskesi(gender),
+        66 + 13.75 * weight + 5 * height - 6.8 * age,
+        655 + 9.6 * weight + 1.8 * height - 4.7 * age
+    )
+
+def ideal_weight_array(height, gender):
+    """Vectorized ideal weight."""
+    return np.where(_erkek_maskesi(gender), 50.0, 45.5) + 0.91 * (np.asarray(height, dtype=float) - 150)
+
+def activity_multiplier_array(activity_level):
+    """Aktivite seviyelerini çarpanlara çevirir; bilinmeyenler 'very active' sayılır"""
+    seviyeler = np.char.lower(np.asarray(activity_level, dtype=str))
+    carpanlar = np.full(seviyeler.shape, VARSAYILAN_AKTIVITE_CARPANI)
+    for seviye, carpan in AKTIVITE_CARPANLARI.items():
+        carpanlar[seviyeler == seviye] = carpan
+    return carpanlar
+
+def daily_calorie_requirements_array(weight, height, age, gender, activity_level):
+    """Calculate daily calorie requirements for whole columns at once."""
+    weight = np.asarray(weight, dtype=float)
+    bke = calculate_bke_array(weight, height)
+    
+    # Obez: ideal kiloya doğru düzeltilmiş kilo ile Mifflin-St Jeor; normal ve zayıf: Harris-Benedict
+    obez = bke >= 25
+    adjusted_weight = weight - (weight - ideal_weight_array(height, gender)) * 0.25
+    bmr = np.where(
+        obez,
+        mifflin_st_jeor_array(adjusted_weight, height, age, gender),
+        harris_benedict_array(weight, height, age, gender)
+    )
+    
+    return bmr * activity_multiplier_array(activity_level), bke
+
+def meal_distribution_array(total_calories):
+    """Distribute arrays of total calories among meals."""
+    total_calories = np.asarray(total_calories, dtype=float)
+    return {
+        "Breakfast": total_calories * 0.25,
+        "Lunch": total_calories * 0.35,
+        "Dinner": total_calories * 0.30,
+        "Snacks": total_calories * 0.10
+    }
+
+def calculate_macros_array(total_calories, weight, goal):
+    """Calculate macronutrient distribution for arrays; goal may be a single value or an array."""
+    total_calories = np.asarray(total_calories, dtype=float)
+    goal = np.broadcast_to(np.asarray(goal, dtype=str), total_calories.shape)
+    protein_per_kg = np.full(total_calories.shape, MAKRO_HEDEFLERI["maintenance"][0])
+    fat_percentage = np.full(total_calories.shape, MAKRO_HEDEFLERI["maintenance"][1])
+    for hedef, (protein_orani, yag_orani) in MAKRO_HEDEFLERI.items():
+        maske = goal == hedef
+        protein_per_kg[maske] = protein_orani
+        fat_percentage[maske] = yag_orani
+    
+    protein_g = np.asarray(weight, dtype=float) * protein_per_kg
+    fat_cal = total_calories * fat_percentage
+    carbs_g = (total_calories - protein_g * 4 - fat_cal) / 4
+    
+    return {
+        "protein_g": protein_g,
+        "carbs_g": carbs_g,
+        "fat_g": fat_cal / 9
+    }
+
+def calorie_responses_array(weight, height, age, gender, activity_level, goal) -> List[Dict[str, Any]]:
+    """Birden çok kişi için CalorieResponse sözlüklerini tek vektörel hesaplamayla üretir"""
+    total_calories, bke = daily_calorie_requirements_array(weight, height, age, gender, activity_level)
+    meals = {ogun: np.round(degerler, 2) for ogun, degerler in meal_distribution_array(total_calories).items()}
+    macros = calculate_macros_array(total_calories, weight, goal)
+    
+    sutunlar = {
+        "total_calories": np.round(total_calories, 2),
+        "bke": np.round(bke, 2),
+        "ideal_weight": np.round(ideal_weight_array(height, gender), 2),
+        "protein_need": np.round(macros["protein_g"], 2),
+        "carbs_need": np.round(macros["carbs_g"], 2),
+        "fat_need": np.round(macros["fat_g"], 2)
+    }
+    # Satırlara çevirmeden önce sütunları bir kerede Python listelerine dönüştür
+    sutunlar = {ad: degerler.tolist() for ad, degerler in sutunlar.items()}
+    meals = {ogun: degerler.tolist() for ogun, degerler in meals.items()}
+    return [
+        {
+            "total_calories": sutunlar["total_calories"][i],
+            "meals": {ogun: degerler[i] for ogun, degerler in meals.items()},
+            "bke": sutunlar["bke"][i],
+            "ideal_weight": sutunlar["ideal_weight"][i],
+            "protein_need": sutunlar["protein_need"][i],
+            "carbs_need": sutunlar["carbs_need"][i],
+            "fat_need": sutunlar["fat_need"][i]
+        }
+        for i in range(len(sutunlar["total_calories"]))
+    ]
+
 # Diyet önerisi için yardımcı fonksiyonlar
-def model_yukle(model_yolu=None):
-    """Eğitilmiş modeli yükler"""
+VARSAYILAN_MODEL_YOLU = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'models', 'trained_model.pkl')
+VARSAYILAN_VERI_YOLU = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'dataset.csv')
+
+def model_yolunu_bul(model_yolu=None):
+    """Model dosyasının yolunu alternatif konumları da deneyerek belirler"""
     if model_yolu is None:
-        model_yolu = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'models', 'trained_model.pkl')
+        model_yolu = VARSAYILAN_MODEL_YOLU
     
+    # Alternatif yolları da dene
+    if not os.path.exists(model_yolu):
+        alternative_paths = [
+            '/opt/render/project/src/app/models/trained_model.pkl',
+            '/app/app/models/trained_model.pkl',
+            './app/models/trained_model.pkl'
+        ]
+        
+        for alt_path in alternative_paths:
+            if os.path.exists(alt_path):
+                return alt_path
+    return model_yolu
+
+def veri_yolunu_bul(veri_yolu=None):
+    """Veri dosyasının yolunu alternatif konumları da deneyerek belirler"""
+    if veri_yolu is None:
+        veri_yolu = VARSAYILAN_VERI_YOLU
+    
+    # Alternatif yolları da dene (CSV veya sütunsal kopyası olan konumlar)
+    if not _veri_mevcut(veri_yolu):
+        alternative_paths = [
+            '/opt/render/project/src/data/dataset.csv',
+            '/app/data/dataset.csv',
+            './data/dataset.csv',
+            os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'processed_data', 'dataset.csv')
+        ]
+        
+        for alt_path in alternative_paths:
+            if _veri_mevcut(alt_path):
+                return alt_path
+    return veri_yolu
+
+def _veri_mevcut(veri_yolu):
+    return os.path.exists(veri_yolu) or os.path.exists(os.path.join(sutunsal_dizin(veri_yolu), META_DOSYASI))
+
+def dizin_altinda_coz(yol: str, kok: str) -> Optional[str]:
+    """
+    Adı veya yolu kök dizine göre çözer; sembolik bağlar açıldıktan sonra
+    kökün dışında kalıyorsa None döndürür
+    """
+    kok = os.path.realpath(kok)
+    tam_yol = os.path.realpath(os.path.join(kok, yol))
+    if os.path.commonpath([kok, tam_yol]) != kok:
+        return None
+    return tam_yol
+
+def izinli_model_yolu(model_yolu: str) -> Optional[str]:
+    """Yapılandırılmış model dizinindeki mevcut model dosyasının yolu; dizin dışı veya yoksa None"""
+    kok = settings.NUTRITION_MODELS_DIR or os.path.dirname(settings.NUTRITION_MODEL_PATH or VARSAYILAN_MODEL_YOLU)
+    yol = dizin_altinda_coz(model_yolu, kok)
+    return yol if yol is not None and os.path.isfile(yol) else None
+
+def izinli_veri_yolu(veri_yolu: str) -> Optional[str]:
+    """Yapılandırılmış veri dizinindeki mevcut veri setinin (CSV veya sütunsal kopyası) yolu; dizin dışı veya yoksa None"""
+    kok = settings.NUTRITION_DATA_DIR or os.path.dirname(settings.NUTRITION_DATA_PATH or VARSAYILAN_VERI_YOLU)
+    yol = dizin_altinda_coz(veri_yolu, kok)
+    return yol if yol is not None and _veri_mevcut(yol) else None
+
+def veri_dosyasini_bul(veri_yolu):
+    """Yüklenecek veri artefaktını döndürür: güncel sütunsal kopya varsa meta dosyası, yoksa CSV"""
+    if sutunsal_meta_oku(veri_yolu) is not None:
+        return os.path.join(sutunsal_dizin(veri_yolu), META_DOSYASI)
+    return veri_yolu
+
+def veri_dosyasi_ozeti(veri_dosyasi):
+    """Veri artefaktının özetini döndürür; sütunsal kopyada dönüştürülen CSV'nin özeti kullanılır"""
+    if os.path.basename(veri_dosyasi) == META_DOSYASI:
+        with open(veri_dosyasi, encoding="utf-8") as f:
+            kaynak_ozeti = json.load(f).get("source_sha256")
+        if kaynak_ozeti:
+            return kaynak_ozeti
+    return dosya_ozeti(veri_dosyasi)
+
+def model_yukle(model_yolu=None, mmap_mode=None):
+    """
+    Eğitilmiş modeli yükler.
+    
+    mmap_mode='r' verilirse sıkıştırılmamış bir joblib dosyasındaki numpy dizileri
+    (KNN eğitim matrisi, scaler parametreleri) kopyalanmadan bellek eşlemeli açılır;
+    böylece aynı makinedeki worker süreçleri aynı sayfaları paylaşır.
+    """
     try:
-        # Alternatif yolları da dene
-        if not os.path.exists(model_yolu):
-            alternative_paths = [
-                '/opt/render/project/src/app/models/trained_model.pkl',
-                '/app/app/models/trained_model.pkl',
-                './app/models/trained_model.pkl'
-            ]
-            
-            for alt_path in alternative_paths:
-                if os.path.exists(alt_path):
-                    model_yolu = alt_path
-                    break
+        model_yolu = model_yolunu_bul(model_yolu)
         
         logger.info(f"Model yükleniyor: {model_yolu}")
         logger.info(f"Dosya mevcut mu: {os.path.exists(model_yolu)}")
@@ -172,7 +513,7 @@ def model_yukle(model_yolu=None):
             logger.error("Model dosyası bulunamadı!")
             return None
             
-        model = joblib.load(model_yolu)
+        model = joblib.load(model_yolu, mmap_mode=mmap_mode)
         logger.info(f"Model başarıyla yüklendi")
         return model
     except Exception as e:
@@ -181,23 +522,14 @@ def model_yukle(model_yolu=None):
 
 def veri_yukle(veri_yolu=None):
     """Diyet listesi verilerini yükler"""
-    if veri_yolu is None:
-        veri_yolu = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'dataset.csv')
-    
     try:
-        # Alternatif yolları da dene
-        if not os.path.exists(veri_yolu):
-            alternative_paths = [
-                '/opt/render/project/src/data/dataset.csv',
-                '/app/data/dataset.csv',
-                './data/dataset.csv',
-                os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'processed_data', 'dataset.csv')
-            ]
-            
-            for alt_path in alternative_paths:
-                if os.path.exists(alt_path):
-                    veri_yolu = alt_path
-                    break
+        veri_yolu = veri_yolunu_bul(veri_yolu)
+        
+        # Güncel sütunsal kopya varsa CSV ayrıştırmadan mmap ile aç
+        store = sutunsal_veri_ac(veri_yolu)
+        if store is not None:
+            logger.info(f"Veri sütunsal formattan yüklendi: {store.dizin} ({len(store)} kayıt)")
+            return store
         
         logger.info(f"Veri yükleniyor: {veri_yolu}")
         logger.info(f"Dosya mevcut mu: {os.path.exists(veri_yolu)}")
@@ -213,38 +545,627 @@ def veri_yukle(veri_yolu=None):
         logger.error(f"Veri yükleme hatası: {str(e)}")
         return None
 
-def diyet_oner(model, veri, girdi_degerleri, n_neighbors=5):
-    """Girdi değerlerine göre diyet önerisi yapar"""
+def komsu_indeksleri(model, girdiler, n_neighbors=5, indeks=None, maske=None):
+    """Girdi matrisinin tamamı için tek transform ve tek komşu aramasıyla komşu indekslerini bulur
+    
+    Maske verilirse arama yalnızca maskede True olan satırlar arasında yapılır.
+    """
+    # Model kontrolü
+    if 'knn' not in model.named_steps or 'scaler' not in model.named_steps:
+        raise ValueError("Model yapısı beklenen formatta değil")
+    
+    girdi = np.asarray(girdiler, dtype=float)
+    if girdi.ndim == 1:
+        girdi = girdi.reshape(1, -1)
+    
+    olcekli_girdi = model.named_steps['scaler'].transform(girdi)
+    
+    # Filtreli aramada maske indeksin içinde uygulanır
+    if maske is not None:
+        indeks = indeks if indeks is not None else ExactKNNIndex(model.named_steps['knn'])
+        return indeks.search(olcekli_girdi, n_neighbors, maske=maske)
+    
+    # Yapılandırılmış bir indeks varsa onu, yoksa modelin kendi KNN aramasını kullan
+    if indeks is not None:
+        return indeks.search(olcekli_girdi, n_neighbors)
+    
+    return model.named_steps['knn'].kneighbors(
+        olcekli_girdi,
+        n_neighbors=n_neighbors,
+        return_distance=False
+    )
+
+def diyet_oner_toplu(model, veri, girdi_listesi, n_neighbors_listesi, indeks=None, maske=None):
+    """Birden çok girdi vektörü için diyet önerilerini tek matris sorgusuyla yapar"""
     try:
-        # Girdiyi numpy dizisine çevir
-        girdi = np.array([girdi_degerleri])
-        
-        # Model kontrolü
-        if 'knn' not in model.named_steps or 'scaler' not in model.named_steps:
-            logger.error("Model yapısı beklenen formatta değil")
-            return None
-            
-        # Modeli kullanarak en yakın komşuları bul
-        en_yakin_komsular = model.named_steps['knn'].kneighbors(
-            model.named_steps['scaler'].transform(girdi),
-            n_neighbors=n_neighbors,
-            return_distance=False
-        )
+        # Tüm sorgular en büyük komşu sayısıyla bir kerede çalıştırılır, sonra her biri kendi sayısına kesilir
+        en_yakin_komsular = komsu_indeksleri(model, girdi_listesi, n_neighbors=max(n_neighbors_listesi), indeks=indeks, maske=maske)
         
         # Önerileri getir
-        oneriler = veri.iloc[en_yakin_komsular[0]]
-        return oneriler
+        return [
+            veri.iloc[satir[:n_neighbors]]
+            for satir, n_neighbors in zip(en_yakin_komsular, n_neighbors_listesi)
+        ]
     except Exception as e:
-        logger.error(f"Diyet önerisi oluşturma hatası: {str(e)}")
+        logger.error(f"Toplu diyet önerisi oluşturma hatası: {str(e)}")
         return None
 
+def diyet_oner(model, veri, girdi_degerleri, n_neighbors=5, indeks=None, maske=None):
+    """Girdi değerlerine göre diyet önerisi yapar"""
+    oneriler = diyet_oner_toplu(model, veri, [girdi_degerleri], [n_neighbors], indeks=indeks, maske=maske)
+    if oneriler is None:
+        return None
+    return oneriler[0]
+
+HAZIR_PROFILLER = {
+    NutritionProfile.DUSUK_KALORILI: [300, 10, 2, 30, 500, 40, 8, 10, 25],
+    NutritionProfile.YUKSEK_PROTEINLI: [600, 25, 8, 100, 700, 30, 5, 5, 50],
+    NutritionProfile.DUSUK_KARBONHIDRATLI: [500, 35, 12, 150, 600, 20, 10, 5, 40],
+    NutritionProfile.VEJETARYEN: [450, 15, 3, 0, 400, 70, 15, 20, 20]
+}
+
 def hazir_profil_degerlerini_al(profil):
     """Hazır beslenme profili değerlerini döndürür"""
-    profiller = {
-        NutritionProfile.DUSUK_KALORILI: [300, 10, 2, 30, 500, 40, 8, 10, 25],
-        NutritionProfile.YUKSEK_PROTEINLI: [600, 25, 8, 100, 700, 30, 5, 5, 50],
-        NutritionProfile.DUSUK_KARBONHIDRATLI: [500, 35, 12, 150, 600, 20, 10, 5, 40],
-        NutritionProfile.VEJETARYEN: [450, 15, 3, 0, 400, 70, 15, 20, 20]
+    return HAZIR_PROFILLER.get(profil)
+
+def json_dizisi(satirlar: List[str]) -> str:
+    """Önceden serileştirilmiş JSON nesnelerini tek bir JSON dizisinde birleştirir"""
+    return "[" + ",".join(satirlar) + "]"
+
+class PreserializedRows:
+    """
+    Veri setindeki her satırın JSON kodlaması: tek bir bayt bloğu ve başlangıç ofsetleri.
+    
+    Yanıt oluşturmak seçilen satırların baytlarını birleştirmekten ibarettir
+    (pandas dönüşümü ve pydantic doğrulaması yapılmaz). Sütunsal veri setinde
+    blok dönüştürme sırasında diske yazılır ve mmap ile açılır, böylece tüm
+    worker'lar aynı sayfaları paylaşır; `veriden` ile süreç belleğinde üretmek
+    her worker'a veri seti boyutunda ek bellek maliyeti getirir.
+    """
+
+    def __init__(self, blok, ofsetler, kaynak: str = "heap"):
+        self.blok = blok
+        self.ofsetler = ofsetler
+        self.kaynak = kaynak
+
+    @classmethod
+    def veriden(cls, veri, parca_boyutu: int = 20000) -> "PreserializedRows":
+        """Satır JSON'larını süreç belleğinde üretir"""
+        parcalar = []
+        uzunluklar = []
+        for bas in range(0, len(veri), parca_boyutu):
+            satirlar = [satir.encode("utf-8") for satir in satirlari_json_olarak(veri.iloc[np.arange(bas, min(bas + parca_boyutu, len(veri)))])]
+            parcalar.extend(satirlar)
+            uzunluklar.extend(len(satir) for satir in satirlar)
+        ofsetler = np.zeros(len(uzunluklar) + 1, dtype=np.int64)
+        np.cumsum(uzunluklar, out=ofsetler[1:])
+        return cls(b"".join(parcalar), ofsetler)
+
+    @classmethod
+    def sutunsal_veriden(cls, store: RecipeStore) -> Optional["PreserializedRows"]:
+        """Sütunsal veri setinin yanında yazılmış bloğu mmap ile açar; yoksa None"""
+        blok = store.satir_json_blogu()
+        if blok is None:
+            return None
+        return cls(*blok, kaynak="mmap")
+
+    def __len__(self):
+        return len(self.ofsetler) - 1
+
+    def satir(self, i: int) -> bytes:
+        return bytes(self.blok[self.ofsetler[i]:self.ofsetler[i + 1]])
+
+    def json_dizisi(self, indeksler) -> bytes:
+        """Seçilen satırların JSON nesnelerini tek bir JSON dizisinde birleştirir"""
+        return b"[" + b",".join(self.satir(i) for i in indeksler) + b"]"
+
+def profil_komsularini_bul(model, veri, en_fazla_oneri: int, indeks=None) -> Dict[NutritionProfile, np.ndarray]:
+    """Hazır profillerin komşu listelerini tek sorguda hesaplar"""
+    profiller = list(HAZIR_PROFILLER)
+    en_yakin_komsular = komsu_indeksleri(
+        model,
+        [HAZIR_PROFILLER[profil] for profil in profiller],
+        n_neighbors=min(en_fazla_oneri, len(veri)),
+        indeks=indeks
+    )
+    return dict(zip(profiller, en_yakin_komsular))
+
+def profil_tablolarini_olustur(veri, profil_komsulari: Dict[NutritionProfile, np.ndarray]) -> Dict[NutritionProfile, List[str]]:
+    """Hazır profillerin komşu satırlarını JSON olarak saklar"""
+    return {
+        profil: satirlari_json_olarak(veri.iloc[satir])
+        for profil, satir in profil_komsulari.items()
     }
+
+def sutun_konumlari_olustur(veri) -> Dict[str, int]:
+    """Sütun adından sütun konumuna eşleme oluşturur"""
+    return {ad: i for i, ad in enumerate(veri.columns)}
+
+# Model ve veri seti kayıt defteri
+def dosya_imzasi(yol) -> Tuple[int, int]:
+    """Dosyanın değişip değişmediğini anlamak için (mtime, boyut) imzasını döndürür"""
+    stat = os.stat(yol)
+    return stat.st_mtime_ns, stat.st_size
+
+def dosya_ozeti(yol, blok_boyutu=1024 * 1024) -> str:
+    """Dosyanın SHA-256 özetini parça parça okuyarak hesaplar"""
+    ozet = hashlib.sha256()
+    with open(yol, 'rb') as f:
+        for blok in iter(lambda: f.read(blok_boyutu), b''):
+            ozet.update(blok)
+    return ozet.hexdigest()
+
+def surec_bellek_kullanimi() -> Dict[str, float]:
+    """
+    Sürecin bellek kullanımını MB cinsinden döndürür (yalnızca Linux).
     
-    return profiller.get(profil)
\ No newline at end of file
+    RSS paylaşılan sayfaları her worker'da tekrar sayar; PSS paylaşılan sayfaları
+    paylaşan süreç sayısına böler, worker başına gerçek maliyet için PSS'e bakılmalıdır.
+    """
+    sonuc = {}
+    for dosya, alanlar in (("/proc/self/status", ("VmRSS", "RssFile", "RssShmem")),
+                           ("/proc/self/smaps_rollup", ("Pss",))):
+        try:
+            with open(dosya) as f:
+                for satir in f:
+                    ad, _, deger = satir.partition(":")
+                    if ad in alanlar:
+                        sonuc[ad.lower() + "_mb"] = round(int(deger.split()[0]) / 1024, 1)
+        except OSError:
+            continue
+    return sonuc
+
+@dataclass(frozen=True)
+class NutritionArtifacts:
+    """Yüklenmiş model ve veri setinin değişmez anlık görüntüsü"""
+    model: Any
+    veri: Any
+    model_yolu: str
+    veri_yolu: str
+    veri_dosyasi: str
+    model_imzasi: Tuple[int, int]
+    veri_imzasi: Tuple[int, int]
+    model_ozeti: str
+    veri_ozeti: str
+    yuklenme_zamani: datetime
+    yuklenme_suresi: float
+    indeks: Any
+    profil_komsulari: Dict[NutritionProfile, np.ndarray]
+    profil_tablolari: Dict[NutritionProfile, List[str]]
+    satir_jsonlari: Optional[PreserializedRows]
+    sutun_konumlari: Dict[str, int]
+    filtre_indeksi: RecipeFilterIndex
+
+    @property
+    def version(self) -> str:
+        """Model ve veri özetlerinden oluşan artefakt sürümü"""
+        return f"{self.model_ozeti[:12]}-{self.veri_ozeti[:12]}"
+
+    def filtre_maskesi(self, filtre: Optional[RecommendationFilter]) -> Optional[np.ndarray]:
+        """Filtreyi sağlayan satırların maskesini döndürür; filtre yoksa None"""
+        filtre = etkin_filtre(filtre)
+        if filtre is None:
+            return None
+        return self.filtre_indeksi.maske(
+            filtre.anahtar(),
+            filtre.araliklar(),
+            icermeli=filtre.include_keywords,
+            icermemeli=filtre.exclude_keywords,
+            ogun_ifadeleri=OGUN_IFADELERI.get(filtre.meal_type, [])
+        )
+
+    def komsular(self, girdiler, n_neighbors: int, filtre: Optional[RecommendationFilter] = None):
+        """Bu görüntünün modeli ve indeksiyle (varsa filtre uygulanarak) komşu indekslerini bulur"""
+        return komsu_indeksleri(self.model, girdiler, n_neighbors, self.indeks, maske=self.filtre_maskesi(filtre))
+
+    def tarif_kimlikleri(self, indeksler) -> List[int]:
+        """Satır indekslerini (varsa) RecipeId değerlerine çevirir"""
+        indeksler = np.asarray(indeksler, dtype=np.int64)
+        if "RecipeId" not in self.sutun_konumlari:
+            return indeksler.tolist()
+        if isinstance(self.veri, RecipeStore):
+            if self.veri.sayisal_mi("RecipeId"):
+                return np.asarray(self.veri.sayisal("RecipeId")[indeksler]).tolist()
+            return self.veri.metin("RecipeId", indeksler)
+        return self.veri["RecipeId"].to_numpy()[indeksler].tolist()
+
+    def sutun_konumlari_coz(self, fields: Optional[str]) -> Optional[List[int]]:
+        """Virgülle ayrılmış sütun adlarını konumlara çevirir; boşsa None (tüm sütunlar) döndürür"""
+        if not fields:
+            return None
+        adlar = [ad.strip() for ad in fields.split(",") if ad.strip()]
+        bilinmeyen = [ad for ad in adlar if ad not in self.sutun_konumlari]
+        if bilinmeyen:
+            raise ValueError(f"Bilinmeyen sütun(lar): {', '.join(bilinmeyen)}")
+        # Tekrarlanan adlar bir kez alınır, istek sırası korunur
+        return [self.sutun_konumlari[ad] for ad in dict.fromkeys(adlar)] or None
+
+    def profil_onerileri(self, profil: NutritionProfile, n_recommendations: int,
+                         sutunlar: Optional[List[int]] = None) -> Optional[bytes]:
+        """Önceden hesaplanmış profil önerilerini JSON olarak döndürür, tablo yetmiyorsa None"""
+        komsular = self.profil_komsulari.get(profil)
+        if komsular is None or n_recommendations > len(komsular):
+            return None
+        if sutunlar is None and profil in self.profil_tablolari:
+            return json_dizisi(self.profil_tablolari[profil][:n_recommendations]).encode("utf-8")
+        return self.oneri_json(komsular[:n_recommendations], sutunlar)
+
+    def oneri_json(self, indeksler, sutunlar: Optional[List[int]] = None) -> bytes:
+        """Seçilen veri satırlarını JSON dizisi olarak döndürür; mümkünse önceden serileştirilmiş baytlar kullanılır"""
+        if sutunlar is not None:
+            # Yalnızca istenen sütunlar oluşturulur ve serileştirilir
+            return json_dizisi(satirlari_json_olarak(self.veri.iloc[indeksler, sutunlar])).encode("utf-8")
+        if self.satir_jsonlari is not None:
+            return self.satir_jsonlari.json_dizisi(indeksler)
+        return json_dizisi(satirlari_json_olarak(self.veri.iloc[indeksler])).encode("utf-8")
+
+# Yeni yüklenen artefaktlar hizmete girmeden önce çalıştırılan hazırlık adımları (ör. diyet planı çözücüsü)
+_artefakt_hazirlayicilari: List[Callable[[NutritionArtifacts], Any]] = []
+
+def artefakt_hazirlayicisi_ekle(fonksiyon: Callable[[NutritionArtifacts], Any]):
+    """Her yeni artefakt için (yükleme, yeniden yükleme, sürüm etkinleştirme) çalışacak hazırlık adımı ekler"""
+    if fonksiyon not in _artefakt_hazirlayicilari:
+        _artefakt_hazirlayicilari.append(fonksiyon)
+
+def artefaktlari_hazirla(artifacts: NutritionArtifacts):
+    """Hazırlık adımlarını çalıştırır; hata olursa kaydedip devam eder"""
+    for fonksiyon in list(_artefakt_hazirlayicilari):
+        try:
+            fonksiyon(artifacts)
+        except Exception as e:
+            logger.error(f"Artefakt hazırlık adımı başarısız ({fonksiyon.__name__}): {str(e)}")
+
+class NutritionModelRegistry:
+    """
+    Model ve veri setini süreç başına bir kez yükleyip paylaşan kayıt defteri.
+    
+    İstekler `get()` ile o anki anlık görüntüyü kilitsiz okur. Dosyaların
+    mtime/boyut imzası değiştiğinde özet yeniden hesaplanır ve içerik gerçekten
+    değişmişse yeni görüntü arka planda hazırlanıp referans tek adımda değiştirilir.
+    """
+
+    def __init__(self, model_yolu=None, veri_yolu=None, kontrol_araligi: float = 5.0,
+                 profil_en_fazla_oneri: int = 50, indeks_tipi: str = "exact",
+                 indeks_parametreleri: Optional[Dict[str, Any]] = None, model_mmap: bool = True,
+                 satirlari_serilestir: bool = False):
+        self.model_yolu = model_yolu
+        self.veri_yolu = veri_yolu
+        self.kontrol_araligi = kontrol_araligi
+        self.profil_en_fazla_oneri = profil_en_fazla_oneri
+        self.indeks_tipi = indeks_tipi
+        self.indeks_parametreleri = indeks_parametreleri or {}
+        self.model_mmap = model_mmap
+        self.satirlari_serilestir = satirlari_serilestir
+        self._artifacts: Optional[NutritionArtifacts] = None
+        self._yukleme_kilidi = threading.Lock()
+        self._son_kontrol = 0.0
+        self.son_hata: Optional[str] = None
+
+    def _artifact_olustur(self) -> NutritionArtifacts:
+        """Model ve veriyi diskten okuyup yeni bir anlık görüntü oluşturur"""
+        baslangic = time.perf_counter()
+        model_yolu = model_yolunu_bul(self.model_yolu)
+        veri_yolu = veri_yolunu_bul(self.veri_yolu)
+        
+        veri_dosyasi = veri_dosyasini_bul(veri_yolu)
+        
+        # İmzaları yüklemeden önce al; yükleme sırasında dosya değişirse sonraki kontrol yakalar
+        model_imzasi = dosya_imzasi(model_yolu)
+        veri_imzasi = dosya_imzasi(veri_dosyasi)
+        
+        model = model_yukle(model_yolu, mmap_mode='r' if self.model_mmap else None)
+        if model is None:
+            raise RuntimeError(f"Model yüklenemedi: {model_yolu}")
+        veri = veri_yukle(veri_yolu)
+        if veri is None:
+            raise RuntimeError(f"Veri seti yüklenemedi: {veri_yolu}")
+        
+        # Ölçeklenmiş özellik uzayında yapılandırılan arama indeksini kur
+        indeks = indeks_olustur(model.named_steps['knn'], self.indeks_tipi, **self.indeks_parametreleri)
+        
+        # Hazır profillerin önerileri her yüklemede bir kez hesaplanır
+        try:
+            profil_komsulari = profil_komsularini_bul(model, veri, self.profil_en_fazla_oneri, indeks=indeks)
+            profil_tablolari = profil_tablolarini_olustur(veri, profil_komsulari)
+        except Exception as e:
+            logger.error(f"Profil öneri tabloları oluşturulamadı: {str(e)}")
+            profil_komsulari = {}
+            profil_tablolari = {}
+        
+        # Yanıtlarda kullanılacak satır JSON'ları: sütunsal veride diskteki blok paylaşılır,
+        # aksi halde (ayar açıksa) süreç belleğinde bir kez üretilir
+        satir_jsonlari = None
+        try:
+            if isinstance(veri, RecipeStore):
+                satir_jsonlari = PreserializedRows.sutunsal_veriden(veri)
+            if satir_jsonlari is None and self.satirlari_serilestir:
+                satir_jsonlari = PreserializedRows.veriden(veri)
+        except Exception as e:
+            logger.error(f"Satır JSON'ları önceden oluşturulamadı: {str(e)}")
+        
+        return NutritionArtifacts(
+            model=model,
+            veri=veri,
+            model_yolu=model_yolu,
+            veri_yolu=veri_yolu,
+            veri_dosyasi=veri_dosyasi,
+            model_imzasi=model_imzasi,
+            veri_imzasi=veri_imzasi,
+            model_ozeti=dosya_ozeti(model_yolu),
+            veri_ozeti=veri_dosyasi_ozeti(veri_dosyasi),
+            yuklenme_zamani=datetime.now(),
+            yuklenme_suresi=time.perf_counter() - baslangic,
+            indeks=indeks,
+            profil_komsulari=profil_komsulari,
+            profil_tablolari=profil_tablolari,
+            satir_jsonlari=satir_jsonlari,
+            sutun_konumlari=sutun_konumlari_olustur(veri),
+            filtre_indeksi=RecipeFilterIndex(veri)
+        )
+
+    def yukle(self) -> Optional[NutritionArtifacts]:
+        """Model ve veriyi zorla (yeniden) yükler; hata olursa eski görüntü korunur"""
+        with self._yukleme_kilidi:
+            return self._yukle()
+
+    def _yukle(self) -> Optional[NutritionArtifacts]:
+        try:
+            artifacts = self._artifact_olustur()
+        except Exception as e:
+            self.son_hata = str(e)
+            logger.error(f"Model kayıt defteri yükleme hatası: {str(e)}")
+            return self._artifacts
+        
+        # İstek yolundaki yapılar görüntü hizmete girmeden kurulur
+        artefaktlari_hazirla(artifacts)
+        self._artifacts = artifacts
+        self._son_kontrol = time.monotonic()
+        self.son_hata = None
+        logger.info(f"Model kayıt defteri yüklendi: sürüm {artifacts.version}, {artifacts.yuklenme_suresi:.2f} sn")
+        return artifacts
+
+    def _degisti_mi(self, artifacts: NutritionArtifacts) -> bool:
+        """Model veya veri dosyasının içeriğinin değişip değişmediğini kontrol eder"""
+        model_yolu = model_yolunu_bul(self.model_yolu)
+        veri_dosyasi = veri_dosyasini_bul(veri_yolunu_bul(self.veri_yolu))
+        if model_yolu != artifacts.model_yolu or veri_dosyasi != artifacts.veri_dosyasi:
+            return True
+        
+        if (dosya_imzasi(model_yolu) == artifacts.model_imzasi
+                and dosya_imzasi(veri_dosyasi) == artifacts.veri_imzasi):
+            return False
+        
+        # mtime değişti ama içerik aynı olabilir (ör. dosyaya dokunulması); özete bak
+        return (dosya_ozeti(model_yolu) != artifacts.model_ozeti
+                or veri_dosyasi_ozeti(veri_dosyasi) != artifacts.veri_ozeti)
+
+    def _kontrol_et(self):
+        """Kontrol aralığı dolduysa dosyaları kontrol eder, gerekiyorsa yeniden yükler"""
+        simdi = time.monotonic()
+        if simdi - self._son_kontrol < self.kontrol_araligi:
+            return
+        
+        # Aynı anda yalnızca bir istek kontrol/yükleme yapar; diğerleri eski görüntüyle devam eder
+        if not self._yukleme_kilidi.acquire(blocking=False):
+            return
+        try:
+            self._son_kontrol = simdi
+            artifacts = self._artifacts
+            try:
+                degisti = self._degisti_mi(artifacts)
+            except OSError as e:
+                logger.error(f"Model dosyaları kontrol edilemedi: {str(e)}")
+                return
+            if degisti:
+                logger.info("Model veya veri dosyası değişmiş, yeniden yükleniyor")
+                self._yukle()
+        finally:
+            self._yukleme_kilidi.release()
+
+    def get(self) -> Optional[NutritionArtifacts]:
+        """Güncel model ve veri anlık görüntüsünü döndürür, henüz yüklenmemişse yükler"""
+        if self._artifacts is None:
+            with self._yukleme_kilidi:
+                if self._artifacts is None:
+                    self._yukle()
+            return self._artifacts
+        
+        self._kontrol_et()
+        return self._artifacts
+
+    def bilgi(self) -> Dict[str, Any]:
+        """Yüklü artefaktlar hakkında özet bilgi döndürür"""
+        artifacts = self._artifacts
+        if artifacts is None:
+            return {"loaded": False, "last_error": self.son_hata}
+        
+        return {
+            "loaded": True,
+            "version": artifacts.version,
+            "model_version": artifacts.model_ozeti,
+            "data_version": artifacts.veri_ozeti,
+            "model_path": artifacts.model_yolu,
+            "data_path": artifacts.veri_yolu,
+            "data_format": "columnar" if isinstance(artifacts.veri, RecipeStore) else "csv",
+            "rows": len(artifacts.veri),
+            "index": artifacts.indeks.bilgi(),
+            "preserialized_rows_mb": round(len(artifacts.satir_jsonlari.blok) / 1024 / 1024, 1) if artifacts.satir_jsonlari is not None else None,
+            "preserialized_rows_source": artifacts.satir_jsonlari.kaynak if artifacts.satir_jsonlari is not None else None,
+            "loaded_at": artifacts.yuklenme_zamani.isoformat(),
+            "load_duration_seconds": round(artifacts.yuklenme_suresi, 4),
+            "process_memory": surec_bellek_kullanimi(),
+            "last_error": self.son_hata
+        }
+
+    def yuklu_mu(self) -> bool:
+        return self._artifacts is not None
+
+    def kopya(self, model_yolu=None, veri_yolu=None, **degisiklikler) -> "NutritionModelRegistry":
+        """Aynı ayarlarla başka model/veri dosyaları için yeni bir kayıt defteri oluşturur"""
+        ayarlar = dict(
+            model_yolu=model_yolu or self.model_yolu,
+            veri_yolu=veri_yolu or self.veri_yolu,
+            kontrol_araligi=self.kontrol_araligi,
+            profil_en_fazla_oneri=self.profil_en_fazla_oneri,
+            indeks_tipi=self.indeks_tipi,
+            indeks_parametreleri=dict(self.indeks_parametreleri),
+            model_mmap=self.model_mmap,
+            satirlari_serilestir=self.satirlari_serilestir
+        )
+        ayarlar.update(degisiklikler)
+        return NutritionModelRegistry(**ayarlar)
+
+class NutritionModelManager:
+    """
+    Birden çok adlandırılmış model sürümünü yan yana tutan yönetici.
+    
+    Yeni sürümler arka planda yüklenir ve hazır olduklarında etkinleştirilebilir;
+    etkin sürüm ve trafik dağılımı tek bir referans ataması ile değişir. Devam
+    eden istekler aldıkları anlık görüntüyü kullanmaya devam ettiğinden geçiş
+    sırasında istek düşmez. Trafik dağılımı A/B karşılaştırması için sürümlere
+    yüzde olarak istek yönlendirir; kalan yüzde etkin sürüme gider.
+    """
+
+    VARSAYILAN = "default"
+
+    def __init__(self, varsayilan: NutritionModelRegistry):
+        self._kilit = threading.Lock()
+        self._surumler: Dict[str, NutritionModelRegistry] = {self.VARSAYILAN: varsayilan}
+        self._durumlar: Dict[str, Dict[str, Any]] = {self.VARSAYILAN: {"state": "ready"}}
+        self._aktif = self.VARSAYILAN
+        # (sürüm adı, birikimli yüzde) çiftleri; tek atamayla değiştirilir
+        self._dagilim: Tuple[Tuple[str, float], ...] = ()
+        self._istek_sayilari: Dict[str, int] = {}
+
+    @property
+    def aktif(self) -> str:
+        return self._aktif
+
+    def surum_yukle(self, ad: str, model_yolu: str, veri_yolu: Optional[str] = None) -> threading.Thread:
+        """Yeni bir sürümü arka planda yükler; hazır olduğunda kayda eklenir"""
+        with self._kilit:
+            if self._durumlar.get(ad, {}).get("state") == "loading":
+                raise ValueError(f"'{ad}' sürümü zaten yükleniyor")
+            if ad == self._aktif or any(surum == ad for surum, _ in self._dagilim):
+                raise ValueError(f"'{ad}' sürümü kullanımda, önce devreden çıkarın")
+            self._durumlar[ad] = {"state": "loading", "model_path": model_yolu, "data_path": veri_yolu}
+        
+        kayit = self._surumler[self.VARSAYILAN].kopya(model_yolu=model_yolu, veri_yolu=veri_yolu)
+        thread = threading.Thread(target=self._arka_planda_yukle, args=(ad, kayit), name=f"model-load-{ad}", daemon=True)
+        thread.start()
+        return thread
+
+    def _arka_planda_yukle(self, ad: str, kayit: NutritionModelRegistry):
+        baslangic = time.perf_counter()
+        artifacts = kayit.yukle()
+        with self._kilit:
+            if artifacts is None:
+                self._durumlar[ad] = {**self._durumlar[ad], "state": "failed", "error": kayit.son_hata}
+                logger.error(f"Model sürümü yüklenemedi ({ad}): {kayit.son_hata}")
+                return
+            # Yeni sözlük atanır; okuyucular kilit almadan eski ya da yeni sözlüğü görür
+            self._surumler = {**self._surumler, ad: kayit}
+            self._durumlar[ad] = {
+                **self._durumlar[ad],
+                "state": "ready",
+                "load_duration_seconds": round(time.perf_counter() - baslangic, 3)
+            }
+        logger.info(f"Model sürümü yüklendi: {ad} ({artifacts.version})")
+
+    def _hazir_olmali(self, ad: str):
+        if ad not in self._surumler:
+            durum = self._durumlar.get(ad, {}).get("state")
+            raise ValueError(f"'{ad}' sürümü hazır değil" + (f" (durum: {durum})" if durum else ""))
+
+    def aktif_yap(self, ad: str):
+        """Sürümü etkin sürüm yapar"""
+        with self._kilit:
+            self._hazir_olmali(ad)
+            kayit = self._surumler[ad]
+        # İlk istekler kurulum maliyetini ödemesin diye sürüm önce hazırlanır, sonra etkinleşir
+        artifacts = kayit.get()
+        if artifacts is not None:
+            artefaktlari_hazirla(artifacts)
+        with self._kilit:
+            self._hazir_olmali(ad)
+            self._aktif = ad
+        logger.info(f"Etkin model sürümü değişti: {ad}")
+
+    def trafik_dagilimi_ayarla(self, yuzdeler: Dict[str, float]):
+        """Sürümlere yüzde olarak trafik ayırır; kalan yüzde etkin sürüme gider"""
+        if any(yuzde < 0 for yuzde in yuzdeler.values()):
+            raise ValueError("Trafik yüzdeleri negatif olamaz")
+        if sum(yuzdeler.values()) > 100:
+            raise ValueError("Trafik yüzdelerinin toplamı 100'ü geçemez")
+        with self._kilit:
+            for ad in yuzdeler:
+                self._hazir_olmali(ad)
+            birikimli = 0.0
+            dagilim = []
+            for ad, yuzde in yuzdeler.items():
+                if yuzde > 0:
+                    birikimli += yuzde
+                    dagilim.append((ad, birikimli))
+            self._dagilim = tuple(dagilim)
+
+    def surum_kaldir(self, ad: str):
+        """Kullanılmayan bir sürümü bellekten bırakır"""
+        with self._kilit:
+            if ad == self.VARSAYILAN:
+                raise ValueError("Varsayılan sürüm kaldırılamaz")
+            if ad == self._aktif or any(surum == ad for surum, _ in self._dagilim):
+                raise ValueError(f"'{ad}' sürümü kullanımda, önce devreden çıkarın")
+            if ad not in self._surumler and ad not in self._durumlar:
+                raise KeyError(ad)
+            if self._durumlar.get(ad, {}).get("state") == "loading":
+                raise ValueError(f"'{ad}' sürümü hâlâ yükleniyor")
+            self._surumler = {k: v for k, v in self._surumler.items() if k != ad}
+            self._durumlar.pop(ad, None)
+
+    def sec(self) -> Tuple[str, NutritionModelRegistry]:
+        """Trafik dağılımına göre bu isteğe hizmet edecek sürümü seçer"""
+        surumler, dagilim, ad = self._surumler, self._dagilim, self._aktif
+        if dagilim:
+            zar = random.random() * 100
+            for surum, sinir in dagilim:
+                if zar < sinir:
+                    ad = surum
+                    break
+        # Eşzamanlı isteklerde artışlar kaybolmasın diye sayaç kilit altında güncellenir
+        with self._kilit:
+            self._istek_sayilari[ad] = self._istek_sayilari.get(ad, 0) + 1
+        return ad, surumler[ad]
+
+    def get(self) -> Optional[NutritionArtifacts]:
+        """Seçilen sürümün güncel anlık görüntüsünü döndürür"""
+        return self.sec()[1].get()
+
+    def bilgi(self) -> Dict[str, Any]:
+        surumler = self._surumler
+        with self._kilit:
+            istek_sayilari = dict(self._istek_sayilari)
+        return {
+            "active": self._aktif,
+            "traffic_split": {
+                ad: round(sinir - (self._dagilim[i - 1][1] if i else 0), 3)
+                for i, (ad, sinir) in enumerate(self._dagilim)
+            },
+            "versions": {
+                ad: {**durum, **({"info": surumler[ad].bilgi()} if ad in surumler else {})}
+                for ad, durum in self._durumlar.items()
+            },
+            "requests": istek_sayilari
+        }
+
+nutrition_registry = NutritionModelRegistry(
+    model_yolu=settings.NUTRITION_MODEL_PATH,
+    veri_yolu=settings.NUTRITION_DATA_PATH,
+    kontrol_araligi=settings.NUTRITION_RELOAD_CHECK_SECONDS,
+    profil_en_fazla_oneri=settings.NUTRITION_PROFILE_MAX_RECOMMENDATIONS,
+    indeks_tipi=settings.NUTRITION_INDEX_BACKEND,
+    indeks_parametreleri={"nlist": settings.NUTRITION_IVF_NLIST, "nprobe": settings.NUTRITION_IVF_NPROBE},
+    model_mmap=settings.NUTRITION_MODEL_MMAP,
+    satirlari_serilestir=settings.NUTRITION_PRESERIALIZE_ROWS
+)
+
+nutrition_models = NutritionModelManager(nutrition_registry)
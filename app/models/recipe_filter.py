@@ -0,0 +1,246 @@
+"""
+Diet App API - Recipe Filter
+
+Öneri aramalarında kullanılan tarif filtreleri.
+
+Sayısal aralıklar doğrudan sütun dizileri üzerinde, anahtar kelime ve öğün
+koşulları ise kelime -> satır listesi ters indeksi üzerinden değerlendirilir.
+Sonuç, komşu aramasına ön filtre olarak verilen bir bit maskesidir.
+"""
+
+import re
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Loglama ayarları
+logger = logging.getLogger(__name__)
+
+KELIME_DESENI = re.compile(r"[^\W\d_]+")
+# Rakamları da koruyan desen ("< 30 Mins" ile "< 60 Mins" ayrı kalsın)
+TERIM_DESENI = re.compile(r"[^\W_]+")
+
+# Anahtar kelime aramasında bakılan metin sütunları
+ANAHTAR_KELIME_SUTUNLARI = ("Name", "RecipeCategory", "Keywords", "RecipeIngredientParts")
+# Öğün tipi yalnızca kategori ve etiketlerden belirlenir
+OGUN_SUTUNLARI = ("RecipeCategory", "Keywords")
+
+# R'den aktarılmış vektör metinleri: c("a", "b"); boş vektör character(0)
+R_VEKTOR_DESENI = re.compile(r"^\s*c\((.*)\)\s*$", re.S)
+R_BOS_VEKTOR = "character(0)"
+
+def r_vektorunu_ac(metin: str) -> str:
+    """R biçimindeki c(...) sarmalayıcısını kaldırır ("c" terim olarak indekse girmesin)"""
+    eslesme = R_VEKTOR_DESENI.match(metin)
+    if eslesme:
+        return eslesme.group(1)
+    return "" if metin.strip() == R_BOS_VEKTOR else metin
+
+def kelimelere_ayir(metin) -> List[str]:
+    """Metni küçük harfli kelimelere ayırır"""
+    if not metin or not isinstance(metin, str):
+        return []
+    return KELIME_DESENI.findall(r_vektorunu_ac(metin).lower())
+
+def terimlere_ayir(metin) -> List[str]:
+    """Metni küçük harfli harf/rakam dizilerine ayırır"""
+    if not metin or not isinstance(metin, str):
+        return []
+    return TERIM_DESENI.findall(r_vektorunu_ac(metin).lower())
+
+def metin_sutunu(veri, ad: str) -> List[Optional[str]]:
+    """DataFrame veya RecipeStore'dan metin sütununun tüm değerlerini döndürür"""
+    if hasattr(veri, "metin"):
+        return veri.metin(ad)
+    return veri[ad].tolist()
+
+def sayisal_sutun(veri, ad: str) -> np.ndarray:
+    """DataFrame veya RecipeStore'dan sayısal sütunu kopyalamadan döndürür"""
+    if hasattr(veri, "sayisal"):
+        return veri.sayisal(ad)
+    return veri[ad].to_numpy()
+
+def satir_kayitlari(veri, indeksler, sutunlar: Sequence[str]) -> List[Dict[str, Any]]:
+    """Satırların istenen sütunlarını, boş değerler None olacak şekilde sözlük listesi olarak döndürür
+    
+    DataFrame oluşturulmaz; yalnızca istenen hücreler sütun sütun okunur.
+    """
+    indeksler = np.asarray(indeksler, dtype=np.int64)
+    sutunlar = [s for s in sutunlar if s in veri.columns]
+    degerler = []
+    for ad in sutunlar:
+        if hasattr(veri, "sayisal") and not veri.sayisal_mi(ad):
+            degerler.append(veri.metin(ad, indeksler))
+            continue
+        sutun = sayisal_sutun(veri, ad)[indeksler]
+        bos = pd.isna(sutun)
+        degerler.append([None if b else d for d, b in zip(sutun.tolist(), bos.tolist())])
+    return [dict(zip(sutunlar, satir)) for satir in zip(*degerler)]
+
+class SortedColumnIndex:
+    """
+    Sayısal bir sütuna göre sıralanmış satır numaraları.
+
+    Değer aralığına düşen satırlar searchsorted ile bulunan bitişik bir
+    dilimdir; aralıktan rastgele seçim, dilim içinde tam sayı ofsetiyle yapılır.
+    Boş (NaN) değerli satırlar indekse alınmaz.
+    """
+
+    def __init__(self, degerler):
+        degerler = np.asarray(degerler, dtype=float)
+        gecerli = np.flatnonzero(np.isfinite(degerler))
+        sira = np.argsort(degerler[gecerli], kind="stable")
+        self.satirlar = gecerli[sira]
+        self.degerler = degerler[self.satirlar]
+
+    def __len__(self):
+        return len(self.satirlar)
+
+    def aralik(self, en_az: Optional[float] = None, en_cok: Optional[float] = None,
+               alt_dahil: bool = True) -> Tuple[int, int]:
+        """[en_az, en_cok] aralığındaki satırların sıralı dizideki [baş, son) konumları"""
+        bas = 0 if en_az is None else int(np.searchsorted(self.degerler, en_az, side="left" if alt_dahil else "right"))
+        son = len(self.degerler) if en_cok is None else int(np.searchsorted(self.degerler, en_cok, side="right"))
+        return bas, max(bas, son)
+
+    def rastgele(self, bas: int, son: int, n: int, rng, yerine_koyarak: bool = False) -> np.ndarray:
+        """[baş, son) diliminden `n` rastgele satır numarası seçer"""
+        adet = son - bas
+        if adet <= 0 or n <= 0:
+            return np.empty(0, dtype=np.int64)
+        if yerine_koyarak:
+            return self.satirlar[bas + rng.integers(0, adet, size=n)]
+        return self.satirlar[bas + rng.choice(adet, size=min(n, adet), replace=False)]
+
+class KeywordIndex:
+    """
+    Kelime -> sıralı satır numaraları ters indeksi.
+
+    Bir ifade, tüm kelimelerini içeren satırlarla eşleşir; böylece
+    "high protein" gibi çok kelimeli etiketler de aranabilir.
+    """
+
+    def __init__(self, veri, sutunlar: Sequence[str], ayirici: Callable[[str], List[str]] = kelimelere_ayir):
+        self.ayirici = ayirici
+        kelime_kimlikleri: Dict[str, int] = {}
+        kelimeler = []
+        satirlar = []
+        for ad in sutunlar:
+            if ad not in veri.columns:
+                continue
+            for satir, metin in enumerate(metin_sutunu(veri, ad)):
+                for kelime in ayirici(metin):
+                    kimlik = kelime_kimlikleri.setdefault(kelime, len(kelime_kimlikleri))
+                    kelimeler.append(kimlik)
+                    satirlar.append(satir)
+
+        kelimeler = np.asarray(kelimeler, dtype=np.int64)
+        satirlar = np.asarray(satirlar, dtype=np.int32)
+        # Önce kelimeye, sonra satıra göre sırala; tekrar eden (kelime, satır) çiftlerini at
+        sira = np.lexsort((satirlar, kelimeler))
+        kelimeler, satirlar = kelimeler[sira], satirlar[sira]
+        if len(kelimeler):
+            tekil = np.ones(len(kelimeler), dtype=bool)
+            tekil[1:] = (kelimeler[1:] != kelimeler[:-1]) | (satirlar[1:] != satirlar[:-1])
+            kelimeler, satirlar = kelimeler[tekil], satirlar[tekil]
+
+        self.satirlar = satirlar
+        self.baslangic = np.searchsorted(kelimeler, np.arange(len(kelime_kimlikleri) + 1))
+        self.kelime_kimlikleri = kelime_kimlikleri
+        self.satir_sayisi = len(veri)
+
+    def __len__(self):
+        return len(self.kelime_kimlikleri)
+
+    def kelime_satirlari(self, kelime: str) -> np.ndarray:
+        """Kelimeyi içeren satırların sıralı numaralarını döndürür"""
+        kimlik = self.kelime_kimlikleri.get(kelime)
+        if kimlik is None:
+            return np.empty(0, dtype=np.int32)
+        return self.satirlar[self.baslangic[kimlik]:self.baslangic[kimlik + 1]]
+
+    def ifade_satirlari(self, ifade: str) -> np.ndarray:
+        """İfadedeki tüm kelimeleri içeren satırları döndürür"""
+        kelimeler = self.ayirici(ifade)
+        if not kelimeler:
+            return np.empty(0, dtype=np.int32)
+        # En kısa listeden başlayarak kesişim al
+        listeler = sorted((self.kelime_satirlari(k) for k in kelimeler), key=len)
+        sonuc = listeler[0]
+        for liste in listeler[1:]:
+            if len(sonuc) == 0:
+                break
+            sonuc = np.intersect1d(sonuc, liste, assume_unique=True)
+        return sonuc
+
+    def maske(self, ifadeler: Iterable[str]) -> np.ndarray:
+        """İfadelerden en az birini içeren satırlar için True olan maske döndürür"""
+        maske = np.zeros(self.satir_sayisi, dtype=bool)
+        for ifade in ifadeler:
+            maske[self.ifade_satirlari(ifade)] = True
+        return maske
+
+class RecipeFilterIndex:
+    """
+    Veri seti için filtre maskeleri üreten yardımcı.
+
+    Ters indeksler ilk filtreli sorguda kurulur; aynı filtre tekrarlandığında
+    maske küçük bir LRU önbellekten döndürülür.
+    """
+
+    def __init__(self, veri, onbellek_boyutu: int = 128):
+        self.veri = veri
+        self.satir_sayisi = len(veri)
+        self.onbellek_boyutu = onbellek_boyutu
+        self._kelime_indeksi: Optional[KeywordIndex] = None
+        self._ogun_indeksi: Optional[KeywordIndex] = None
+        self._kilit = threading.Lock()
+        self._maskeler: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+    def indeksleri_hazirla(self):
+        """Anahtar kelime ve öğün ters indekslerini (henüz yoksa) kurar"""
+        with self._kilit:
+            if self._kelime_indeksi is None:
+                self._kelime_indeksi = KeywordIndex(self.veri, ANAHTAR_KELIME_SUTUNLARI)
+                self._ogun_indeksi = KeywordIndex(self.veri, OGUN_SUTUNLARI)
+                logger.info(f"Tarif filtre indeksleri oluşturuldu: {len(self._kelime_indeksi)} kelime")
+
+    def maske(self, anahtar: str, araliklar: Dict[str, Tuple[Optional[float], Optional[float]]],
+              icermeli: Sequence[str] = (), icermemeli: Sequence[str] = (),
+              ogun_ifadeleri: Sequence[str] = ()) -> np.ndarray:
+        """Tüm koşulları sağlayan satırlar için True olan maske döndürür"""
+        with self._kilit:
+            maske = self._maskeler.get(anahtar)
+            if maske is not None:
+                self._maskeler.move_to_end(anahtar)
+                return maske
+
+        maske = np.ones(self.satir_sayisi, dtype=bool)
+        for sutun, (en_az, en_cok) in araliklar.items():
+            degerler = sayisal_sutun(self.veri, sutun)
+            # Boş (NaN) değerler karşılaştırmada False döner, yani elenir
+            if en_az is not None:
+                maske &= degerler >= en_az
+            if en_cok is not None:
+                maske &= degerler <= en_cok
+
+        if icermeli or icermemeli or ogun_ifadeleri:
+            self.indeksleri_hazirla()
+            # Her istenen kelime/ifade bulunmalı
+            for ifade in icermeli:
+                maske &= self._kelime_indeksi.maske([ifade])
+            if icermemeli:
+                maske &= ~self._kelime_indeksi.maske(icermemeli)
+            if ogun_ifadeleri:
+                maske &= self._ogun_indeksi.maske(ogun_ifadeleri)
+
+        maske.setflags(write=False)
+        with self._kilit:
+            self._maskeler[anahtar] = maske
+            if len(self._maskeler) > self.onbellek_boyutu:
+                self._maskeler.popitem(last=False)
+        return maske
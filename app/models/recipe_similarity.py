@@ -0,0 +1,410 @@
+"""
+Diet App API - Recipe Similarity
+
+Tarif malzemelerinden kurulan TF-IDF benzerlik indeksi.
+
+Vektörleştirici bir kez eğitilir; L2 normalize edilmiş seyrek TF-IDF matrisi
+ve vektörleştirici CSV'nin yanındaki `<ad>_tfidf/` dizinine yazılır. Satırlar
+normalize olduğundan kosinüs benzerliği tek bir seyrek matris çarpımıdır.
+Kaynak CSV değişmedikçe açılışta yalnızca bu dosyalar okunur.
+
+İsteğe bağlı olarak her tarifin en benzer `k` tarifi çevrimdışı hesaplanıp
+aynı dizine `int32` indeks ve `float16` skor dizileri olarak yazılır
+(script/build_recipe_neighbours.py). Tablo mmap ile açılır ve benzer tarif
+sorgusu tek bir satır dilimine dönüşür.
+"""
+
+import os
+import json
+import uuid
+import hashlib
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Sequence, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from app.models.recipe_store import kaynak_imzasi, sutunsal_veri_ac
+
+# Loglama ayarları
+logger = logging.getLogger(__name__)
+
+FORMAT_SURUMU = 2
+META_DOSYASI = "meta.json"
+MATRIS_DOSYASI = "matrix.npz"
+VEKTORLESTIRICI_DOSYASI = "vectorizer.joblib"
+MALZEME_SUTUNU = "RecipeIngredientParts"
+KOMSU_META_DOSYASI = "neighbours.json"
+KOMSU_INDEKS_DOSYASI = "neighbours_indices.npy"
+KOMSU_SKOR_DOSYASI = "neighbours_scores.npy"
+# Tablo oluşturulurken bir parçada tutulan yoğun benzerlik matrisinin en fazla eleman sayısı
+PARCA_ELEMAN_SINIRI = 2 ** 25
+
+BIRLESTIRMELER = ("mean", "sum", "max")
+
+def en_iyi_k(skorlar: np.ndarray, k: int, esitlik_anahtari: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    En yüksek `k` skorun konumlarını azalan sırada döndürür.
+
+    Tüm diziyi sıralamak yerine argpartition ile k aday seçilir, yalnızca
+    onlar sıralanır. Eşit skorlarda `esitlik_anahtari` küçük olan önce gelir.
+    """
+    k = min(k, len(skorlar))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < len(skorlar):
+        secilen = np.argpartition(-skorlar, k - 1)[:k]
+        # argpartition sınırdaki eşit skorlardan herhangi birini seçebilir; sınır skoruna eşit olanların hepsi aday kalır
+        esik = skorlar[secilen].min()
+        if np.count_nonzero(skorlar >= esik) > k:
+            secilen = np.flatnonzero(skorlar >= esik)
+    else:
+        secilen = np.arange(len(skorlar))
+    anahtar = esitlik_anahtari[secilen] if esitlik_anahtari is not None else secilen
+    return secilen[np.lexsort((anahtar, -skorlar[secilen]))][:k]
+
+def benzerlik_dizini(veri_yolu: str) -> str:
+    """CSV dosyasının yanındaki TF-IDF indeks dizininin yolunu döndürür"""
+    return os.path.splitext(veri_yolu)[0] + "_tfidf"
+
+def malzeme_metinleri(veri_yolu: str) -> list:
+    """Malzeme sütununu (varsa sütunsal kopyadan) okur"""
+    store = sutunsal_veri_ac(veri_yolu)
+    if store is not None:
+        return [metin or "" for metin in store.metin(MALZEME_SUTUNU)]
+    return pd.read_csv(veri_yolu, usecols=[MALZEME_SUTUNU])[MALZEME_SUTUNU].fillna("").tolist()
+
+def metin_ozeti(metinler: Sequence[str]) -> str:
+    """Malzeme metinlerinin sırayla özetini döndürür (artımlı eklemede eski satırların değişmediğini doğrulamak için)"""
+    ozet = hashlib.sha256()
+    for metin in metinler:
+        ozet.update((metin or "").encode("utf-8"))
+        ozet.update(b"\x00")
+    return ozet.hexdigest()
+
+def _meta_yaz(dizin: str, dosya: str, meta: dict):
+    # Meta dosyası en son yazılır; yarım kalan çıktı yükleyici tarafından kullanılmaz
+    gecici = os.path.join(dizin, dosya + ".tmp")
+    with open(gecici, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    os.replace(gecici, os.path.join(dizin, dosya))
+
+def _matrisi_kaydet(veri_yolu: str, hedef_dizin: str, matris, vektorlestirici, metinler, **ek_meta) -> dict:
+    sparse.save_npz(os.path.join(hedef_dizin, MATRIS_DOSYASI), matris, compressed=False)
+    joblib.dump(vektorlestirici, os.path.join(hedef_dizin, VEKTORLESTIRICI_DOSYASI))
+    meta = {
+        "format_version": FORMAT_SURUMU,
+        "build_id": uuid.uuid4().hex,
+        "rows": matris.shape[0],
+        "terms": matris.shape[1],
+        "source": os.path.abspath(veri_yolu),
+        "source_signature": kaynak_imzasi(veri_yolu) if os.path.exists(veri_yolu) else None,
+        "text_digest": metin_ozeti(metinler),
+        **ek_meta
+    }
+    _meta_yaz(hedef_dizin, META_DOSYASI, meta)
+    return meta
+
+def tfidf_indeksi_olustur(veri_yolu: str, metinler: Optional[Sequence[str]] = None,
+                          hedef_dizin: Optional[str] = None) -> str:
+    """Vektörleştiriciyi eğitir, normalize TF-IDF matrisini ve vektörleştiriciyi diske yazar"""
+    hedef_dizin = hedef_dizin or benzerlik_dizini(veri_yolu)
+    os.makedirs(hedef_dizin, exist_ok=True)
+    if metinler is None:
+        metinler = malzeme_metinleri(veri_yolu)
+
+    vektorlestirici = TfidfVectorizer(stop_words="english", norm="l2", dtype=np.float32)
+    matris = vektorlestirici.fit_transform(metinler).tocsr()
+    matris.sort_indices()
+
+    _matrisi_kaydet(veri_yolu, hedef_dizin, matris, vektorlestirici, metinler)
+    logger.info(f"TF-IDF benzerlik indeksi yazıldı: {hedef_dizin} ({matris.shape[0]} tarif, {matris.shape[1]} terim)")
+    return hedef_dizin
+
+def tfidf_indeksine_ekle(veri_yolu: str, hedef_dizin: Optional[str] = None) -> Tuple[str, bool]:
+    """
+    CSV'nin sonuna eklenen tarifleri mevcut vektörleştiriciyle indekse ekler.
+
+    Eski satırların metni değişmediyse yalnızca yeni satırlar dönüştürülür;
+    aksi halde indeks baştan oluşturulur. (dizin, artımlı_mı) döndürür.
+    Yeni tariflerde geçen ama sözlükte olmayan malzemeler yok sayılır; sözlüğün
+    yenilenmesi için zaman zaman tam oluşturma yapılmalıdır.
+    """
+    hedef_dizin = hedef_dizin or benzerlik_dizini(veri_yolu)
+    metinler = malzeme_metinleri(veri_yolu)
+    try:
+        indeks = RecipeSimilarityIndex(hedef_dizin)
+    except Exception as e:
+        logger.info(f"Mevcut TF-IDF indeksi açılamadı, baştan oluşturulacak: {str(e)}")
+        return tfidf_indeksi_olustur(veri_yolu, metinler, hedef_dizin), False
+
+    eski_satir = len(indeks)
+    if len(metinler) < eski_satir or metin_ozeti(metinler[:eski_satir]) != indeks.meta.get("text_digest"):
+        logger.info("Mevcut tarifler değişmiş, TF-IDF indeksi baştan oluşturulacak")
+        return tfidf_indeksi_olustur(veri_yolu, metinler, hedef_dizin), False
+
+    yeni = indeks.vektorlestirici.transform(metinler[eski_satir:]).astype(np.float32)
+    matris = sparse.vstack([indeks.matris, yeni], format="csr")
+    matris.sort_indices()
+    _matrisi_kaydet(
+        veri_yolu, hedef_dizin, matris, indeks.vektorlestirici, metinler,
+        appended_from=indeks.meta.get("build_id"), previous_rows=eski_satir
+    )
+    logger.info(f"TF-IDF indeksine {len(metinler) - eski_satir} tarif eklendi: {hedef_dizin}")
+    return hedef_dizin, True
+
+class RecipeSimilarityIndex:
+    """
+    Diske yazılmış TF-IDF indeksinin bellekteki hali.
+
+    Benzerlik, sorgu satırlarının tüm katalogla seyrek çarpımıdır; yalnızca
+    ortak malzemesi olan tarifler için değer üretilir.
+    """
+
+    def __init__(self, dizin: str):
+        self.dizin = dizin
+        with open(os.path.join(dizin, META_DOSYASI), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        if self.meta.get("format_version") != FORMAT_SURUMU:
+            raise ValueError(f"Desteklenmeyen TF-IDF indeks sürümü: {self.meta.get('format_version')}")
+        self.matris = sparse.load_npz(os.path.join(dizin, MATRIS_DOSYASI)).tocsr()
+        # Satır x katalog çarpımında sağ taraf CSC olarak hazır tutulur (transpoz kopyasız)
+        self._matris_t = self.matris.T
+        self._vektorlestirici = None
+        self._kilit = threading.Lock()
+        self.komsu_tablosu = komsu_tablosu_ac(dizin, self.meta)
+
+    def __len__(self):
+        return self.matris.shape[0]
+
+    @property
+    def vektorlestirici(self) -> TfidfVectorizer:
+        """Serbest metin sorguları için vektörleştirici (ilk kullanımda yüklenir)"""
+        with self._kilit:
+            if self._vektorlestirici is None:
+                self._vektorlestirici = joblib.load(os.path.join(self.dizin, VEKTORLESTIRICI_DOSYASI))
+            return self._vektorlestirici
+
+    def benzerlikler(self, satirlar: sparse.csr_matrix) -> sparse.csr_matrix:
+        """Verilen TF-IDF satırlarının tüm tariflerle kosinüs benzerliği (seyrek)"""
+        return (satirlar @ self._matris_t).tocsr()
+
+    def benzerler(self, indeks: int, n: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        """Tarife en çok benzeyen `n` tarifin indekslerini ve skorlarını döndürür (kendisi hariç)"""
+        # Önceden hesaplanmış tablo yeterliyse yalnızca satır dilimi okunur
+        if self.komsu_tablosu is not None and n <= self.komsu_tablosu.k:
+            return self.komsu_tablosu.komsular(indeks, n)
+        return self.cok_tohumlu_benzerler([indeks], n)
+
+    def cok_tohumlu_benzerler(self, tohumlar: Sequence[int], n: int = 5,
+                              birlestirme: str = "mean") -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Birden çok tarife birlikte en çok benzeyen `n` tarifi döndürür.
+
+        Tüm tohumların benzerlikleri tek seyrek çarpımla hesaplanır ve tarif
+        başına birleştirilir (mean, sum veya max); tohumların kendisi sonuçtan çıkarılır.
+        """
+        if birlestirme not in BIRLESTIRMELER:
+            raise ValueError(f"Bilinmeyen birleştirme yöntemi: {birlestirme}")
+        tohumlar = np.unique(np.asarray(tohumlar, dtype=np.int64))
+        benzerlik = self.benzerlikler(self.matris[tohumlar])
+
+        # Yalnızca en az bir tohumla ortak malzemesi olan tarifler aday olur
+        if birlestirme == "max":
+            birlesik = benzerlik.max(axis=0).tocsr()
+        else:
+            birlesik = sparse.csr_matrix(np.ones((1, len(tohumlar)), dtype=benzerlik.dtype)) @ benzerlik
+            if birlestirme == "mean":
+                birlesik = birlesik / len(tohumlar)
+        birlesik = sparse.csr_matrix(birlesik)
+        adaylar, skorlar = birlesik.indices, birlesik.data
+
+        gorulmemis = ~np.isin(adaylar, tohumlar, assume_unique=True)
+        adaylar, skorlar = adaylar[gorulmemis], skorlar[gorulmemis]
+        sira = en_iyi_k(skorlar, n, adaylar)
+        return adaylar[sira], skorlar[sira]
+
+class RecipeNeighbourTable:
+    """
+    Her tarifin en benzer `k` tarifinin mmap ile açılan tablosu.
+
+    Satır i, tarif i'nin komşularını azalan skorla tutar; `k`'dan az komşusu
+    olan satırlar -1 ile doldurulur.
+    """
+
+    def __init__(self, dizin: str, meta: dict):
+        self.meta = meta
+        self.k = meta["k"]
+        self.indeksler = np.load(os.path.join(dizin, KOMSU_INDEKS_DOSYASI), mmap_mode="r")
+        self.skorlar = np.load(os.path.join(dizin, KOMSU_SKOR_DOSYASI), mmap_mode="r")
+
+    def __len__(self):
+        return self.indeksler.shape[0]
+
+    def komsular(self, indeks: int, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        indeksler = np.asarray(self.indeksler[indeks, :n])
+        gecerli = indeksler >= 0
+        return indeksler[gecerli].astype(np.int64), np.asarray(self.skorlar[indeks, :n], dtype=np.float32)[gecerli]
+
+def komsu_tablosu_ac(dizin: str, tfidf_meta: dict) -> Optional[RecipeNeighbourTable]:
+    """TF-IDF indeksinin bu yapısından üretilmiş bir komşu tablosu varsa açar"""
+    meta_yolu = os.path.join(dizin, KOMSU_META_DOSYASI)
+    if not os.path.exists(meta_yolu):
+        return None
+    try:
+        with open(meta_yolu, encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("tfidf_build_id") != tfidf_meta.get("build_id"):
+            logger.warning(f"Komşu tablosu TF-IDF indeksinden eski, kullanılmayacak: {dizin}")
+            return None
+        return RecipeNeighbourTable(dizin, meta)
+    except Exception as e:
+        logger.error(f"Komşu tablosu açılamadı ({dizin}): {str(e)}")
+        return None
+
+def _parca_en_iyi_k(skorlar: np.ndarray, adaylar: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Her satırın en yüksek `k` skorunu (satır bazında vektörel) seçip azalan sırada döndürür"""
+    k_etkin = min(k, skorlar.shape[1])
+    indeksler = np.full((skorlar.shape[0], k), -1, dtype=np.int32)
+    sonuc_skor = np.zeros((skorlar.shape[0], k), dtype=np.float16)
+    if k_etkin == 0:
+        return indeksler, sonuc_skor
+    secilen = np.argpartition(-skorlar, k_etkin - 1, axis=1)[:, :k_etkin]
+    secilen_skor = np.take_along_axis(skorlar, secilen, axis=1)
+    sira = np.argsort(-secilen_skor, axis=1, kind="stable")
+    secilen = np.take_along_axis(secilen, sira, axis=1)
+    secilen_skor = np.take_along_axis(secilen_skor, sira, axis=1)
+    secilen_aday = np.take_along_axis(adaylar, secilen, axis=1) if adaylar.ndim == 2 else adaylar[secilen]
+
+    # Ortak malzemesi olmayan (skor <= 0) adaylar komşu sayılmaz
+    gecerli = secilen_skor > 0
+    indeksler[:, :k_etkin] = np.where(gecerli, secilen_aday, -1)
+    sonuc_skor[:, :k_etkin] = np.where(gecerli, secilen_skor, 0)
+    return indeksler, sonuc_skor
+
+# Komşu tablosu süreçlerinde yüklenen matris
+_isci_matrisi = None
+
+def _komsu_iscisi_baslat(dizin: str):
+    global _isci_matrisi
+    _isci_matrisi = sparse.load_npz(os.path.join(dizin, MATRIS_DOSYASI)).tocsr()
+
+def _parca_komsulari(bas: int, son: int, k: int, aday_bas: int = 0):
+    """[bas, son) satırlarının [aday_bas, N) tarifleri arasındaki en benzer `k` komşusu"""
+    matris = _isci_matrisi
+    skorlar = (matris[bas:son] @ matris[aday_bas:].T).toarray()
+    # Tarifin kendisi aday olamaz
+    satirlar = np.arange(bas, son)
+    kendisi = satirlar >= aday_bas
+    skorlar[np.nonzero(kendisi)[0], satirlar[kendisi] - aday_bas] = -np.inf
+    return bas, _parca_en_iyi_k(skorlar, np.arange(aday_bas, matris.shape[0], dtype=np.int32), k)
+
+def komsu_tablosu_olustur(dizin: str, k: int = 50, is_sayisi: Optional[int] = None,
+                          parca_boyutu: Optional[int] = None, artimli: bool = True) -> Tuple[str, bool]:
+    """
+    Dizindeki TF-IDF indeksi için her tarifin en benzer `k` tarifini hesaplayıp yazar.
+
+    Satırlar parçalara bölünür ve süreç havuzunda paralel işlenir; her parça
+    yoğun skor matrisi üzerinde satır bazında argpartition ile seçilir.
+    İndeks `tfidf_indeksine_ekle` ile büyütüldüyse ve eski tablo önceki yapıya
+    aitse yalnızca yeni tarifler hesaplanır, eski satırlar yeni tariflerle
+    birleştirilir. (dizin, artımlı_mı) döndürür.
+    """
+    with open(os.path.join(dizin, META_DOSYASI), encoding="utf-8") as f:
+        tfidf_meta = json.load(f)
+    satir_sayisi = tfidf_meta["rows"]
+    is_sayisi = is_sayisi or os.cpu_count() or 1
+    parca_boyutu = parca_boyutu or max(1, min(1024, PARCA_ELEMAN_SINIRI // max(satir_sayisi, 1)))
+
+    eski = None
+    if artimli and tfidf_meta.get("appended_from"):
+        eski_meta_yolu = os.path.join(dizin, KOMSU_META_DOSYASI)
+        if os.path.exists(eski_meta_yolu):
+            with open(eski_meta_yolu, encoding="utf-8") as f:
+                eski_meta = json.load(f)
+            if (eski_meta.get("tfidf_build_id") == tfidf_meta["appended_from"]
+                    and eski_meta.get("rows") == tfidf_meta.get("previous_rows")
+                    and eski_meta.get("k") == k):
+                eski = RecipeNeighbourTable(dizin, eski_meta)
+    eski_satir = len(eski) if eski is not None else 0
+
+    gecici_indeks = os.path.join(dizin, KOMSU_INDEKS_DOSYASI + ".tmp")
+    gecici_skor = os.path.join(dizin, KOMSU_SKOR_DOSYASI + ".tmp")
+    indeksler = np.lib.format.open_memmap(gecici_indeks, mode="w+", dtype=np.int32, shape=(satir_sayisi, k))
+    skorlar = np.lib.format.open_memmap(gecici_skor, mode="w+", dtype=np.float16, shape=(satir_sayisi, k))
+
+    # Yeni (ya da tam oluşturmada tüm) satırlar: tüm katalogla karşılaştırılır
+    isler = [(bas, min(bas + parca_boyutu, satir_sayisi), k, 0)
+             for bas in range(eski_satir, satir_sayisi, parca_boyutu)]
+    # Eski satırlar: yalnızca yeni tariflerle karşılaştırılıp mevcut komşularla birleştirilir
+    eski_isler = [(bas, min(bas + parca_boyutu, eski_satir), k, eski_satir)
+                  for bas in range(0, eski_satir, parca_boyutu)] if eski_satir < satir_sayisi else []
+
+    with ProcessPoolExecutor(
+        max_workers=is_sayisi,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_komsu_iscisi_baslat,
+        initargs=(dizin,)
+    ) as havuz:
+        for bas, (parca_indeks, parca_skor) in havuz.map(_parca_komsulari_arg, isler):
+            indeksler[bas:bas + len(parca_indeks)] = parca_indeks
+            skorlar[bas:bas + len(parca_indeks)] = parca_skor
+        for bas, (yeni_indeks, yeni_skor) in havuz.map(_parca_komsulari_arg, eski_isler):
+            son = bas + len(yeni_indeks)
+            eski_indeks = np.asarray(eski.indeksler[bas:son])
+            eski_skor = np.where(eski_indeks >= 0, np.asarray(eski.skorlar[bas:son], dtype=np.float32), -np.inf)
+            aday_skor = np.hstack([eski_skor, np.where(yeni_indeks >= 0, yeni_skor.astype(np.float32), -np.inf)])
+            aday_indeks = np.hstack([eski_indeks, yeni_indeks])
+            parca_indeks, parca_skor = _parca_en_iyi_k(aday_skor, aday_indeks, k)
+            indeksler[bas:son] = parca_indeks
+            skorlar[bas:son] = parca_skor
+        if eski_satir and eski_satir == satir_sayisi:
+            indeksler[:] = eski.indeksler
+            skorlar[:] = eski.skorlar
+
+    indeksler.flush()
+    skorlar.flush()
+    del indeksler, skorlar, eski
+    os.replace(gecici_indeks, os.path.join(dizin, KOMSU_INDEKS_DOSYASI))
+    os.replace(gecici_skor, os.path.join(dizin, KOMSU_SKOR_DOSYASI))
+    _meta_yaz(dizin, KOMSU_META_DOSYASI, {
+        "k": k,
+        "rows": satir_sayisi,
+        "tfidf_build_id": tfidf_meta["build_id"],
+        "incremental_from_rows": eski_satir or None
+    })
+    logger.info(f"Komşu tablosu yazıldı: {dizin} ({satir_sayisi} tarif, k={k}, artımlı: {bool(eski_satir)})")
+    return dizin, bool(eski_satir)
+
+def _parca_komsulari_arg(is_tanimi):
+    return _parca_komsulari(*is_tanimi)
+
+def benzerlik_indeksi_ac(veri_yolu: str) -> Optional[RecipeSimilarityIndex]:
+    """CSV'nin yanında güncel bir TF-IDF indeksi varsa açar, yoksa None döndürür"""
+    dizin = benzerlik_dizini(veri_yolu)
+    meta_yolu = os.path.join(dizin, META_DOSYASI)
+    if not os.path.exists(meta_yolu):
+        return None
+    try:
+        with open(meta_yolu, encoding="utf-8") as f:
+            meta = json.load(f)
+        if os.path.exists(veri_yolu) and kaynak_imzasi(veri_yolu) != meta.get("source_signature"):
+            logger.warning(f"TF-IDF indeksi kaynak CSV'den eski, yeniden oluşturulmalı: {dizin}")
+            return None
+        return RecipeSimilarityIndex(dizin)
+    except Exception as e:
+        logger.error(f"TF-IDF indeksi açılamadı ({dizin}): {str(e)}")
+        return None
+
+def benzerlik_indeksi_yukle(veri_yolu: str, metinler: Optional[Sequence[str]] = None) -> RecipeSimilarityIndex:
+    """Güncel indeksi açar; yoksa veya eskiyse oluşturup diske yazar"""
+    indeks = benzerlik_indeksi_ac(veri_yolu)
+    if indeks is None:
+        indeks = RecipeSimilarityIndex(tfidf_indeksi_olustur(veri_yolu, metinler))
+    return indeks
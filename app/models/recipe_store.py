@@ -0,0 +1,255 @@
+"""
+Diet App API - Recipe Store
+
+Tarif veri setinin bellek eşlemeli (mmap) sütunsal formatı.
+
+CSV bir kez dönüştürülür; sayısal sütunlar ayrı `.npy` dosyalarına, metin
+sütunları ise UTF-8 bayt bloğu + ofset dizisi olarak yazılır. Yükleyici
+dosyaları mmap ile açtığından aynı makinedeki tüm worker süreçleri aynı
+sayfa önbelleğini paylaşır ve açılışta CSV ayrıştırılmaz.
+"""
+
+import os
+import json
+import hashlib
+import logging
+import numpy as np
+import pandas as pd
+from typing import List, Optional, Sequence
+
+# Loglama ayarları
+logger = logging.getLogger(__name__)
+
+FORMAT_SURUMU = 1
+META_DOSYASI = "meta.json"
+# Satırların API yanıtındaki JSON kodlamaları (bayt bloğu + ofsetler)
+SATIR_JSON_DOSYASI = "rows_json"
+
+def sutunsal_dizin(veri_yolu: str) -> str:
+    """CSV dosyasının yanındaki sütunsal veri dizininin yolunu döndürür"""
+    return os.path.splitext(veri_yolu)[0] + "_columnar"
+
+def kaynak_imzasi(veri_yolu: str):
+    """Kaynak dosyanın meta dosyalarına yazılan [mtime_ns, boyut] imzası"""
+    stat = os.stat(veri_yolu)
+    return [stat.st_mtime_ns, stat.st_size]
+
+def _kaynak_ozeti(veri_yolu: str, blok_boyutu=1024 * 1024) -> str:
+    ozet = hashlib.sha256()
+    with open(veri_yolu, "rb") as f:
+        for blok in iter(lambda: f.read(blok_boyutu), b""):
+            ozet.update(blok)
+    return ozet.hexdigest()
+
+def satirlari_json_olarak(df) -> List[str]:
+    """
+    DataFrame satırlarının her birini ayrı bir JSON nesnesi metnine dönüştürür.
+
+    Kodlama FastAPI'nin JSON yanıtlarıyla aynıdır (json.dumps, kısa gidiş-dönüş
+    float gösterimi); boş değerler null olur.
+    """
+    if len(df) == 0:
+        return []
+    kayitlar = df.astype(object).where(df.notna(), None).to_dict(orient="records")
+    return [json.dumps(kayit, ensure_ascii=False, separators=(",", ":"), default=str) for kayit in kayitlar]
+
+def _satir_jsonlarini_yaz(df, hedef_dizin: str, parca_boyutu: int = 20000):
+    """Satır JSON'larını parça parça tek bir bayt bloğuna ve ofset dizisine yazar"""
+    uzunluklar = []
+    with open(os.path.join(hedef_dizin, SATIR_JSON_DOSYASI + ".bin"), "wb") as f:
+        for bas in range(0, len(df), parca_boyutu):
+            for satir in satirlari_json_olarak(df.iloc[bas:bas + parca_boyutu]):
+                kodlanmis = satir.encode("utf-8")
+                f.write(kodlanmis)
+                uzunluklar.append(len(kodlanmis))
+    ofsetler = np.zeros(len(uzunluklar) + 1, dtype=np.int64)
+    np.cumsum(uzunluklar, out=ofsetler[1:])
+    np.save(os.path.join(hedef_dizin, SATIR_JSON_DOSYASI + ".offsets.npy"), ofsetler)
+
+def veri_setini_donustur(veri_yolu: str, hedef_dizin: Optional[str] = None) -> str:
+    """CSV veri setini mmap ile açılabilecek sütunsal formata dönüştürür"""
+    hedef_dizin = hedef_dizin or sutunsal_dizin(veri_yolu)
+    os.makedirs(hedef_dizin, exist_ok=True)
+
+    df = pd.read_csv(veri_yolu)
+    sutunlar = []
+    for i, ad in enumerate(df.columns):
+        seri = df[ad]
+        dosya = f"col_{i:03d}"
+        if pd.api.types.is_numeric_dtype(seri) and not pd.api.types.is_bool_dtype(seri):
+            np.save(os.path.join(hedef_dizin, dosya + ".npy"), seri.to_numpy())
+            sutunlar.append({"name": ad, "kind": "numeric", "file": dosya})
+            continue
+
+        # Metin sütunu: boş değerler maske ile, metinler tek bir bayt bloğunda tutulur
+        bos = seri.isna().to_numpy()
+        kodlanmis = [b"" if b else str(deger).encode("utf-8") for deger, b in zip(seri.tolist(), bos)]
+        uzunluklar = np.fromiter((len(k) for k in kodlanmis), dtype=np.int64, count=len(kodlanmis))
+        ofsetler = np.zeros(len(kodlanmis) + 1, dtype=np.int64)
+        np.cumsum(uzunluklar, out=ofsetler[1:])
+        with open(os.path.join(hedef_dizin, dosya + ".bin"), "wb") as f:
+            f.write(b"".join(kodlanmis))
+        np.save(os.path.join(hedef_dizin, dosya + ".offsets.npy"), ofsetler)
+        np.save(os.path.join(hedef_dizin, dosya + ".null.npy"), bos)
+        sutunlar.append({"name": ad, "kind": "text", "file": dosya})
+
+    # Yanıtlarda kullanılan satır JSON'ları da bir kez üretilir; worker'lar mmap ile paylaşır
+    _satir_jsonlarini_yaz(df, hedef_dizin)
+
+    meta = {
+        "format_version": FORMAT_SURUMU,
+        "rows": len(df),
+        "columns": sutunlar,
+        "row_json": SATIR_JSON_DOSYASI,
+        "source": os.path.abspath(veri_yolu),
+        "source_signature": kaynak_imzasi(veri_yolu),
+        "source_sha256": _kaynak_ozeti(veri_yolu),
+    }
+    # Meta dosyası en son yazılır; yarım kalan dönüşüm yükleyici tarafından kullanılmaz
+    gecici = os.path.join(hedef_dizin, META_DOSYASI + ".tmp")
+    with open(gecici, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    os.replace(gecici, os.path.join(hedef_dizin, META_DOSYASI))
+
+    logger.info(f"Veri seti sütunsal formata dönüştürüldü: {hedef_dizin} ({len(df)} kayıt)")
+    return hedef_dizin
+
+class _TextColumn:
+    """Bayt bloğu + ofsetlerden oluşan salt okunur metin sütunu"""
+
+    def __init__(self, dizin: str, dosya: str):
+        blok_yolu = os.path.join(dizin, dosya + ".bin")
+        # Boş dosya mmap edilemez
+        if os.path.getsize(blok_yolu) > 0:
+            self.blok = np.memmap(blok_yolu, dtype=np.uint8, mode="r")
+        else:
+            self.blok = np.empty(0, dtype=np.uint8)
+        self.ofsetler = np.load(os.path.join(dizin, dosya + ".offsets.npy"), mmap_mode="r")
+        self.bos = np.load(os.path.join(dizin, dosya + ".null.npy"), mmap_mode="r")
+
+    def __len__(self):
+        return len(self.bos)
+
+    def deger(self, i: int) -> Optional[str]:
+        if self.bos[i]:
+            return None
+        return self.blok[self.ofsetler[i]:self.ofsetler[i + 1]].tobytes().decode("utf-8")
+
+    def degerler(self, indeksler) -> List[Optional[str]]:
+        return [self.deger(i) for i in indeksler]
+
+class _ILocIndexer:
+    """`store.iloc[indeksler]` ile DataFrame benzeri satır seçimi"""
+
+    def __init__(self, store: "RecipeStore"):
+        self._store = store
+
+    def __getitem__(self, anahtar):
+        if isinstance(anahtar, tuple):
+            satirlar, sutunlar = anahtar
+            sutunlar = [self._store.columns[i] for i in np.atleast_1d(sutunlar)]
+            return self._store.take(satirlar, sutunlar)
+        return self._store.take(anahtar)
+
+class RecipeStore:
+    """Sütunsal tarif verisini mmap ile açan salt okunur veri kaynağı"""
+
+    def __init__(self, dizin: str):
+        self.dizin = dizin
+        with open(os.path.join(dizin, META_DOSYASI), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        if self.meta.get("format_version") != FORMAT_SURUMU:
+            raise ValueError(f"Desteklenmeyen sütunsal veri formatı: {self.meta.get('format_version')}")
+
+        self.columns: List[str] = [s["name"] for s in self.meta["columns"]]
+        self._sayisal = {}
+        self._metin = {}
+        for sutun in self.meta["columns"]:
+            if sutun["kind"] == "numeric":
+                self._sayisal[sutun["name"]] = np.load(os.path.join(dizin, sutun["file"] + ".npy"), mmap_mode="r")
+            else:
+                self._metin[sutun["name"]] = _TextColumn(dizin, sutun["file"])
+        self.iloc = _ILocIndexer(self)
+
+    def satir_json_blogu(self):
+        """
+        Dönüştürmede yazılan satır JSON'larının mmap bloğu ve ofsetleri; eski
+        dönüşümlerde yoksa None
+        """
+        dosya = self.meta.get("row_json")
+        if not dosya:
+            return None
+        blok_yolu = os.path.join(self.dizin, dosya + ".bin")
+        ofsetler = np.load(os.path.join(self.dizin, dosya + ".offsets.npy"), mmap_mode="r")
+        blok = np.memmap(blok_yolu, dtype=np.uint8, mode="r") if os.path.getsize(blok_yolu) > 0 else np.empty(0, dtype=np.uint8)
+        return blok, ofsetler
+
+    @property
+    def meta_yolu(self) -> str:
+        return os.path.join(self.dizin, META_DOSYASI)
+
+    def __len__(self):
+        return self.meta["rows"]
+
+    def sayisal_mi(self, ad: str) -> bool:
+        return ad in self._sayisal
+
+    def sayisal(self, ad: str) -> np.ndarray:
+        """Sayısal sütunu kopyalamadan mmap dizisi olarak döndürür"""
+        return self._sayisal[ad]
+
+    def metin(self, ad: str, indeksler: Optional[Sequence[int]] = None) -> List[Optional[str]]:
+        """Metin sütununun istenen satırlarını (varsayılan: tümü) döndürür"""
+        sutun = self._metin[ad]
+        if indeksler is None:
+            indeksler = range(len(sutun))
+        return sutun.degerler(indeksler)
+
+    def take(self, indeksler, sutunlar: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Yalnızca seçilen satır ve sütunları DataFrame olarak oluşturur"""
+        indeksler = np.asarray(indeksler, dtype=np.int64).reshape(-1)
+        sutunlar = self.columns if sutunlar is None else list(sutunlar)
+        veri = {}
+        for ad in sutunlar:
+            if ad in self._sayisal:
+                veri[ad] = np.asarray(self._sayisal[ad][indeksler])
+            else:
+                veri[ad] = np.array(self._metin[ad].degerler(indeksler), dtype=object)
+        return pd.DataFrame(veri, index=indeksler, columns=sutunlar)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Tüm veri setini DataFrame olarak döndürür; sayısal sütunlar mmap dizilerini kopyalamadan kullanır"""
+        veri = {}
+        for ad in self.columns:
+            if ad in self._sayisal:
+                veri[ad] = self._sayisal[ad]
+            else:
+                veri[ad] = np.array(self._metin[ad].degerler(range(len(self))), dtype=object)
+        return pd.DataFrame(veri, columns=self.columns, copy=False)
+
+def sutunsal_meta_oku(veri_yolu: str) -> Optional[dict]:
+    """CSV'nin yanında güncel bir sütunsal kopya varsa meta bilgisini döndürür"""
+    meta_yolu = os.path.join(sutunsal_dizin(veri_yolu), META_DOSYASI)
+    if not os.path.exists(meta_yolu):
+        return None
+    try:
+        with open(meta_yolu, encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.error(f"Sütunsal veri meta dosyası okunamadı ({meta_yolu}): {str(e)}")
+        return None
+    if os.path.exists(veri_yolu) and kaynak_imzasi(veri_yolu) != meta.get("source_signature"):
+        logger.warning(f"Sütunsal veri kaynak CSV'den eski, CSV kullanılacak: {meta_yolu}")
+        return None
+    return meta
+
+def sutunsal_veri_ac(veri_yolu: str) -> Optional[RecipeStore]:
+    """CSV'nin yanında güncel bir sütunsal kopya varsa açar, yoksa None döndürür"""
+    if sutunsal_meta_oku(veri_yolu) is None:
+        return None
+    dizin = sutunsal_dizin(veri_yolu)
+    try:
+        return RecipeStore(dizin)
+    except Exception as e:
+        logger.error(f"Sütunsal veri açılamadı ({dizin}): {str(e)}")
+        return None
@@ -21,3 +21,16 @@ class Recipe(BaseModel):
     
     class Config:
         from_attributes = True
+
+class RecipeSearchItem(BaseModel):
+    RecipeId: Optional[int] = None
+    Name: Optional[str] = None
+    RecipeCategory: Optional[str] = None
+    Calories: Optional[float] = None
+    ProteinContent: Optional[float] = None
+    FatContent: Optional[float] = None
+    CarbohydrateContent: Optional[float] = None
+
+class TermSuggestion(BaseModel):
+    term: str
+    count: int
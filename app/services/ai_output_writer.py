@@ -0,0 +1,150 @@
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.db.base import SessionLocal
+from app.models.ai_model_output import AIModelOutput
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+class AIOutputWriter:
+    """
+    Öneri çıktılarını AIModelOutput tablosuna arka planda toplu yazan tampon (write-behind).
+
+    İstek yolu yalnızca kaydı sınırlı bir kuyruğa ekler. Arka plan iş parçacığı
+    kuyruk `parti_boyutu` kayda ulaştığında ya da `bosaltma_araligi` dolduğunda
+    kayıtları tek bir çok satırlı INSERT ile yazar. Kuyruk doluysa yeni kayıtlar
+    düşürülür ve sayılır; bellek kullanımı sınırlı kalır. Kapanışta kalan
+    kayıtlar yazılır.
+    """
+
+    def __init__(self, en_fazla_bekleyen: int = 10000, parti_boyutu: int = 500,
+                 bosaltma_araligi: float = 2.0, etkin: bool = True):
+        self.en_fazla_bekleyen = en_fazla_bekleyen
+        self.parti_boyutu = max(1, parti_boyutu)
+        self.bosaltma_araligi = bosaltma_araligi
+        self.etkin = etkin
+        self._kuyruk: deque = deque()
+        self._kosul = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._durdur = False
+
+        # Metrikler
+        self.eklenen = 0
+        self.yazilan = 0
+        self.dusurulen = 0
+        self.hatali_parti = 0
+        self.son_hata: Optional[str] = None
+
+    def baslat(self):
+        if not self.etkin or self._thread is not None:
+            return
+        self._durdur = False
+        self._thread = threading.Thread(target=self._calis, name="ai-output-writer", daemon=True)
+        self._thread.start()
+
+    def kapat(self, zaman_asimi: float = 10.0):
+        """Arka plan iş parçacığını durdurur ve kuyrukta kalan kayıtları yazar"""
+        if self._thread is None:
+            return
+        with self._kosul:
+            self._durdur = True
+            self._kosul.notify()
+        self._thread.join(zaman_asimi)
+        self._thread = None
+
+    def ekle(self, kullanici_email: Optional[str], output_data: Dict[str, Any]) -> bool:
+        """Kaydı yazma kuyruğuna ekler; kuyruk doluysa False döndürür
+        
+        Kullanıcı e-postası istek yolunda veritabanına gidilmemesi için saklanır;
+        user_id yazma sırasında partideki tüm e-postalar için tek sorguyla bulunur.
+        """
+        if not self.etkin:
+            return False
+        with self._kosul:
+            if len(self._kuyruk) >= self.en_fazla_bekleyen:
+                self.dusurulen += 1
+                return False
+            self._kuyruk.append((kullanici_email, output_data, datetime.now()))
+            self.eklenen += 1
+            if len(self._kuyruk) >= self.parti_boyutu:
+                self._kosul.notify()
+        return True
+
+    def _calis(self):
+        son_bosaltma = time.monotonic()
+        while True:
+            with self._kosul:
+                # Parti dolana, süre dolana ya da durdurulana kadar bekle
+                while not self._durdur and len(self._kuyruk) < self.parti_boyutu:
+                    kalan = self.bosaltma_araligi - (time.monotonic() - son_bosaltma)
+                    if kalan <= 0:
+                        break
+                    self._kosul.wait(kalan)
+                durduruldu = self._durdur
+                parti = [self._kuyruk.popleft() for _ in range(min(self.parti_boyutu, len(self._kuyruk)))]
+
+            if parti:
+                self._yaz(parti)
+            son_bosaltma = time.monotonic()
+
+            if durduruldu:
+                # Kapanışta kuyruğun tamamını boşalt
+                with self._kosul:
+                    kalanlar = list(self._kuyruk)
+                    self._kuyruk.clear()
+                for bas in range(0, len(kalanlar), self.parti_boyutu):
+                    self._yaz(kalanlar[bas:bas + self.parti_boyutu])
+                return
+
+    def _yaz(self, parti):
+        """Partiyi tek bir çok satırlı INSERT ile yazar"""
+        db = SessionLocal()
+        try:
+            emailler = {email for email, _, _ in parti if email}
+            kullanicilar = {}
+            if emailler:
+                kullanicilar = dict(db.query(User.email, User.user_id).filter(User.email.in_(emailler)).all())
+            satirlar = [
+                {"user_id": kullanicilar.get(email), "output_data": output_data, "created_at": zaman}
+                for email, output_data, zaman in parti
+            ]
+            db.execute(insert(AIModelOutput), satirlar)
+            db.commit()
+            self.yazilan += len(parti)
+        except Exception as e:
+            db.rollback()
+            self.hatali_parti += 1
+            self.dusurulen += len(parti)
+            self.son_hata = str(e)
+            logger.error(f"AI çıktıları yazılamadı ({len(parti)} kayıt): {str(e)}")
+        finally:
+            db.close()
+
+    def istatistikler(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.etkin,
+            "pending": len(self._kuyruk),
+            "max_pending": self.en_fazla_bekleyen,
+            "batch_size": self.parti_boyutu,
+            "flush_interval_seconds": self.bosaltma_araligi,
+            "enqueued": self.eklenen,
+            "written": self.yazilan,
+            "dropped": self.dusurulen,
+            "failed_batches": self.hatali_parti,
+            "last_error": self.son_hata
+        }
+
+ai_output_writer = AIOutputWriter(
+    en_fazla_bekleyen=settings.AI_OUTPUT_MAX_PENDING,
+    parti_boyutu=settings.AI_OUTPUT_BATCH_SIZE,
+    bosaltma_araligi=settings.AI_OUTPUT_FLUSH_SECONDS,
+    etkin=settings.AI_OUTPUT_LOG_ENABLED
+)
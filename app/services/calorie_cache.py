@@ -0,0 +1,75 @@
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Değişmesi kalori profilini etkileyen kullanıcı alanları
+KALORI_ALANLARI = ("weight", "height", "age", "gender", "activity_level", "goal")
+
+class CalorieProfileCache:
+    """
+    Kullanıcı başına serileştirilmiş CalorieResponse gövdesini saklayan LRU önbellek.
+
+    Kayıt, hesaplandığı andaki `updated_at` ile birlikte tutulur; kullanıcı
+    satırı güncellendiyse eski kayıt kullanılmaz. Bu sayede başka bir süreçte
+    yapılan güncellemeler de yakalanır. `update_user` kalori alanlarını
+    değiştirdiğinde kayıt ayrıca hemen silinir.
+    """
+
+    def __init__(self, boyut: int = 50000):
+        self.boyut = boyut
+        self._kayitlar: "OrderedDict[int, Tuple[Optional[datetime], bytes]]" = OrderedDict()
+        self._kilit = threading.Lock()
+        self.isabet = 0
+        self.iska = 0
+        self.gecersiz = 0
+
+    @property
+    def etkin(self) -> bool:
+        return self.boyut > 0
+
+    def al(self, user_id: int, updated_at: Optional[datetime]) -> Optional[bytes]:
+        """Kullanıcı satırı değişmediyse saklanan JSON gövdesini döndürür"""
+        if not self.etkin:
+            return None
+        with self._kilit:
+            kayit = self._kayitlar.get(user_id)
+            if kayit is None or kayit[0] != updated_at:
+                self.iska += 1
+                return None
+            self._kayitlar.move_to_end(user_id)
+            self.isabet += 1
+            return kayit[1]
+
+    def koy(self, user_id: int, updated_at: Optional[datetime], govde: bytes):
+        if not self.etkin:
+            return
+        with self._kilit:
+            self._kayitlar[user_id] = (updated_at, govde)
+            self._kayitlar.move_to_end(user_id)
+            while len(self._kayitlar) > self.boyut:
+                self._kayitlar.popitem(last=False)
+
+    def gecersiz_kil(self, user_id: int):
+        with self._kilit:
+            if self._kayitlar.pop(user_id, None) is not None:
+                self.gecersiz += 1
+
+    def istatistikler(self) -> Dict[str, Any]:
+        toplam = self.isabet + self.iska
+        return {
+            "enabled": self.etkin,
+            "max_size": self.boyut,
+            "size": len(self._kayitlar),
+            "hits": self.isabet,
+            "misses": self.iska,
+            "hit_ratio": round(self.isabet / toplam, 4) if toplam else 0,
+            "invalidations": self.gecersiz
+        }
+
+calorie_cache = CalorieProfileCache(boyut=settings.CALORIE_CACHE_SIZE)
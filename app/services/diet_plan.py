@@ -0,0 +1,260 @@
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.models.nutrition_model import MealType, OGUN_IFADELERI, artefakt_hazirlayicisi_ekle, meal_distribution
+from app.models.recipe_filter import SortedColumnIndex, sayisal_sutun, satir_kayitlari
+
+logger = logging.getLogger(__name__)
+
+# Hedeflenen besin sütunları: kalori, protein, karbonhidrat, yağ
+BESIN_SUTUNLARI = ("Calories", "ProteinContent", "CarbohydrateContent", "FatContent")
+# Sapma puanında besin ağırlıkları (kalori hedefi daha önemli)
+BESIN_AGIRLIKLARI = np.array([2.0, 1.0, 1.0, 1.0])
+# Planda döndürülen tarif sütunları
+PLAN_SUTUNLARI = ("RecipeId", "Name", "RecipeCategory") + BESIN_SUTUNLARI
+# Plan öğünlerinin kategori/etiket eşleşmesinde kullanılan öğün tipi
+OGUN_TIPLERI = {
+    "Breakfast": MealType.KAHVALTI,
+    "Lunch": MealType.OGLE,
+    "Dinner": MealType.AKSAM,
+    "Snack": MealType.ARA_OGUN,
+}
+
+def sapma_yuzdeleri(toplam: np.ndarray, hedef: np.ndarray) -> Dict[str, Optional[float]]:
+    """Besin başına hedeften yüzde sapma; hedefi 0 olan besin (ör. keto'da karbonhidrat) için None"""
+    sifir_degil = hedef > 0
+    yuzdeler = np.round((toplam - hedef) / np.where(sifir_degil, hedef, 1.0) * 100, 1)
+    return {
+        ad: float(yuzde) if gecerli else None
+        for ad, yuzde, gecerli in zip(("calories", "protein_g", "carbs_g", "fat_g"), yuzdeler, sifir_degil)
+    }
+
+class DietPlanSolver:
+    """
+    Öğün ve makro hedeflerine en yakın günlük/haftalık planı seçen çözücü.
+
+    Her öğün için aday tarifler, o öğünün kategori/etiketleriyle eşleşen
+    tariflerin kalori-sıralı indeksinden hedef kalori bandında rastgele çekilir
+    (eşleşen tarif yetmezse tüm tariflere düşülür) ve öğün hedefine
+    sapmalarına göre vektörel puanlanır; en iyi `k` aday kalır. Öğünler küçük
+    bir ışın (beam) aramasıyla birleştirilir: her adımda kısmi toplamın
+    kümülatif hedefe sapması en küçük `isin_genisligi` kombinasyon tutulur.
+    Süre bütçesi aşılırsa kalan öğünler açgözlü (öğün başına en iyi aday) seçilir.
+    """
+
+    def __init__(self, veri, aday_sayisi: int = 200, en_iyi_aday: int = 24, isin_genisligi: int = 64,
+                 filtre_indeksi=None):
+        self.veri = veri
+        self.aday_sayisi = aday_sayisi
+        self.en_iyi_aday = en_iyi_aday
+        self.isin_genisligi = isin_genisligi
+        besinler = np.column_stack([np.asarray(sayisal_sutun(veri, ad), dtype=float) for ad in BESIN_SUTUNLARI])
+        # Besin değerleri eksik veya kalorisi olmayan tarifler plana alınmaz
+        gecerli = np.isfinite(besinler).all(axis=1) & (besinler[:, 0] > 0)
+        self.besinler = np.where(gecerli[:, None], besinler, 0.0)
+        kaloriler = np.where(gecerli, besinler[:, 0], np.nan)
+        self.kalori_indeksi = SortedColumnIndex(kaloriler)
+
+        # Öğün tipi başına yalnızca o öğüne uyan tariflerin kalori indeksi
+        self.ogun_indeksleri: Dict[str, SortedColumnIndex] = {}
+        if filtre_indeksi is not None:
+            for ogun, tip in OGUN_TIPLERI.items():
+                maske = filtre_indeksi.maske(f"diet-plan:{tip.value}", {}, ogun_ifadeleri=OGUN_IFADELERI[tip])
+                self.ogun_indeksleri[ogun] = SortedColumnIndex(np.where(maske, kaloriler, np.nan))
+
+    def _bant_adaylari(self, indeks: SortedColumnIndex, hedef_kalori: float, haric: np.ndarray, rng) -> np.ndarray:
+        """Hedef kalori bandından rastgele aday satırlar; band gerekirse genişletilir"""
+        for bant in (0.25, 0.5, 1.0):
+            bas, son = indeks.aralik(hedef_kalori * (1 - bant), hedef_kalori * (1 + bant))
+            if son - bas >= self.aday_sayisi or bant == 1.0:
+                break
+        adaylar = indeks.rastgele(bas, son, self.aday_sayisi, rng)
+        if len(haric):
+            kalan = adaylar[~np.isin(adaylar, haric)]
+            # Çeşitlilik için kullanılanlar çıkarılır; hiç aday kalmazsa tekrar kabul edilir
+            if len(kalan):
+                adaylar = kalan
+        return adaylar
+
+    def _adaylar(self, ogun: str, hedef_kalori: float, haric: np.ndarray, rng) -> np.ndarray:
+        """Öğüne uyan tariflerden adaylar; yeterli aday yoksa tüm tariflerden"""
+        indeks = self.ogun_indeksleri.get(ogun)
+        if indeks is not None:
+            adaylar = self._bant_adaylari(indeks, hedef_kalori, haric, rng)
+            if len(adaylar) >= self.en_iyi_aday:
+                return adaylar
+        return self._bant_adaylari(self.kalori_indeksi, hedef_kalori, haric, rng)
+
+    @staticmethod
+    def _sapma(toplamlar: np.ndarray, hedef: np.ndarray) -> np.ndarray:
+        """Ağırlıklı göreli kare sapma (son eksen besinler)"""
+        goreli = (toplamlar - hedef) / np.maximum(hedef, 1e-9)
+        return (goreli ** 2) @ BESIN_AGIRLIKLARI
+
+    def gun_plani(self, hedefler: np.ndarray, ogunler: Sequence[Tuple[str, float]], haric: np.ndarray,
+                  rng, acgozlu: bool = False, son_an: Optional[float] = None) -> Tuple[List[Tuple[str, int]], bool]:
+        """
+        Bir günün öğünlerini seçer; (öğün tipi, satır) listesi ve süre bütçesinin
+        aşılıp aşılmadığını döndürür. Aday bulunamayan öğünler listede yer almaz.
+        """
+        secimler = np.empty((1, 0), dtype=np.int64)
+        # secimler sütunlarının öğün tipleri (atlanan öğünler sütun eklemez)
+        secilen_ogunler: List[str] = []
+        toplamlar = np.zeros((1, len(BESIN_SUTUNLARI)))
+        kumulatif_hedef = np.zeros(len(BESIN_SUTUNLARI))
+        for ogun, oran in ogunler:
+            # Bütçe öğünler arasında da kontrol edilir; aşılırsa kalan öğünler açgözlü seçilir
+            if not acgozlu and son_an is not None and time.perf_counter() > son_an:
+                acgozlu = True
+            k = 1 if acgozlu else self.en_iyi_aday
+            isin = 1 if acgozlu else self.isin_genisligi
+
+            ogun_hedefi = hedefler * oran
+            kumulatif_hedef = kumulatif_hedef + ogun_hedefi
+
+            adaylar = self._adaylar(ogun, ogun_hedefi[0], haric, rng)
+            # Işındaki her yolda zaten seçilmiş adaylar en iyi k'ya girip yer tutmasın
+            if secimler.shape[1] and len(adaylar):
+                adaylar = adaylar[~(secimler[:, :, None] == adaylar[None, None, :]).any(axis=1).all(axis=0)]
+            if len(adaylar) == 0:
+                continue
+            degerler = self.besinler[adaylar]
+            # Öğün hedefine en yakın k aday (kısmi seçim)
+            puanlar = self._sapma(degerler, ogun_hedefi)
+            if len(adaylar) > k:
+                secilen = np.argpartition(puanlar, k - 1)[:k]
+                adaylar, degerler = adaylar[secilen], degerler[secilen]
+
+            # Işın x aday kombinasyonlarının kısmi toplamları
+            yeni_toplamlar = toplamlar[:, None, :] + degerler[None, :, :]
+            puanlar = self._sapma(yeni_toplamlar, kumulatif_hedef)
+            # Aynı gün içinde aynı tarif iki kez seçilmesin
+            if secimler.shape[1]:
+                puanlar[(secimler[:, :, None] == adaylar[None, None, :]).any(axis=1)] = np.inf
+            duz = puanlar.ravel()
+            tut = min(isin, len(duz))
+            en_iyiler = np.argpartition(duz, tut - 1)[:tut] if len(duz) > tut else np.arange(len(duz))
+            en_iyiler = en_iyiler[np.isfinite(duz[en_iyiler])]
+            if len(en_iyiler) == 0:
+                continue
+            isin_sirasi, aday_sirasi = np.unravel_index(en_iyiler, puanlar.shape)
+            secimler = np.hstack([secimler[isin_sirasi], adaylar[aday_sirasi][:, None]])
+            toplamlar = yeni_toplamlar[isin_sirasi, aday_sirasi]
+            secilen_ogunler.append(ogun)
+
+        en_iyi = int(np.argmin(self._sapma(toplamlar, hedefler)))
+        return list(zip(secilen_ogunler, secimler[en_iyi].tolist())), acgozlu
+
+    def plan(self, hedefler: Dict[str, float], gun_sayisi: int = 7, atistirmalik_sayisi: int = 1,
+             tohum: Optional[int] = None, butce_ms: float = 50.0) -> Dict[str, Any]:
+        """
+        `gun_sayisi` günlük plan üretir. Bir tarif hafta içinde tekrar kullanılmaz
+        (aday kalmadığı durumlar hariç).
+        """
+        baslangic = time.perf_counter()
+        son_an = baslangic + butce_ms / 1000
+        rng = np.random.default_rng(tohum)
+        hedef = np.array([hedefler["calories"], hedefler["protein_g"], hedefler["carbs_g"], hedefler["fat_g"]], dtype=float)
+
+        # Öğün payları meal_distribution ile aynı; atıştırmalık payı atıştırmalıklara bölünür
+        paylar = {ogun: kalori / hedef[0] for ogun, kalori in meal_distribution(hedef[0]).items()}
+        ogunler = [("Breakfast", paylar["Breakfast"]), ("Lunch", paylar["Lunch"]), ("Dinner", paylar["Dinner"])]
+        if atistirmalik_sayisi:
+            ogunler += [("Snack", paylar["Snacks"] / atistirmalik_sayisi)] * atistirmalik_sayisi
+        else:
+            # Atıştırmalık yoksa payı ana öğünlere oranla dağıtılır
+            ana_toplam = sum(oran for _, oran in ogunler)
+            ogunler = [(tip, oran / ana_toplam) for tip, oran in ogunler]
+
+        kullanilan: List[int] = []
+        gunler = []
+        butce_asildi = False
+        for gun in range(gun_sayisi):
+            secim, asildi = self.gun_plani(
+                hedef, ogunler, np.asarray(kullanilan, dtype=np.int64), rng, acgozlu=butce_asildi, son_an=son_an
+            )
+            if asildi and not butce_asildi:
+                butce_asildi = True
+                logger.warning(f"Diyet planı süre bütçesi aşıldı ({butce_ms} ms), kalan öğünler açgözlü seçiliyor")
+            satirlar = [satir for _, satir in secim]
+            kullanilan.extend(satirlar)
+
+            toplam = self.besinler[satirlar].sum(axis=0) if satirlar else np.zeros(len(hedef))
+            kayitlar = satir_kayitlari(self.veri, satirlar, PLAN_SUTUNLARI)
+            gunler.append({
+                "day": gun + 1,
+                "meals": [{"meal_type": tip, **kayit} for (tip, _), kayit in zip(secim, kayitlar)],
+                "totals": dict(zip(("calories", "protein_g", "carbs_g", "fat_g"), np.round(toplam, 2).tolist())),
+                "deviation_pct": sapma_yuzdeleri(toplam, hedef)
+            })
+
+        return {
+            "targets": {ad: round(float(deger), 2) for ad, deger in zip(("calories", "protein_g", "carbs_g", "fat_g"), hedef)},
+            "days": gunler,
+            "elapsed_ms": round((time.perf_counter() - baslangic) * 1000, 2),
+            "budget_exceeded": butce_asildi
+        }
+
+# Artefakt sürümü başına kurulmuş çözücüler (A/B dağılımında birden çok sürüm olabilir)
+EN_FAZLA_COZUCU = 4
+_cozuculer: "OrderedDict[str, DietPlanSolver]" = OrderedDict()
+_kurulanlar = set()
+_cozucu_kilidi = threading.Lock()
+
+def plan_cozucusu_hazirla(artifacts) -> DietPlanSolver:
+    """
+    Artefakt sürümü için çözücüyü kurar; zaten kuruluysa onu döndürür.
+    
+    Isınmada ve sürüm yüklenirken/etkinleşirken çağrılır; kurulum kilit
+    dışında yapıldığından bu sırada diğer sürümlerin istekleri beklemez.
+    """
+    with _cozucu_kilidi:
+        cozucu = _cozuculer.get(artifacts.version)
+        if cozucu is not None:
+            _cozuculer.move_to_end(artifacts.version)
+            return cozucu
+    baslangic = time.perf_counter()
+    cozucu = DietPlanSolver(
+        artifacts.veri, aday_sayisi=settings.DIET_PLAN_CANDIDATES, filtre_indeksi=artifacts.filtre_indeksi
+    )
+    with _cozucu_kilidi:
+        cozucu = _cozuculer.setdefault(artifacts.version, cozucu)
+        _cozuculer.move_to_end(artifacts.version)
+        while len(_cozuculer) > EN_FAZLA_COZUCU:
+            _cozuculer.popitem(last=False)
+    logger.info(f"Diyet planı çözücüsü hazır: {artifacts.version} ({(time.perf_counter() - baslangic) * 1000:.1f} ms)")
+    return cozucu
+
+def _arka_planda_hazirla(artifacts):
+    try:
+        plan_cozucusu_hazirla(artifacts)
+    except Exception as e:
+        logger.error(f"Diyet planı çözücüsü kurulamadı ({artifacts.version}): {str(e)}")
+    finally:
+        with _cozucu_kilidi:
+            _kurulanlar.discard(artifacts.version)
+
+def plan_cozucusu(artifacts) -> Optional[DietPlanSolver]:
+    """
+    Sürümün önceden kurulmuş çözücüsünü döndürür. Kurulmamışsa (ör. önbellekten
+    düşmüşse) istek yolunda kurmaz; kurulumu arka planda başlatıp None döndürür.
+    """
+    with _cozucu_kilidi:
+        cozucu = _cozuculer.get(artifacts.version)
+        if cozucu is not None:
+            _cozuculer.move_to_end(artifacts.version)
+            return cozucu
+        if artifacts.version in _kurulanlar:
+            return None
+        _kurulanlar.add(artifacts.version)
+    threading.Thread(target=_arka_planda_hazirla, args=(artifacts,), name="diet-plan-solver", daemon=True).start()
+    return None
+
+# Yeni yüklenen/etkinleşen her model sürümü için çözücü hizmete girmeden kurulur
+artefakt_hazirlayicisi_ekle(plan_cozucusu_hazirla)
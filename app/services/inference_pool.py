@@ -0,0 +1,189 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.exceptions import ServiceUnavailableException
+from app.models.nutrition_model import komsu_indeksleri, nutrition_registry, NutritionModelRegistry, HAZIR_PROFILLER
+from app.models.recipe_similarity import RecipeSimilarityIndex, benzerlik_indeksi_ac
+from app.services.similar_recipes import benzerleri_hesapla
+
+logger = logging.getLogger(__name__)
+
+# Havuz sürecinde (model yolu, veri yolu) -> kayıt defteri; yan yana sürümler için
+_havuz_kayitlari: "OrderedDict[Tuple[str, str], NutritionModelRegistry]" = OrderedDict()
+# Havuz sürecinde veri yolu -> açılmış TF-IDF indeksi
+_havuz_benzerlik_indeksleri: "OrderedDict[str, RecipeSimilarityIndex]" = OrderedDict()
+HAVUZ_EN_FAZLA_SURUM = 4
+
+# Havuz süreçlerinde çalışan fonksiyonlar (modül seviyesinde olmalı ki pickle edilebilsin)
+def _havuz_sureci_baslat():
+    """Havuz süreci açılırken modeli yükler ve sahte bir sorguyla sayfaları belleğe getirir"""
+    # Havuz süreçleri yalnızca indeks döndürür, yanıt JSON'larına ihtiyaç duymaz
+    nutrition_registry.satirlari_serilestir = False
+    artifacts = nutrition_registry.yukle()
+    if artifacts is not None:
+        _havuz_kayitlari[(artifacts.model_yolu, artifacts.veri_yolu)] = nutrition_registry
+        komsu_indeksleri(artifacts.model, HAZIR_PROFILLER[next(iter(HAZIR_PROFILLER))], 1, artifacts.indeks)
+
+def _havuz_kaydi(model_yolu: str, veri_yolu: str) -> NutritionModelRegistry:
+    """İstenen sürümün kayıt defterini döndürür; süreçte yoksa aynı ayarlarla oluşturur"""
+    anahtar = (model_yolu, veri_yolu)
+    kayit = _havuz_kayitlari.get(anahtar)
+    if kayit is None:
+        kayit = nutrition_registry.kopya(model_yolu=model_yolu, veri_yolu=veri_yolu)
+        _havuz_kayitlari[anahtar] = kayit
+        # En eski ek sürüm bırakılır; varsayılan kayıt defteri her zaman tutulur
+        while len(_havuz_kayitlari) > HAVUZ_EN_FAZLA_SURUM:
+            eski = next(k for k, v in _havuz_kayitlari.items() if v is not nutrition_registry)
+            del _havuz_kayitlari[eski]
+    _havuz_kayitlari.move_to_end(anahtar)
+    return kayit
+
+def _havuzda_hazir_mi():
+    return nutrition_registry.yuklu_mu()
+
+def _havuzda_komsu_indeksleri(girdiler, n_neighbors, filtre=None, model_yolu=None, veri_yolu=None):
+    """Havuz sürecinde yerleşik modelle komşu araması yapar; sonucu hangi sürümün ürettiğini de döndürür"""
+    kayit = _havuz_kaydi(model_yolu, veri_yolu) if model_yolu else nutrition_registry
+    artifacts = kayit.get()
+    if artifacts is None:
+        raise RuntimeError("Havuz sürecinde model yüklenemedi")
+    # Filtre maskesi süreç içinde üretilir; süreçler arasında yalnızca filtre tanımı taşınır
+    return artifacts.version, artifacts.komsular(girdiler, n_neighbors, filtre)
+
+def _havuzda_benzer_tarifler(veri_yolu, build_id, tohumlar, n, birlestirme=None):
+    """Havuz sürecinde TF-IDF benzerliğini hesaplar; sonucu hangi indeks yapısının ürettiğini de döndürür"""
+    indeks = _havuz_benzerlik_indeksleri.get(veri_yolu)
+    if indeks is None or indeks.meta.get("build_id") != build_id:
+        # İndeks yalnızca diskten açılır; havuz süreci de istek yolunda oluşturmaz
+        indeks = benzerlik_indeksi_ac(veri_yolu)
+        if indeks is None:
+            raise RuntimeError("Havuz sürecinde TF-IDF indeksi açılamadı")
+        _havuz_benzerlik_indeksleri[veri_yolu] = indeks
+        while len(_havuz_benzerlik_indeksleri) > HAVUZ_EN_FAZLA_SURUM:
+            _havuz_benzerlik_indeksleri.popitem(last=False)
+    _havuz_benzerlik_indeksleri.move_to_end(veri_yolu)
+    return indeks.meta.get("build_id"), benzerleri_hesapla(indeks, tohumlar, n, birlestirme)
+
+class InferencePool:
+    """
+    CPU yoğun AI çıkarımını paylaşılan thread havuzundan ayıran sınırlı süreç havuzu.
+
+    Her süreç modeli kendi içinde yerleşik tutar (mmap sayesinde sayfalar
+    paylaşılır). Kuyrukta bekleyen ve çalışan sorgu sayısı `en_fazla_bekleyen`
+    sınırını aşarsa yeni istekler bekletilmeden 503 ile reddedilir; böylece
+    yük altında gecikme sınırsız büyümez.
+    """
+
+    def __init__(self, surec_sayisi: int = 2, en_fazla_bekleyen: int = 64):
+        self.surec_sayisi = surec_sayisi
+        self.en_fazla_bekleyen = en_fazla_bekleyen
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._isinma_isleri = []
+        self._kilit = threading.Lock()
+        self._bekleyen = 0
+        self.reddedilen = 0
+        self.surum_uyusmazligi = 0
+
+    def baslat(self):
+        """Süreç havuzunu açar ve her süreci önceden ısıtır"""
+        if self.surec_sayisi <= 0 or self._executor is not None:
+            return
+        # fork, olay döngüsü ve thread'leri olan süreçte güvenli değildir; spawn kullanılır
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.surec_sayisi,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_havuz_sureci_baslat
+        )
+        # Süreçler ilk iş geldiğinde açılır; ısınma için her birine boş bir iş gönder
+        self._isinma_isleri = [self._executor.submit(_havuzda_hazir_mi) for _ in range(self.surec_sayisi)]
+        logger.info(f"Çıkarım süreç havuzu başlatıldı: {self.surec_sayisi} süreç")
+
+    def kapat(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def hazir_mi(self) -> bool:
+        """Havuz açıldı ve tüm süreçler modeli yükleyip ısındıysa True döndürür"""
+        return (self._executor is not None
+                and all(gorev.done() and gorev.exception() is None and gorev.result() for gorev in self._isinma_isleri))
+
+    def rezerve(self, adet: int = 1):
+        """Kuyrukta yer ayırır; sınır aşılıyorsa 503 fırlatır"""
+        with self._kilit:
+            if self._bekleyen + adet > self.en_fazla_bekleyen:
+                self.reddedilen += adet
+                raise ServiceUnavailableException()
+            self._bekleyen += adet
+
+    def birak(self, adet: int = 1):
+        with self._kilit:
+            self._bekleyen -= adet
+
+    async def _havuzda_calistir(self, fonksiyon, *argumanlar):
+        return await asyncio.wrap_future(self._executor.submit(fonksiyon, *argumanlar))
+
+    async def komsu_indeksleri(self, artifacts, girdiler, n_neighbors: int, filtre=None):
+        """Komşu aramasını süreç havuzunda yapar; havuz hazır değilse veya sürüm farklıysa yerelde hesaplar"""
+        # Süreçler hâlâ modeli yüklüyorsa istekler onları beklemez
+        if self.hazir_mi():
+            try:
+                surum, sonuc = await self._havuzda_calistir(
+                    _havuzda_komsu_indeksleri, girdiler, n_neighbors, filtre, artifacts.model_yolu, artifacts.veri_yolu
+                )
+                # Havuz süreci farklı bir model/veri sürümü yüklediyse indeksler bu veriyle eşleşmez
+                if surum == artifacts.version:
+                    return sonuc
+                self.surum_uyusmazligi += 1
+                logger.warning(f"Havuz süreci model sürümü farklı ({surum} != {artifacts.version}), yerelde hesaplanıyor")
+            except BrokenProcessPool:
+                logger.error("Çıkarım süreç havuzu bozuldu, yeniden başlatılıyor")
+                self._executor = None
+                self.baslat()
+        return await run_in_threadpool(artifacts.komsular, girdiler, n_neighbors, filtre)
+
+    async def benzer_tarifler(self, veri_yolu: str, indeks: RecipeSimilarityIndex, tohumlar: Sequence[int], n: int,
+                              birlestirme: Optional[str] = None):
+        """TF-IDF tarif benzerliğini süreç havuzunda yapar; havuz hazır değilse veya indeks farklıysa yerelde hesaplar"""
+        if self.hazir_mi():
+            build_id = indeks.meta.get("build_id")
+            try:
+                sonuc_build_id, sonuc = await self._havuzda_calistir(
+                    _havuzda_benzer_tarifler, veri_yolu, build_id, list(tohumlar), n, birlestirme
+                )
+                # Havuz süreci diskte farklı bir indeks bulduysa satırlar bu indeksle eşleşmeyebilir
+                if sonuc_build_id == build_id:
+                    return sonuc
+                self.surum_uyusmazligi += 1
+                logger.warning(f"Havuz süreci TF-IDF indeksi farklı ({sonuc_build_id} != {build_id}), yerelde hesaplanıyor")
+            except BrokenProcessPool:
+                logger.error("Çıkarım süreç havuzu bozuldu, yeniden başlatılıyor")
+                self._executor = None
+                self.baslat()
+            except RuntimeError as e:
+                logger.warning(f"Havuzda benzerlik hesaplanamadı, yerelde hesaplanıyor: {str(e)}")
+        return await run_in_threadpool(benzerleri_hesapla, indeks, tohumlar, n, birlestirme)
+
+    def istatistikler(self) -> Dict[str, Any]:
+        return {
+            "workers": self.surec_sayisi if self._executor is not None else 0,
+            "ready": self.hazir_mi(),
+            "max_pending": self.en_fazla_bekleyen,
+            "pending": self._bekleyen,
+            "rejected": self.reddedilen,
+            "version_mismatches": self.surum_uyusmazligi
+        }
+
+inference_pool = InferencePool(
+    surec_sayisi=settings.INFERENCE_POOL_WORKERS,
+    en_fazla_bekleyen=settings.INFERENCE_MAX_PENDING
+)
@@ -0,0 +1,150 @@
+import os
+import time
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.models.nutrition_model import veri_yukle, veri_yolunu_bul, veri_dosyasini_bul
+from app.models.recipe_filter import KeywordIndex, satir_kayitlari, terimlere_ayir
+
+logger = logging.getLogger(__name__)
+
+# Aramada bakılan metin sütunları
+ARAMA_SUTUNLARI = ("Name", "RecipeCategory", "Keywords")
+# Arama sonuçlarında döndürülen sütunlar
+SONUC_SUTUNLARI = ("RecipeId", "Name", "RecipeCategory", "Calories", "ProteinContent",
+                   "FatContent", "CarbohydrateContent")
+
+class RecipeSearchIndex:
+    """
+    Tarif araması için terim -> sıralı satır numaraları (posting list) ve
+    sıralı terim dizisi.
+
+    Tam terimler posting list kesişimiyle, önekler ise sıralı terim dizisinde
+    ikili aramayla bulunan terim aralığıyla çözülür; hiçbir sorgu veri setini
+    taramaz.
+    """
+
+    def __init__(self, veri, sutunlar: Sequence[str] = ARAMA_SUTUNLARI):
+        self.veri = veri
+        self.terim_indeksi = KeywordIndex(veri, sutunlar, ayirici=terimlere_ayir)
+        kimlikler = self.terim_indeksi.kelime_kimlikleri
+        self.terimler = np.array(sorted(kimlikler), dtype=str)
+        self.terim_kimlikleri = np.fromiter((kimlikler[t] for t in self.terimler), dtype=np.int64, count=len(self.terimler))
+        # Her terimin geçtiği tarif sayısı (otomatik tamamlamada sıralama için)
+        self.frekanslar = np.diff(self.terim_indeksi.baslangic)[self.terim_kimlikleri]
+
+    def __len__(self):
+        return len(self.veri)
+
+    def onek_araligi(self, onek: str) -> Tuple[int, int]:
+        """Önekle başlayan terimlerin sıralı dizideki [baş, son) aralığı"""
+        bas = int(np.searchsorted(self.terimler, onek, side="left"))
+        son = int(np.searchsorted(self.terimler, onek + "\U0010ffff", side="left"))
+        return bas, son
+
+    def onek_satirlari(self, onek: str) -> np.ndarray:
+        """Önekle başlayan terimlerden herhangi birini içeren sıralı satır numaraları"""
+        bas, son = self.onek_araligi(onek)
+        if bas == son:
+            return np.empty(0, dtype=np.int32)
+        indeks = self.terim_indeksi
+        kimlikler = self.terim_kimlikleri[bas:son]
+        if len(kimlikler) == 1:
+            return indeks.satirlar[indeks.baslangic[kimlikler[0]]:indeks.baslangic[kimlikler[0] + 1]]
+        # Önekin tüm terimleri birleştirilir; satır maskesi sıralama gerektirmeden tekilleştirir
+        maske = np.zeros(len(self.veri), dtype=bool)
+        for k in kimlikler:
+            maske[indeks.satirlar[indeks.baslangic[k]:indeks.baslangic[k + 1]]] = True
+        return np.flatnonzero(maske)
+
+    def ara(self, sorgu: str, onek: bool = True) -> np.ndarray:
+        """
+        Sorgudaki tüm terimleri içeren tariflerin sıralı satır numaraları.
+
+        `onek` True ise son terim yazılmakta olan kelime sayılır ve önek olarak eşleşir.
+        """
+        terimler = terimlere_ayir(sorgu)
+        if not terimler:
+            return np.empty(0, dtype=np.int32)
+        listeler = [self.terim_indeksi.kelime_satirlari(t) for t in (terimler[:-1] if onek else terimler)]
+        if onek:
+            listeler.append(self.onek_satirlari(terimler[-1]))
+        # En kısa listeden başlayarak kesişim al
+        listeler.sort(key=len)
+        sonuc = listeler[0]
+        for liste in listeler[1:]:
+            if len(sonuc) == 0:
+                break
+            sonuc = np.intersect1d(sonuc, liste, assume_unique=True)
+        return sonuc
+
+    def tamamla(self, onek: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Önekle başlayan terimleri geçtiği tarif sayısına göre azalan sırada önerir"""
+        terimler = terimlere_ayir(onek)
+        if not terimler:
+            return []
+        bas, son = self.onek_araligi(terimler[-1])
+        if bas == son:
+            return []
+        frekanslar = self.frekanslar[bas:son]
+        k = min(limit, son - bas)
+        secilen = np.argpartition(-frekanslar, k - 1)[:k]
+        secilen = secilen[np.lexsort((secilen, -frekanslar[secilen]))]
+        return [{"term": str(self.terimler[bas + i]), "count": int(frekanslar[i])} for i in secilen]
+
+    def satirlar(self, indeksler: np.ndarray, sutunlar: Sequence[str] = SONUC_SUTUNLARI) -> List[Dict[str, Any]]:
+        """Satırların istenen sütunlarını boş değerler None olacak şekilde döndürür"""
+        return satir_kayitlari(self.veri, indeksler, sutunlar)
+
+class RecipeSearchService:
+    """
+    Veri setini bir kez yükleyip arama indeksini süreç içinde tutar.
+
+    Veri dosyası değiştiğinde (en fazla `kontrol_araligi` saniyede bir bakılır)
+    indeks yeniden kurulur.
+    """
+
+    def __init__(self, veri_yolu: Optional[str] = None, kontrol_araligi: float = 30.0):
+        self.veri_yolu = veri_yolu
+        self.kontrol_araligi = kontrol_araligi
+        self._indeks: Optional[RecipeSearchIndex] = None
+        self._imza = None
+        self._son_kontrol = 0.0
+        self._kilit = threading.Lock()
+
+    def _imza_al(self):
+        dosya = veri_dosyasini_bul(veri_yolunu_bul(self.veri_yolu))
+        if not os.path.exists(dosya):
+            return None
+        stat = os.stat(dosya)
+        return (dosya, stat.st_mtime_ns, stat.st_size)
+
+    def indeks(self) -> Optional[RecipeSearchIndex]:
+        """Güncel arama indeksini döndürür; gerekirse (yeniden) kurar"""
+        simdi = time.monotonic()
+        if self._indeks is not None and simdi - self._son_kontrol < self.kontrol_araligi:
+            return self._indeks
+        with self._kilit:
+            self._son_kontrol = simdi
+            imza = self._imza_al()
+            if self._indeks is None or imza != self._imza:
+                veri = veri_yukle(self.veri_yolu)
+                if veri is None:
+                    return self._indeks
+                baslangic = time.perf_counter()
+                self._indeks = RecipeSearchIndex(veri)
+                self._imza = imza
+                logger.info(
+                    f"Tarif arama indeksi kuruldu: {len(veri)} tarif, {len(self._indeks.terimler)} terim "
+                    f"({time.perf_counter() - baslangic:.2f} sn)"
+                )
+            return self._indeks
+
+recipe_search = RecipeSearchService(
+    veri_yolu=settings.NUTRITION_DATA_PATH,
+    kontrol_araligi=settings.NUTRITION_RELOAD_CHECK_SECONDS
+)
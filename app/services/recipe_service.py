@@ -1,19 +1,19 @@
-import pandas as pd
 from typing import List, Dict, Any
+from app.services.recipe_search import recipe_search
 
 def get_recipe_names_by_keyword(keyword: str):
     """
     Verilen anahtar kelimeye göre tarif isimlerini döndürür.
-    """
-    # CSV dosyasını yükleme
-    data = pd.read_csv('./data/dataset.csv')
-
-    # Anahtar kelimeye göre filtreleme
-    filtered_recipes = data[data['Keywords'].str.contains(keyword, na=False)]
     
-    # Tariflerin isimlerini al
-    recipe_names = filtered_recipes['Name'].tolist()
-    return recipe_names
+    Eşleşme terim bazındadır: anahtar kelimenin tüm terimlerini (ad, kategori
+    veya etiketlerde) içeren tarifler döner; büyük/küçük harf ayrımı yapılmaz.
+    """
+    # Süreç içinde bir kez kurulan arama indeksinin posting list'leri kullanılır (CSV her çağrıda okunmaz)
+    index = recipe_search.indeks()
+    if index is None:
+        return []
+    rows = index.ara(keyword, onek=False)
+    return [recipe["Name"] for recipe in index.satirlar(rows, ["Name"])]
 
 def get_breakfast_recipes() -> List[Dict[str, Any]]:
     """Sabah kahvaltısı için tarifler döndürür"""
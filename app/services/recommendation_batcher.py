@@ -0,0 +1,146 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.models.nutrition_model import etkin_filtre
+from app.services.inference_pool import inference_pool
+
+logger = logging.getLogger(__name__)
+
+class _BekleyenSorgu:
+    __slots__ = ("artifacts", "girdi", "n_neighbors", "filtre", "future", "zaman")
+
+    def __init__(self, artifacts, girdi, n_neighbors, filtre, future):
+        self.artifacts = artifacts
+        self.girdi = girdi
+        self.n_neighbors = n_neighbors
+        self.filtre = filtre
+        self.future = future
+        self.zaman = time.perf_counter()
+
+class RecommendationBatcher:
+    """
+    Eşzamanlı öneri isteklerini kısa bir pencere boyunca toplayıp tek matris sorgusu yapar.
+
+    İlk sorgu geldiğinde `pencere_ms` kadar beklenir ya da `en_buyuk_parti`
+    sorguya ulaşılınca hemen çalıştırılır. Her çağıran kendi satırını içeren
+    sonucu future üzerinden alır. Tüm durum olay döngüsü iş parçacığında
+    değiştirildiğinden kilit gerekmez.
+    """
+
+    def __init__(self, pencere_ms: float = 2.0, en_buyuk_parti: int = 64):
+        self.pencere = pencere_ms / 1000
+        self.en_buyuk_parti = max(1, en_buyuk_parti)
+        self._bekleyenler: List[_BekleyenSorgu] = []
+        self._zamanlayici = None
+        self._gorevler = set()
+
+        # Metrikler
+        self.toplam_parti = 0
+        self.toplam_sorgu = 0
+        self.en_buyuk_gorulen_parti = 0
+        self.parti_boyutu_dagilimi: Dict[int, int] = {}
+        self.toplam_bekleme = 0.0
+        self.en_uzun_bekleme = 0.0
+        self.toplam_calisma = 0.0
+
+    async def komsular(self, artifacts, girdi_degerleri, n_neighbors: int, filtre=None) -> np.ndarray:
+        """Sorguyu bir sonraki partiye ekler ve komşu indekslerini döndürür"""
+        filtre = etkin_filtre(filtre)
+        # Çıkarım kuyruğu doluysa sorgu partiye hiç alınmadan 503 ile reddedilir
+        inference_pool.rezerve()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._bekleyenler.append(_BekleyenSorgu(artifacts, girdi_degerleri, n_neighbors, filtre, future))
+
+        if len(self._bekleyenler) >= self.en_buyuk_parti:
+            self._bosalt()
+        elif self._zamanlayici is None:
+            self._zamanlayici = loop.call_later(self.pencere, self._bosalt)
+
+        return await future
+
+    def _bosalt(self):
+        """Bekleyen sorguları partiye çevirip arka planda çalıştırır"""
+        if self._zamanlayici is not None:
+            self._zamanlayici.cancel()
+            self._zamanlayici = None
+        bekleyenler, self._bekleyenler = self._bekleyenler, []
+        if not bekleyenler:
+            return
+
+        # Pencere sırasında model yeniden yüklendiyse her sürüm, her filtre de kendi partisinde çalışır
+        gruplar: Dict[Tuple[int, Optional[str]], List[_BekleyenSorgu]] = {}
+        for sorgu in bekleyenler:
+            filtre_anahtari = sorgu.filtre.anahtar() if sorgu.filtre is not None else None
+            gruplar.setdefault((id(sorgu.artifacts), filtre_anahtari), []).append(sorgu)
+
+        for grup in gruplar.values():
+            gorev = asyncio.ensure_future(self._calistir(grup))
+            # Görev tamamlanana kadar referansı tut
+            self._gorevler.add(gorev)
+            gorev.add_done_callback(self._gorevler.discard)
+
+    async def _calistir(self, grup: List[_BekleyenSorgu]):
+        simdi = time.perf_counter()
+        self._metrik_kaydet(grup, simdi)
+        artifacts = grup[0].artifacts
+        try:
+            en_yakin_komsular = await inference_pool.komsu_indeksleri(
+                artifacts,
+                [sorgu.girdi for sorgu in grup],
+                max(sorgu.n_neighbors for sorgu in grup),
+                grup[0].filtre
+            )
+        except Exception as e:
+            logger.error(f"Toplu komşu araması hatası: {str(e)}")
+            for sorgu in grup:
+                if not sorgu.future.done():
+                    sorgu.future.set_exception(e)
+            return
+        finally:
+            self.toplam_calisma += time.perf_counter() - simdi
+            inference_pool.birak(len(grup))
+
+        for sorgu, satir in zip(grup, en_yakin_komsular):
+            # İstemci bağlantıyı kapattıysa future iptal edilmiş olabilir
+            if not sorgu.future.done():
+                sorgu.future.set_result(satir[:sorgu.n_neighbors])
+
+    def _metrik_kaydet(self, grup: List[_BekleyenSorgu], simdi: float):
+        boyut = len(grup)
+        self.toplam_parti += 1
+        self.toplam_sorgu += boyut
+        self.en_buyuk_gorulen_parti = max(self.en_buyuk_gorulen_parti, boyut)
+        # Parti boyutları 2'nin kuvveti aralıklarında sayılır (1, 2, 4, 8, ...)
+        kova = 1 << (boyut - 1).bit_length()
+        self.parti_boyutu_dagilimi[kova] = self.parti_boyutu_dagilimi.get(kova, 0) + 1
+        for sorgu in grup:
+            bekleme = simdi - sorgu.zaman
+            self.toplam_bekleme += bekleme
+            self.en_uzun_bekleme = max(self.en_uzun_bekleme, bekleme)
+
+    def istatistikler(self) -> Dict[str, Any]:
+        """Parti boyutu ve kuyrukta bekleme metriklerini döndürür"""
+        return {
+            "window_ms": self.pencere * 1000,
+            "max_batch_size": self.en_buyuk_parti,
+            "batches": self.toplam_parti,
+            "queries": self.toplam_sorgu,
+            "avg_batch_size": round(self.toplam_sorgu / self.toplam_parti, 2) if self.toplam_parti else 0,
+            "max_observed_batch_size": self.en_buyuk_gorulen_parti,
+            "batch_size_histogram": {f"<={k}": v for k, v in sorted(self.parti_boyutu_dagilimi.items())},
+            "avg_queue_delay_ms": round(self.toplam_bekleme / self.toplam_sorgu * 1000, 3) if self.toplam_sorgu else 0,
+            "max_queue_delay_ms": round(self.en_uzun_bekleme * 1000, 3),
+            "avg_batch_run_ms": round(self.toplam_calisma / self.toplam_parti * 1000, 3) if self.toplam_parti else 0,
+            "pending": len(self._bekleyenler)
+        }
+
+recommendation_batcher = RecommendationBatcher(
+    pencere_ms=settings.NUTRITION_BATCH_WINDOW_MS,
+    en_buyuk_parti=settings.NUTRITION_BATCH_MAX_SIZE
+)
@@ -0,0 +1,117 @@
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+from cachetools import TTLCache
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+def adimlari_coz(adimlar: str) -> Tuple[float, ...]:
+    """Virgülle ayrılmış yuvarlama adımlarını sayılara çevirir"""
+    return tuple(float(adim) for adim in adimlar.split(",") if adim.strip())
+
+class RecommendationCache:
+    """
+    Yuvarlanmış besin değeri vektörü için komşu indekslerini saklayan süreç içi önbellek.
+
+    Girdi her besin değeri için ayarlanan adıma yuvarlanır ve arama da bu
+    yuvarlanmış vektörle yapılır; böylece aynı kovaya düşen tüm istekler aynı
+    sonucu alır. Anahtar artefakt sürümünü içerir; model veya veri seti
+    değiştiğinde eski kayıtlar kullanılmaz ve son görülen `en_fazla_surum`
+    sürümün dışına düşen sürümün kayıtları silinir.
+    """
+
+    def __init__(self, boyut: int = 10000, ttl: float = 300.0, adimlar: Sequence[float] = (), en_fazla_surum: int = 4):
+        self.boyut = boyut
+        self.ttl = ttl
+        self.adimlar = np.asarray(adimlar, dtype=float)
+        self._onbellek = TTLCache(maxsize=boyut, ttl=ttl) if boyut > 0 else None
+        self._kilit = threading.Lock()
+        self.en_fazla_surum = en_fazla_surum
+        self._surumler: "OrderedDict[str, None]" = OrderedDict()
+        self.isabet = 0
+        self.iska = 0
+        self.temizleme = 0
+
+    @property
+    def etkin(self) -> bool:
+        return self._onbellek is not None
+
+    def yuvarla(self, girdi_degerleri) -> Tuple[float, ...]:
+        """Girdiyi yapılandırılan adımlara yuvarlar; adımı 0 olan değerler olduğu gibi kalır"""
+        girdi = np.asarray(girdi_degerleri, dtype=float)
+        if len(self.adimlar) != len(girdi):
+            return tuple(girdi.tolist())
+        adimlar = np.where(self.adimlar > 0, self.adimlar, 1.0)
+        yuvarlanmis = np.where(self.adimlar > 0, np.round(girdi / adimlar) * adimlar, girdi)
+        # -0.0 ile 0.0 aynı anahtara düşsün
+        return tuple((yuvarlanmis + 0.0).tolist())
+
+    def anahtar(self, surum: str, yuvarlanmis, n_neighbors: int, filtre_anahtari: Optional[str]):
+        return (surum, yuvarlanmis, n_neighbors, filtre_anahtari)
+
+    def al(self, anahtar) -> Optional[np.ndarray]:
+        """Kayıt varsa komşu indekslerini döndürür, yoksa None"""
+        if self._onbellek is None:
+            return None
+        with self._kilit:
+            self._surumu_gordu(anahtar[0])
+            sonuc = self._onbellek.get(anahtar)
+            if sonuc is None:
+                self.iska += 1
+            else:
+                self.isabet += 1
+            return sonuc
+
+    def _surumu_gordu(self, surum: str):
+        """Son görülen sürümleri izler; listeden düşen sürümün kayıtları bırakılır"""
+        if surum in self._surumler:
+            self._surumler.move_to_end(surum)
+            return
+        self._surumler[surum] = None
+        # A/B dağılımında birden çok sürüm aynı anda hizmet verir; yalnızca artık kullanılmayanlar silinir
+        while len(self._surumler) > self.en_fazla_surum:
+            eski, _ = self._surumler.popitem(last=False)
+            for kayit in [k for k in list(self._onbellek.keys()) if k[0] == eski]:
+                self._onbellek.pop(kayit, None)
+            self.temizleme += 1
+            logger.info(f"Öneri önbelleğinden eski sürüm kayıtları silindi: {eski}")
+
+    def koy(self, anahtar, indeksler: np.ndarray):
+        if self._onbellek is None:
+            return
+        indeksler = np.array(indeksler, dtype=np.int64)
+        indeksler.setflags(write=False)
+        with self._kilit:
+            # Arama sürerken sürüm devreden çıktıysa eski sonuç yazılmaz
+            if anahtar[0] in self._surumler:
+                self._onbellek[anahtar] = indeksler
+
+    def temizle(self):
+        if self._onbellek is not None:
+            with self._kilit:
+                self._onbellek.clear()
+
+    def istatistikler(self) -> Dict[str, Any]:
+        toplam = self.isabet + self.iska
+        return {
+            "enabled": self.etkin,
+            "max_size": self.boyut,
+            "ttl_seconds": self.ttl,
+            "steps": self.adimlar.tolist(),
+            "size": len(self._onbellek) if self._onbellek is not None else 0,
+            "hits": self.isabet,
+            "misses": self.iska,
+            "hit_ratio": round(self.isabet / toplam, 4) if toplam else 0,
+            "version_invalidations": self.temizleme
+        }
+
+recommendation_cache = RecommendationCache(
+    boyut=settings.NUTRITION_CACHE_SIZE,
+    ttl=settings.NUTRITION_CACHE_TTL_SECONDS,
+    adimlar=adimlari_coz(settings.NUTRITION_CACHE_STEPS)
+)
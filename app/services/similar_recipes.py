@@ -0,0 +1,112 @@
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.models.recipe_filter import metin_sutunu
+from app.models.recipe_similarity import (
+    KOMSU_META_DOSYASI,
+    MALZEME_SUTUNU,
+    META_DOSYASI,
+    RecipeSimilarityIndex,
+    benzerlik_dizini,
+    benzerlik_indeksi_ac,
+    tfidf_indeksi_olustur
+)
+
+logger = logging.getLogger(__name__)
+
+# Aynı anda açık tutulan en fazla indeks (A/B dağılımında birden çok veri seti olabilir)
+EN_FAZLA_INDEKS = 4
+
+def benzerleri_hesapla(indeks: RecipeSimilarityIndex, tohumlar: Sequence[int], n: int,
+                       birlestirme: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Tek tarif için (varsa komşu tablosundan) ya da birden çok tarif için birleşik benzerleri döndürür"""
+    if birlestirme is None and len(tohumlar) == 1:
+        return indeks.benzerler(int(tohumlar[0]), n)
+    return indeks.cok_tohumlu_benzerler(tohumlar, n, birlestirme or "mean")
+
+class SimilarRecipeService:
+    """
+    Hizmet veren model sürümünün veri setine ait TF-IDF indeksini süreç içinde tutar.
+
+    İndeks yalnızca diskten açılır; istek yolunda hiçbir zaman oluşturulmaz.
+    Eksik veya veri setinden eski indeks ısınmada (`hazirla`) ya da
+    script.convert_dataset ile çevrimdışı oluşturulur. İndeks dosyası
+    değiştiğinde (en fazla `kontrol_araligi` saniyede bir bakılır) yeniden açılır.
+    """
+
+    def __init__(self, kontrol_araligi: float = 5.0):
+        self.kontrol_araligi = kontrol_araligi
+        # veri yolu -> (meta imzası, son kontrol zamanı, indeks)
+        self._indeksler: "OrderedDict[str, Tuple[Optional[tuple], float, Optional[RecipeSimilarityIndex]]]" = OrderedDict()
+        self._kilit = threading.Lock()
+
+    @staticmethod
+    def _meta_imzasi(veri_yolu: str) -> Optional[tuple]:
+        """İndeks ve komşu tablosu meta dosyaları ile kaynak CSV'nin (mtime, boyut) imzası; indeks yoksa None"""
+        dizin = benzerlik_dizini(veri_yolu)
+        imza = []
+        for yol in (os.path.join(dizin, META_DOSYASI), os.path.join(dizin, KOMSU_META_DOSYASI), veri_yolu):
+            if not os.path.exists(yol):
+                imza.append(None)
+                continue
+            stat = os.stat(yol)
+            imza.append((stat.st_mtime_ns, stat.st_size))
+        return tuple(imza) if imza[0] is not None else None
+
+    @staticmethod
+    def _gecerli_mi(indeks: Optional[RecipeSimilarityIndex], artifacts) -> bool:
+        # Satır sayısı farklıysa indeksler öneri uç noktalarının satırlarıyla eşleşmez
+        return indeks is not None and len(indeks) == len(artifacts.veri)
+
+    def indeks(self, artifacts) -> Optional[RecipeSimilarityIndex]:
+        """Artefaktların veri setine ait güncel indeksi döndürür; yoksa veya eskiyse None"""
+        veri_yolu = artifacts.veri_yolu
+        kayit = self._indeksler.get(veri_yolu)
+        if kayit is not None and time.monotonic() - kayit[1] < self.kontrol_araligi:
+            return kayit[2] if self._gecerli_mi(kayit[2], artifacts) else None
+
+        with self._kilit:
+            imza = self._meta_imzasi(veri_yolu)
+            kayit = self._indeksler.get(veri_yolu)
+            if kayit is not None and kayit[0] == imza:
+                indeks = kayit[2]
+            else:
+                indeks = benzerlik_indeksi_ac(veri_yolu) if imza is not None else None
+                if indeks is not None:
+                    logger.info(f"TF-IDF benzerlik indeksi açıldı: {indeks.dizin} ({len(indeks)} tarif)")
+            self._indeksler[veri_yolu] = (imza, time.monotonic(), indeks)
+            self._indeksler.move_to_end(veri_yolu)
+            while len(self._indeksler) > EN_FAZLA_INDEKS:
+                self._indeksler.popitem(last=False)
+
+        if not self._gecerli_mi(indeks, artifacts):
+            if indeks is not None:
+                logger.warning(f"TF-IDF indeksi veri setiyle eşleşmiyor ({len(indeks)} != {len(artifacts.veri)}): {indeks.dizin}")
+            return None
+        return indeks
+
+    def hazirla(self, artifacts) -> RecipeSimilarityIndex:
+        """
+        İndeksi açar; yoksa veya veri setinden eskiyse hizmet veren veri setinin
+        malzemelerinden oluşturup diske yazar (yalnızca ısınma/çevrimdışı kullanım için)
+        """
+        indeks = self.indeks(artifacts)
+        if indeks is not None:
+            return indeks
+        metinler = [metin or "" for metin in metin_sutunu(artifacts.veri, MALZEME_SUTUNU)]
+        tfidf_indeksi_olustur(artifacts.veri_yolu, metinler)
+        with self._kilit:
+            self._indeksler.pop(artifacts.veri_yolu, None)
+        indeks = self.indeks(artifacts)
+        if indeks is None:
+            raise RuntimeError(f"TF-IDF indeksi oluşturulamadı: {benzerlik_dizini(artifacts.veri_yolu)}")
+        return indeks
+
+similar_recipes = SimilarRecipeService(kontrol_araligi=settings.NUTRITION_RELOAD_CHECK_SECONDS)
@@ -0,0 +1,168 @@
+import logging
+import time
+from typing import Any, Dict, Sequence
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+from app.models.nutrition_model import (
+    goal_from_text,
+    calculate_bke_array,
+    daily_calorie_requirements_array,
+    activity_multiplier_array,
+    calculate_macros_array
+)
+
+logger = logging.getLogger(__name__)
+
+YUZDELIKLER = (5, 25, 50, 75, 95)
+# BKİ sınıfları: (üst sınır, ad)
+BKE_SINIFLARI = ((18.5, "underweight"), (25.0, "normal"), (30.0, "overweight"), (np.inf, "obese"))
+
+class StreamingHistogram:
+    """
+    Sabit kovalı, parça parça beslenen histogram.
+
+    Bellek kullanımı kova sayısıyla sınırlıdır; yüzdelikler kova içinde
+    doğrusal enterpolasyonla yaklaşık hesaplanır (hata en fazla bir kova genişliği).
+    """
+
+    def __init__(self, baslangic: float, bitis: float, adim: float):
+        self.sinirlar = np.arange(baslangic, bitis + adim / 2, adim)
+        # 0: alt taşma, son: üst taşma
+        self.sayilar = np.zeros(len(self.sinirlar) + 1, dtype=np.int64)
+        self.adet = 0
+        self.toplam = 0.0
+        self.kare_toplam = 0.0
+        self.en_kucuk = np.inf
+        self.en_buyuk = -np.inf
+
+    def ekle(self, degerler: np.ndarray):
+        degerler = np.asarray(degerler, dtype=float)
+        degerler = degerler[np.isfinite(degerler)]
+        if not len(degerler):
+            return
+        kovalar = np.searchsorted(self.sinirlar, degerler, side="right")
+        self.sayilar += np.bincount(kovalar, minlength=len(self.sayilar))
+        self.adet += len(degerler)
+        self.toplam += float(degerler.sum())
+        self.kare_toplam += float(np.square(degerler).sum())
+        self.en_kucuk = min(self.en_kucuk, float(degerler.min()))
+        self.en_buyuk = max(self.en_buyuk, float(degerler.max()))
+
+    def yuzdelik(self, p: float) -> float:
+        hedef = p / 100 * self.adet
+        kumulatif = np.cumsum(self.sayilar)
+        kova = min(int(np.searchsorted(kumulatif, hedef, side="left")), len(self.sayilar) - 1)
+        alt = self.sinirlar[kova - 1] if kova > 0 else self.en_kucuk
+        ust = self.sinirlar[kova] if kova < len(self.sinirlar) else self.en_buyuk
+        alt, ust = max(alt, self.en_kucuk), min(ust, self.en_buyuk)
+        onceki = kumulatif[kova - 1] if kova > 0 else 0
+        oran = (hedef - onceki) / self.sayilar[kova] if self.sayilar[kova] else 0.0
+        return float(alt + oran * (ust - alt))
+
+    def rapor(self, yuzdelikler: Sequence[float] = YUZDELIKLER) -> Dict[str, Any]:
+        if not self.adet:
+            return {"count": 0}
+        ortalama = self.toplam / self.adet
+        return {
+            "count": self.adet,
+            "mean": round(ortalama, 2),
+            "std": round(float(np.sqrt(max(self.kare_toplam / self.adet - ortalama ** 2, 0.0))), 2),
+            "min": round(self.en_kucuk, 2),
+            "max": round(self.en_buyuk, 2),
+            "percentiles": {f"p{p}": round(self.yuzdelik(p), 2) for p in yuzdelikler},
+            "histogram": {
+                "bin_edges": self.sinirlar.tolist(),
+                "counts": self.sayilar[1:-1].tolist(),
+                "below": int(self.sayilar[0]),
+                "above": int(self.sayilar[-1])
+            }
+        }
+
+def _sayac_ekle(sayac: Dict[str, int], degerler):
+    anahtarlar, adetler = np.unique(np.asarray(degerler, dtype=str), return_counts=True)
+    for anahtar, adet in zip(anahtarlar.tolist(), adetler.tolist()):
+        sayac[anahtar] = sayac.get(anahtar, 0) + adet
+
+def kullanici_analizi(db: Session, parca_boyutu: int = 5000) -> Dict[str, Any]:
+    """
+    Tüm kullanıcıları sunucu tarafı imleçle parça parça okuyup BKİ, bazal
+    metabolizma, günlük kalori ve makro dağılımlarını çıkarır.
+
+    ORM nesnesi oluşturulmaz; her parça NumPy dizilerine çevrilip mevcut
+    formüllerin vektörel sürümleriyle işlenir ve yalnızca histogramlar
+    güncellenir. Bellek kullanımı kullanıcı sayısından bağımsızdır.
+    """
+    baslangic = time.perf_counter()
+    histogramlar = {
+        "age": StreamingHistogram(10, 100, 5),
+        "bmi": StreamingHistogram(10, 60, 1),
+        "bmr": StreamingHistogram(800, 3000, 50),
+        "daily_calories": StreamingHistogram(1000, 5000, 100),
+        "protein_g": StreamingHistogram(0, 300, 10),
+        "carbs_g": StreamingHistogram(0, 800, 20),
+        "fat_g": StreamingHistogram(0, 250, 5)
+    }
+    hedefler: Dict[str, int] = {}
+    cinsiyetler: Dict[str, int] = {}
+    aktiviteler: Dict[str, int] = {}
+    bke_siniflari = {ad: 0 for _, ad in BKE_SINIFLARI}
+    toplam = 0
+    eksik = 0
+
+    sorgu = select(
+        User.weight, User.height, User.age, User.gender, User.activity_level, User.goal
+    ).execution_options(yield_per=parca_boyutu)
+
+    for parca in db.execute(sorgu).partitions():
+        weight, height, age, gender, activity, goal = zip(*parca)
+        weight = np.array(weight, dtype=float)
+        height = np.array(height, dtype=float)
+        age = np.array(age, dtype=float)
+        gender = np.char.lower(np.array([g or "" for g in gender], dtype=str))
+        activity = np.char.lower(np.array([a or "" for a in activity], dtype=str))
+        goal = np.array([goal_from_text(g) for g in goal], dtype=str)
+
+        toplam += len(parca)
+        _sayac_ekle(hedefler, goal)
+        _sayac_ekle(cinsiyetler, np.where(gender == "", "unknown", gender))
+        _sayac_ekle(aktiviteler, np.where(activity == "", "unknown", activity))
+        histogramlar["age"].ekle(age)
+
+        # Kalori hesabı için profili tam olan kullanıcılar
+        tam = (weight > 0) & (height > 0) & (age > 0) & (gender != "") & (activity != "")
+        eksik += int((~tam).sum())
+        if not tam.any():
+            continue
+        weight, height, age = weight[tam], height[tam], age[tam]
+        gender, activity, goal = gender[tam], activity[tam], goal[tam]
+
+        total_calories, bke = daily_calorie_requirements_array(weight, height, age, gender, activity)
+        macros = calculate_macros_array(total_calories, weight, goal)
+
+        bke_sirasi = np.searchsorted([ust for ust, _ in BKE_SINIFLARI], bke, side="right")
+        for sira, adet in enumerate(np.bincount(bke_sirasi, minlength=len(BKE_SINIFLARI)).tolist()):
+            bke_siniflari[BKE_SINIFLARI[sira][1]] += adet
+
+        histogramlar["bmi"].ekle(bke)
+        histogramlar["bmr"].ekle(total_calories / activity_multiplier_array(activity))
+        histogramlar["daily_calories"].ekle(total_calories)
+        for ad, degerler in macros.items():
+            histogramlar[ad].ekle(degerler)
+
+    sure = time.perf_counter() - baslangic
+    logger.info(f"Kullanıcı analizi tamamlandı: {toplam} kullanıcı, {sure:.2f} sn")
+    return {
+        "users": toplam,
+        "incomplete_profiles": eksik,
+        "chunk_size": parca_boyutu,
+        "duration_seconds": round(sure, 3),
+        "goals": hedefler,
+        "genders": cinsiyetler,
+        "activity_levels": aktiviteler,
+        "bmi_categories": bke_siniflari,
+        "distributions": {ad: histogram.rapor() for ad, histogram in histogramlar.items()}
+    }
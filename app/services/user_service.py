@@ -5,6 +5,7 @@ from typing import List, Optional
 from fastapi import HTTPException
 from datetime import datetime
 import logging
+from app.services.calorie_cache import calorie_cache, KALORI_ALANLARI
 
 # Şifre işlemleri için
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -71,6 +72,12 @@ def update_user(db: Session, user_id: int, user: UserCreate):
     # Güncelleme zamanını ayarla
     update_data["updated_at"] = datetime.now()
     
+    # Kalori profilini etkileyen bir alan değişiyor mu?
+    kalori_degisti = any(
+        key in update_data and update_data[key] != getattr(db_user, key)
+        for key in KALORI_ALANLARI
+    )
+    
     # Sadece gönderilen alanları güncelle
     for key, value in update_data.items():
         if hasattr(db_user, key):
@@ -78,6 +85,8 @@ def update_user(db: Session, user_id: int, user: UserCreate):
     
     try:
         db.commit()
+        if kalori_degisti:
+            calorie_cache.gecersiz_kil(user_id)
         db.refresh(db_user)
         return db_user
     except Exception as e:
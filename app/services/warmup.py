@@ -0,0 +1,97 @@
+import logging
+import threading
+
+from app.core.config import settings
+from app.core.readiness import readiness
+from app.models.nutrition_model import HAZIR_PROFILLER, nutrition_registry
+from app.services.diet_plan import plan_cozucusu_hazirla
+
+logger = logging.getLogger(__name__)
+
+MODEL = "nutrition_model"
+ISINMA_SORGUSU = "nutrition_warmup_query"
+FILTRE_INDEKSI = "recipe_filter_index"
+TFIDF = "tfidf"
+ARAMA_INDEKSI = "recipe_search_index"
+DIYET_PLANI = "diet_plan_solver"
+
+def _model_yukle():
+    readiness.basladi(MODEL)
+    artifacts = nutrition_registry.get() if nutrition_registry.yuklu_mu() else nutrition_registry.yukle()
+    if artifacts is None:
+        readiness.basarisiz(MODEL, nutrition_registry.son_hata or "Model veya veri seti yüklenemedi")
+        return None
+    readiness.tamamlandi(MODEL, {"version": artifacts.version, "rows": len(artifacts.veri)})
+    return artifacts
+
+def _sorgu_ile_isit(artifacts):
+    """Sahte bir sorguyla model ve indeks sayfalarını belleğe getirir"""
+    readiness.basladi(ISINMA_SORGUSU)
+    artifacts.komsular(list(HAZIR_PROFILLER.values()), 1)
+    readiness.tamamlandi(ISINMA_SORGUSU)
+
+def _filtre_indeksini_kur(artifacts):
+    readiness.basladi(FILTRE_INDEKSI)
+    artifacts.filtre_indeksi.indeksleri_hazirla()
+    readiness.tamamlandi(FILTRE_INDEKSI)
+
+def _diyet_plani_cozucusunu_kur(artifacts):
+    readiness.basladi(DIYET_PLANI)
+    # Model yüklenirken hazırlık adımı olarak kurulduysa yalnızca aranır
+    cozucu = plan_cozucusu_hazirla(artifacts)
+    readiness.tamamlandi(DIYET_PLANI, {"version": artifacts.version, "meal_indexes": len(cozucu.ogun_indeksleri)})
+
+def _tfidf_yukle(artifacts):
+    from app.services.similar_recipes import similar_recipes
+    readiness.basladi(TFIDF)
+    # Sunulan veri setinin indeksi diskte varsa yalnızca açılır, yoksa burada bir kez oluşturulur
+    index = similar_recipes.hazirla(artifacts)
+    readiness.tamamlandi(TFIDF, {"rows": len(index), "terms": index.matris.shape[1], "path": index.dizin})
+
+def _arama_indeksini_kur():
+    from app.services.recipe_search import recipe_search
+    readiness.basladi(ARAMA_INDEKSI)
+    indeks = recipe_search.indeks()
+    if indeks is None:
+        readiness.basarisiz(ARAMA_INDEKSI, "Veri seti yüklenemedi")
+        return
+    readiness.tamamlandi(ARAMA_INDEKSI, {"rows": len(indeks), "terms": len(indeks.terimler)})
+
+def _adim(ad, fonksiyon, *argumanlar):
+    """Isınma adımını çalıştırır; hata olursa kaydedip devam eder"""
+    try:
+        return fonksiyon(*argumanlar)
+    except Exception as e:
+        logger.error(f"Isınma adımı başarısız ({ad}): {str(e)}")
+        readiness.basarisiz(ad, str(e))
+        return None
+
+def artefaktlari_isit():
+    """Model, veri seti ve TF-IDF artefaktlarını yükleyip ısıtır"""
+    artifacts = _adim(MODEL, _model_yukle)
+    adimlar = [(ISINMA_SORGUSU, _sorgu_ile_isit), (FILTRE_INDEKSI, _filtre_indeksini_kur),
+               (DIYET_PLANI, _diyet_plani_cozucusunu_kur)]
+    if settings.NUTRITION_WARMUP_TFIDF:
+        adimlar.append((TFIDF, _tfidf_yukle))
+    for ad, fonksiyon in adimlar:
+        if artifacts is not None:
+            _adim(ad, fonksiyon, artifacts)
+        else:
+            readiness.basarisiz(ad, "Model yüklenemediği için çalıştırılmadı")
+    _adim(ARAMA_INDEKSI, _arama_indeksini_kur)
+    logger.info(f"AI artefaktları ısındı, hazır: {readiness.hazir_mi()}")
+
+def isinmayi_baslat() -> threading.Thread:
+    """Isınmayı arka planda başlatır; uygulama açılışı beklemez"""
+    readiness.kaydet(MODEL)
+    readiness.kaydet(ISINMA_SORGUSU)
+    # Filtre indeksi yalnızca filtreli sorgular için gerekir; hazır olmaması trafiği engellemez
+    readiness.kaydet(FILTRE_INDEKSI, zorunlu=False)
+    readiness.kaydet(ARAMA_INDEKSI, zorunlu=False)
+    # Hazır değilken yalnızca /diet-plan 503 döner
+    readiness.kaydet(DIYET_PLANI, zorunlu=False)
+    if settings.NUTRITION_WARMUP_TFIDF:
+        readiness.kaydet(TFIDF)
+    thread = threading.Thread(target=artefaktlari_isit, name="ai-warmup", daemon=True)
+    thread.start()
+    return thread
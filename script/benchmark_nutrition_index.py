@@ -0,0 +1,73 @@
+"""
+Yaklaşık komşu indekslerinin isabet (recall) ve gecikme karşılaştırması
+
+Eğitilmiş modelin KNN araması (tam sonuç) referans alınır; IVF indeksi farklı
+nlist/nprobe değerleriyle ölçülür. Çıktıdaki tabloya bakarak her kurulum için
+NUTRITION_INDEX_BACKEND / NUTRITION_IVF_NLIST / NUTRITION_IVF_NPROBE seçilebilir.
+
+Kullanım (proje kök dizininden):
+    python -m script.benchmark_nutrition_index --model app/models/trained_model.pkl
+"""
+
+import argparse
+import time
+import joblib
+import numpy as np
+
+from app.models.nutrition_index import ExactKNNIndex, IVFIndex
+
+def sorgu_olustur(egitim_matrisi, n_sorgu, gurultu, seed=0):
+    """Eğitim satırlarına gürültü ekleyerek gerçekçi sorgular üretir"""
+    rng = np.random.default_rng(seed)
+    secim = rng.choice(len(egitim_matrisi), size=n_sorgu, replace=len(egitim_matrisi) < n_sorgu)
+    return egitim_matrisi[secim] + rng.normal(0, gurultu, size=(n_sorgu, egitim_matrisi.shape[1]))
+
+def olc(indeks, sorgular, k, **parametreler):
+    """Tek tek sorgu gecikmelerini (ms) ve sonuçları döndürür"""
+    sonuclar = []
+    sureler = []
+    for sorgu in sorgular:
+        baslangic = time.perf_counter()
+        sonuclar.append(indeks.search(sorgu.reshape(1, -1), k, **parametreler)[0])
+        sureler.append((time.perf_counter() - baslangic) * 1000)
+    return np.array(sonuclar), np.array(sureler)
+
+def recall(tahmin, gercek):
+    """Her sorgu için bulunan gerçek komşu oranının ortalaması"""
+    return float(np.mean([len(np.intersect1d(t, g)) / len(g) for t, g in zip(tahmin, gercek)]))
+
+def satir_yaz(ad, sureler, isabet):
+    print(f"{ad:<28} recall@k={isabet:6.3f}  p50={np.percentile(sureler, 50):8.3f} ms  "
+          f"p95={np.percentile(sureler, 95):8.3f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Komşu indeksi recall/gecikme karşılaştırması")
+    parser.add_argument("--model", default="app/models/trained_model.pkl", help="Eğitilmiş pipeline dosyası")
+    parser.add_argument("--queries", type=int, default=500, help="Sorgu sayısı")
+    parser.add_argument("-k", type=int, default=10, help="Sorgu başına komşu sayısı")
+    parser.add_argument("--noise", type=float, default=0.1, help="Ölçeklenmiş uzayda sorgu gürültüsü")
+    parser.add_argument("--nlist", type=int, nargs="*", default=[0], help="Küme sayıları (0: karekök)")
+    parser.add_argument("--nprobe", type=int, nargs="*", default=[1, 2, 4, 8, 16, 32], help="Taranacak küme sayıları")
+    args = parser.parse_args()
+
+    model = joblib.load(args.model)
+    knn = model.named_steps['knn']
+    egitim_matrisi = np.asarray(knn._fit_X)
+    sorgular = sorgu_olustur(egitim_matrisi, args.queries, args.noise)
+    print(f"{len(egitim_matrisi)} satır, {egitim_matrisi.shape[1]} özellik, {args.queries} sorgu, k={args.k}")
+
+    gercek, sureler = olc(ExactKNNIndex(knn), sorgular, args.k)
+    satir_yaz("exact (sklearn)", sureler, 1.0)
+
+    for nlist in args.nlist:
+        baslangic = time.perf_counter()
+        ivf = IVFIndex(egitim_matrisi, nlist=nlist)
+        print(f"\nIVF nlist={ivf.nlist} kurulum süresi: {time.perf_counter() - baslangic:.2f} sn")
+        for nprobe in args.nprobe:
+            if nprobe > ivf.nlist:
+                continue
+            tahmin, sureler = olc(ivf, sorgular, args.k, nprobe=nprobe)
+            satir_yaz(f"ivf nlist={ivf.nlist} nprobe={nprobe}", sureler, recall(tahmin, gercek))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Tarif benzerliği için komşu tablosunu çevrimdışı oluşturur
+
+Her tarifin malzemelerine göre en benzer `k` tarifi hesaplanır ve veri
+setinin yanındaki `<ad>_tfidf/` dizinine mmap ile açılabilen `int32` indeks
+ve `float16` skor dizileri olarak yazılır. Benzer tarif sorguları tablo
+güncel olduğu sürece tek bir satır dilimiyle yanıtlanır.
+
+--incremental verildiğinde CSV'nin sonuna eklenen tarifler mevcut
+vektörleştiriciyle indekse eklenir ve yalnızca yeni tarifler hesaplanır;
+eski tariflerin metni değiştiyse tam oluşturma yapılır.
+
+Kullanım (proje kök dizininden):
+    python -m script.build_recipe_neighbours data/dataset.csv --k 50 --workers 8
+    python -m script.build_recipe_neighbours data/dataset.csv --incremental
+"""
+
+import argparse
+import time
+
+from app.models.recipe_similarity import (
+    benzerlik_indeksi_yukle,
+    tfidf_indeksine_ekle,
+    komsu_tablosu_olustur
+)
+
+def main():
+    parser = argparse.ArgumentParser(description="Tarif komşu tablosunu oluşturur")
+    parser.add_argument("path", help="Tarif veri seti (CSV)")
+    parser.add_argument("--k", type=int, default=50, help="Tarif başına saklanan komşu sayısı")
+    parser.add_argument("--workers", type=int, default=None, help="Süreç sayısı (varsayılan: çekirdek sayısı)")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Bir işte hesaplanan tarif sayısı")
+    parser.add_argument("--incremental", action="store_true", help="Yalnızca CSV'ye eklenen tarifleri hesapla")
+    args = parser.parse_args()
+
+    baslangic = time.perf_counter()
+    if args.incremental:
+        dizin, eklendi = tfidf_indeksine_ekle(args.path)
+        print(f"TF-IDF indeksi {'güncellendi' if eklendi else 'baştan oluşturuldu'}: {dizin}")
+    else:
+        dizin = benzerlik_indeksi_yukle(args.path).dizin
+    print(f"TF-IDF indeksi hazır ({time.perf_counter() - baslangic:.1f} sn)")
+
+    baslangic = time.perf_counter()
+    dizin, artimli = komsu_tablosu_olustur(
+        dizin, k=args.k, is_sayisi=args.workers, parca_boyutu=args.chunk_size, artimli=args.incremental
+    )
+    print(f"Komşu tablosu {'artımlı' if artimli else 'tam'} oluşturuldu: {dizin} ({time.perf_counter() - baslangic:.1f} sn)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""
+Tarif veri setini (CSV) bellek eşlemeli sütunsal formata dönüştürür
+
+Çıktı CSV'nin yanındaki `<ad>_columnar/` dizinine yazılır. veri_yukle ve
+load_recipe_data bu dizin güncel olduğu sürece CSV yerine onu kullanır;
+CSV sonradan değişirse dönüşüm tekrar çalıştırılmalıdır. Yanıtlarda kullanılan
+satır JSON'ları da aynı dizine yazılır ve worker'lar arasında mmap ile
+paylaşılır. Tarif benzerliği
+için TF-IDF indeksi de `<ad>_tfidf/` dizinine yazılır.
+
+Kullanım (proje kök dizininden):
+    python -m script.convert_dataset data/dataset.csv app/data/dataset.csv
+"""
+
+import argparse
+import time
+
+from app.models.recipe_store import veri_setini_donustur
+from app.models.recipe_similarity import tfidf_indeksi_olustur
+
+def main():
+    parser = argparse.ArgumentParser(description="CSV veri setini sütunsal formata dönüştürür")
+    parser.add_argument("paths", nargs="+", help="Dönüştürülecek CSV dosyaları")
+    args = parser.parse_args()
+
+    for veri_yolu in args.paths:
+        baslangic = time.perf_counter()
+        hedef = veri_setini_donustur(veri_yolu)
+        print(f"{veri_yolu} -> {hedef} ({time.perf_counter() - baslangic:.1f} sn)")
+        baslangic = time.perf_counter()
+        hedef = tfidf_indeksi_olustur(veri_yolu)
+        print(f"{veri_yolu} -> {hedef} ({time.perf_counter() - baslangic:.1f} sn)")
+
+if __name__ == "__main__":
+    main()
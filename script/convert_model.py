@@ -0,0 +1,31 @@
+"""
+Eğitilmiş modeli mmap ile açılabilecek şekilde sıkıştırmasız yeniden kaydeder
+
+joblib.load(..., mmap_mode='r') yalnızca sıkıştırılmamış dosyalarda numpy
+dizilerini bellek eşlemeli açar; sıkıştırılmış bir model her worker'da ayrı
+ayrı belleğe açılır. Bu betik modeli yerinde (geçici dosya + atomik taşıma)
+sıkıştırmasız formata çevirir.
+
+Kullanım (proje kök dizininden):
+    python -m script.convert_model app/models/trained_model.pkl
+"""
+
+import argparse
+import os
+import joblib
+
+def main():
+    parser = argparse.ArgumentParser(description="Modeli sıkıştırmasız joblib formatına çevirir")
+    parser.add_argument("path", help="Model dosyası")
+    parser.add_argument("--output", help="Çıktı dosyası (varsayılan: yerinde değiştir)")
+    args = parser.parse_args()
+
+    hedef = args.output or args.path
+    model = joblib.load(args.path)
+    gecici = hedef + ".tmp"
+    joblib.dump(model, gecici, compress=0)
+    os.replace(gecici, hedef)
+    print(f"{args.path} -> {hedef} (sıkıştırmasız, mmap_mode='r' ile açılabilir)")
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,19 @@
 import pandas as pd
 import numpy as np
 import os
+import sys
+import bisect
+import threading
 from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.feature_extraction.text import TfidfVectorizer
 from enum import Enum, auto
 
+# Betik doğrudan çalıştırıldığında app paketine erişebilmek için proje kökünü ekle
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.models.recipe_store import sutunsal_veri_ac
+from app.models.recipe_similarity import benzerlik_indeksi_yukle, en_iyi_k
+from app.models.recipe_filter import TERIM_DESENI, KeywordIndex, SortedColumnIndex
+
 # Tarif ve diyet anahtar kelimeleri için enum
 class RecipeKeyword(str, Enum):
     MAHI_MAHI = "Mahi Mahi"
@@ -361,16 +370,148 @@ def check_recipe_keyword(recipe, keyword):
     
     return False
 
+# Anahtar kelime aramasında bakılan sütunlar (check_recipe_keyword ile aynı)
+KEYWORD_SEARCH_COLUMNS = ('Name', 'RecipeIngredientParts', 'Category', 'Description')
+
+def text_terms(text):
+    """
+    Metni küçük harfli harf/rakam dizilerine ayırır (metin olduğu gibi, R c(...) sarmalayıcısı dahil)
+    """
+    if not text or not isinstance(text, str):
+        return []
+    return TERIM_DESENI.findall(text.lower())
+
+class RecipeKeywordIndex:
+    """
+    Tarif metinleri için terim -> sıralı satır numaraları ters indeksi
+    
+    Veri seti için bir kez kurulur; tüm RecipeKeyword değerlerinin satırları da
+    önceden hesaplanır. Eşleşme check_recipe_keyword ile aynıdır: anahtar kelime
+    aynı sütunun içinde alt dize olarak aranır ("Chicken Livers" iki kelimenin
+    ayrı ayrı geçtiği tariflerle eşleşmez). Aday satırlar, anahtar kelimenin
+    her terimini alt dize olarak içeren terimlerin satırlarından bulunur; tek
+    terimli anahtar kelimelerde adaylar sonucun kendisidir, diğerlerinde
+    yalnızca adaylar metin üzerinde doğrulanır. Çok anahtar kelimeli sorgular
+    sıralı dizilerin kesişim/birleşim/farkıyla çözülür.
+    """
+    
+    def __init__(self, recipes):
+        self.row_count = len(recipes)
+        self.columns = [column for column in KEYWORD_SEARCH_COLUMNS if column in recipes.columns]
+        # Doğrulama için sütun başına küçük harfli metinler
+        self.texts = [
+            [text.lower() if isinstance(text, str) and text else None for text in recipes[column].tolist()]
+            for column in self.columns
+        ]
+        self.terms = KeywordIndex(recipes, self.columns, ayirici=text_terms)
+        # Terimler kimlik sırasıyla tek metinde; alt dize araması bu metin üzerinde yapılır
+        vocabulary = list(self.terms.kelime_kimlikleri)
+        self.term_starts = np.cumsum([0] + [len(term) + 1 for term in vocabulary]).tolist()
+        self.vocabulary = "\n".join(vocabulary) + "\n"
+        
+        term_rows = {}
+        self.keyword_rows = {
+            keyword.value.lower(): self.match(keyword.value, term_rows)
+            for keyword in RecipeKeyword
+        }
+    
+    def term_rows(self, term):
+        """Terimi alt dize olarak içeren terimlerden en az birinin geçtiği sıralı satır numaraları"""
+        index = self.terms
+        term_ids = []
+        position = self.vocabulary.find(term)
+        while position != -1:
+            term_id = bisect.bisect_right(self.term_starts, position) - 1
+            term_ids.append(term_id)
+            position = self.vocabulary.find(term, self.term_starts[term_id + 1])
+        if len(term_ids) == 1:
+            return index.satirlar[index.baslangic[term_ids[0]]:index.baslangic[term_ids[0] + 1]]
+        mask = np.zeros(self.row_count, dtype=bool)
+        for term_id in term_ids:
+            mask[index.satirlar[index.baslangic[term_id]:index.baslangic[term_id + 1]]] = True
+        return np.flatnonzero(mask).astype(np.int32)
+    
+    def match(self, value, term_rows=None):
+        """check_recipe_keyword ile eşleşen tariflerin sıralı satır numaraları"""
+        needle = value.lower()
+        terms = text_terms(value)
+        if terms:
+            if term_rows is None:
+                term_rows = {}
+            for term in terms:
+                if term not in term_rows:
+                    term_rows[term] = self.term_rows(term)
+            # En kısa listeden başlayarak kesişim al
+            candidates = None
+            for rows in sorted((term_rows[term] for term in set(terms)), key=len):
+                candidates = rows if candidates is None else np.intersect1d(candidates, rows, assume_unique=True)
+            # Tek terimden oluşan anahtar kelimeyi içeren terim, metinde alt dize olarak geçer
+            if terms == [needle]:
+                return candidates
+            candidates = candidates.tolist()
+        else:
+            candidates = range(self.row_count)
+        matched = [
+            row for row in candidates
+            if any(texts[row] is not None and needle in texts[row] for texts in self.texts)
+        ]
+        return np.asarray(matched, dtype=np.int32)
+    
+    def rows(self, keyword):
+        """Anahtar kelimeyle eşleşen tariflerin sıralı satır numaralarını döndürür"""
+        value = keyword.value if isinstance(keyword, RecipeKeyword) else str(keyword)
+        rows = self.keyword_rows.get(value.lower())
+        if rows is None:
+            rows = self.match(value)
+        return rows
+    
+    def query(self, all_of=(), any_of=(), none_of=()):
+        """
+        all_of: hepsi (AND), any_of: en az biri (OR), none_of: hiçbiri (NOT)
+        """
+        result = None
+        # En kısa listeden başlayarak kesişim al
+        for rows in sorted((self.rows(keyword) for keyword in all_of), key=len):
+            result = rows if result is None else np.intersect1d(result, rows, assume_unique=True)
+        if any_of:
+            union = np.unique(np.concatenate([self.rows(keyword) for keyword in any_of]))
+            result = union if result is None else np.intersect1d(result, union, assume_unique=True)
+        if result is None:
+            result = np.arange(self.row_count, dtype=np.int32)
+        if none_of:
+            excluded = np.unique(np.concatenate([self.rows(keyword) for keyword in none_of]))
+            result = np.setdiff1d(result, excluded, assume_unique=True)
+        return result
+
+# Son kullanılan veri seti için kurulmuş anahtar kelime indeksi
+_keyword_index_cache = {}
+_keyword_index_lock = threading.Lock()
+
+def get_keyword_index(recipes):
+    """
+    Veri seti için anahtar kelime indeksini döndürür; aynı DataFrame için yeniden kurmaz
+    """
+    with _keyword_index_lock:
+        if _keyword_index_cache.get('recipes') is not recipes:
+            _keyword_index_cache.update(recipes=recipes, index=RecipeKeywordIndex(recipes))
+        return _keyword_index_cache['index']
+
 def filter_recipes_by_keyword(recipes, keyword):
     """
     Tarifleri belirli bir anahtar kelimeye göre filtreler
     """
-    if isinstance(recipes, pd.DataFrame):
-        filtered = []
-        for _, recipe in recipes.iterrows():
-            if check_recipe_keyword(recipe, keyword):
-                filtered.append(recipe)
-        return pd.DataFrame(filtered) if filtered else pd.DataFrame()
+    if isinstance(recipes, pd.DataFrame) and len(recipes):
+        rows = get_keyword_index(recipes).rows(keyword)
+        return recipes.iloc[rows] if len(rows) else pd.DataFrame()
+    return pd.DataFrame()
+
+def search_recipes_by_keywords(recipes, all_of=(), any_of=(), none_of=()):
+    """
+    Tarifleri birden çok anahtar kelimeyle (AND / OR / NOT) filtreler
+    """
+    if isinstance(recipes, pd.DataFrame) and len(recipes):
+        rows = get_keyword_index(recipes).query(all_of, any_of, none_of)
+        return recipes.iloc[rows]
     return pd.DataFrame()
 
 def load_recipe_data():
@@ -378,6 +519,13 @@ def load_recipe_data():
     Tarif veri setini yükler, bulunamazsa örnek veri oluşturur
     """
     try:
+        # Güncel sütunsal kopya varsa CSV ayrıştırmadan aç (sayısal sütunlar mmap üzerinden paylaşılır)
+        store = sutunsal_veri_ac(DATA_PATH)
+        if store is not None:
+            data = store.to_frame()
+            print(f"Veri seti sütunsal formattan yüklendi: {len(data)} tarifler")
+            return data
+        
         # CSV dosyasını oku
         data = pd.read_csv(DATA_PATH)
         print(f"Veri seti yüklendi: {len(data)} tarifler")
@@ -463,30 +611,93 @@ def create_sample_recipe_data(n_samples=100):
     
     return df
 
+# Süreç içinde bir kez yüklenen tarif kataloğu (veri dosyası değişince yenilenir)
+_catalogue_cache = {}
+_catalogue_lock = threading.Lock()
+# Diyet listesi seçimlerinde kullanılan rastgele sayı üreteci
+_diet_rng = np.random.default_rng()
+
+def data_signature():
+    """
+    Veri dosyasının değişip değişmediğini anlamak için (mtime, boyut) imzası
+    """
+    if os.path.exists(DATA_PATH):
+        stat = os.stat(DATA_PATH)
+        return (stat.st_mtime_ns, stat.st_size)
+    return None
+
+def load_recipe_catalogue():
+    """
+    Tarif veri setini süreç içinde bir kez yükler; veri dosyası değişmedikçe aynı DataFrame'i döndürür
+    """
+    signature = data_signature()
+    with _catalogue_lock:
+        if _catalogue_cache.get('signature') != signature or 'recipes' not in _catalogue_cache:
+            recipes = load_recipe_data()
+            # Örnek veri üretildiyse imza yeni yazılan dosyaya göre alınır
+            _catalogue_cache.update(signature=data_signature(), recipes=recipes)
+        return _catalogue_cache['recipes']
+
+class RecipeCalorieIndex:
+    """
+    Kalori sütununa göre sıralanmış tarif satırları
+
+    "En fazla X kalori" gibi bantlar searchsorted ile bitişik bir dilime
+    çevrilir ve seçim dilim içinde rastgele ofsetle yapılır; DataFrame
+    taranmaz, maske veya kopya oluşturulmaz.
+    """
+
+    def __init__(self, recipes):
+        self.calories = pd.to_numeric(recipes['Calories'], errors='coerce').to_numpy(dtype=float)
+        self.index = SortedColumnIndex(self.calories)
+
+    def sample(self, max_calories, n=1, positive_only=False, rng=None):
+        """
+        Kalorisi en fazla `max_calories` olan tariflerden `n` farklı satır numarası seçer
+
+        `positive_only` True ise kalorisi sıfır olan tarifler hariç tutulur.
+        """
+        start, stop = self.index.aralik(0 if positive_only else None, max_calories, alt_dahil=not positive_only)
+        return self.index.rastgele(start, stop, n, rng if rng is not None else _diet_rng)
+
+# Son kullanılan veri seti için kurulmuş kalori indeksi
+_calorie_index_cache = {}
+_calorie_index_lock = threading.Lock()
+
+def get_calorie_index(recipes):
+    """
+    Veri seti için kalori indeksini döndürür; aynı DataFrame için yeniden kurmaz
+    """
+    with _calorie_index_lock:
+        if _calorie_index_cache.get('recipes') is not recipes:
+            _calorie_index_cache.update(recipes=recipes, index=RecipeCalorieIndex(recipes))
+        return _calorie_index_cache['index']
+
 def create_diet_list(calorie_limit=2000):
     """
     Belirli bir kalori limitine göre diyet listesi oluşturur
     """
-    # Veriyi yükle
-    recipes = load_recipe_data()
+    # Veri ve kalori indeksi süreç içinde bir kez hazırlanır
+    recipes = load_recipe_catalogue()
+    calorie_index = get_calorie_index(recipes)
     
     # Kahvaltı, öğle yemeği, akşam yemeği olarak bölümlendir
-    breakfast = recipes[recipes['Calories'] <= calorie_limit * 0.3].sample(1)
-    lunch = recipes[recipes['Calories'] <= calorie_limit * 0.35].sample(1)
-    dinner = recipes[recipes['Calories'] <= calorie_limit * 0.35].sample(1)
+    breakfast = calorie_index.sample(calorie_limit * 0.3)
+    lunch = calorie_index.sample(calorie_limit * 0.35)
+    dinner = calorie_index.sample(calorie_limit * 0.35)
     
     # Toplam kalori hesabı yap
-    total_calories = breakfast['Calories'].sum() + lunch['Calories'].sum() + dinner['Calories'].sum()
+    total_calories = calorie_index.calories[np.concatenate([breakfast, lunch, dinner])].sum()
     
     # Eğer atıştırmalık için yer varsa ekle
     if total_calories < calorie_limit:
         snack_limit = calorie_limit - total_calories
-        snacks = recipes[(recipes['Calories'] <= snack_limit) & (recipes['Calories'] > 0)].sample(min(2, len(recipes)))
+        snacks = calorie_index.sample(snack_limit, n=2, positive_only=True)
     else:
-        snacks = pd.DataFrame()  # Boş DataFrame
+        snacks = np.empty(0, dtype=np.int64)  # Atıştırmalık yok
     
-    # Tüm öğünleri birleştir
-    diet_plan = pd.concat([breakfast, lunch, dinner, snacks])
+    # Tüm öğünleri tek seferde seç
+    diet_plan = recipes.iloc[np.concatenate([breakfast, lunch, dinner, snacks])].copy()
     
     # Yeni bir sütun ekleyerek öğün tipini belirt
     meal_types = ['Breakfast'] * len(breakfast) + ['Lunch'] * len(lunch) + ['Dinner'] * len(dinner) + ['Snack'] * len(snacks)
@@ -521,28 +732,94 @@ def create_diet_list_turkish(calorie_limit=2000):
     
     return diet_plan
 
-def recommend_recipes(recipe_index, n_recommendations=5):
+# Süreç içinde bir kez yüklenen TF-IDF artefaktları (veri dosyası değişince yenilenir)
+_tfidf_cache = {}
+_tfidf_lock = threading.Lock()
+
+def build_tfidf_matrix(recipes):
     """
-    Belirli bir tarife benzeyen tarifleri önerir
+    Tarif malzemelerinden TF-IDF matrisini oluşturur
+    """
+    tfidf = TfidfVectorizer(stop_words='english')
+    return tfidf.fit_transform(recipes['RecipeIngredientParts'].fillna(''))
+
+def load_similarity_index():
+    """
+    Veri setini ve diske yazılmış TF-IDF benzerlik indeksini döndürür
+
+    İndeks veri setinin yanında yoksa veya veri seti değiştiyse bir kez
+    oluşturulup kaydedilir; sonraki açılışlarda yalnızca diskten okunur.
+    """
+    with _tfidf_lock:
+        recipes = load_recipe_catalogue()
+        if _tfidf_cache.get('recipes') is not recipes or 'index' not in _tfidf_cache:
+            index = benzerlik_indeksi_yukle(
+                DATA_PATH, recipes['RecipeIngredientParts'].fillna('').tolist()
+            )
+            _tfidf_cache.update(recipes=recipes, index=index)
+        return _tfidf_cache['recipes'], _tfidf_cache['index']
+
+def load_tfidf_artifacts():
+    """
+    Veri setini ve L2 normalize TF-IDF matrisini döndürür; veri dosyası değişmedikçe yeniden hesaplamaz
+    """
+    recipes, index = load_similarity_index()
+    return recipes, index.matris
+
+def similar_recipe_indices(recipes, recipe_index, n_recommendations=5, tfidf_matrix=None):
+    """
+    Belirli bir tarife en çok benzeyen tariflerin satır indekslerini döndürür
     """
-    # Veriyi yükle
-    recipes = load_recipe_data()
-    
     if recipe_index >= len(recipes):
         recipe_index = 0  # Geçersiz indeks durumunda ilk tarifi kullan
     
-    # TF-IDF vektörleştirici oluştur ve uygula
-    tfidf = TfidfVectorizer(stop_words='english')
-    tfidf_matrix = tfidf.fit_transform(recipes['RecipeIngredientParts'].fillna(''))
+    # Önceden hesaplanmış matris verilmediyse TF-IDF vektörleştirici oluştur ve uygula
+    if tfidf_matrix is None:
+        tfidf_matrix = build_tfidf_matrix(recipes)
     
     # Kosinüs benzerliklerini hesapla
     cosine_sim = cosine_similarity(tfidf_matrix[recipe_index:recipe_index+1], tfidf_matrix).flatten()
     
-    # En benzer tariflerin indekslerini al (kendisi hariç)
-    similar_indices = cosine_sim.argsort()[::-1][1:n_recommendations+1]
+    # En benzer tariflerin indekslerini al (kendisi hariç); tüm diziyi sıralamadan seç
+    cosine_sim[recipe_index] = -np.inf
+    return en_iyi_k(cosine_sim, n_recommendations)
+
+def recommend_recipes(recipe_index, n_recommendations=5):
+    """
+    Belirli bir tarife benzeyen tarifleri önerir
+    
+    Ortak malzemesi olan tarif n'den azsa liste kalan tarifler satır sırasıyla n'e tamamlanır.
+    """
+    # Veriyi ve TF-IDF indeksini yükle (süreç içinde önbelleklenir)
+    recipes, index = load_similarity_index()
+    if recipe_index >= len(recipes):
+        recipe_index = 0  # Geçersiz indeks durumunda ilk tarifi kullan
+    
+    similar_indices, _ = index.benzerler(recipe_index, n_recommendations)
+    
+    # Benzerliği 0 olan tarifler indeksten dönmez; eski davranıştaki gibi n sonuç için doldur
+    eksik = min(n_recommendations, len(recipes) - 1) - len(similar_indices)
+    if eksik > 0:
+        kalan = np.ones(len(recipes), dtype=bool)
+        kalan[similar_indices] = False
+        kalan[recipe_index] = False
+        similar_indices = np.concatenate([similar_indices, np.flatnonzero(kalan)[:eksik]])
     
     return recipes.iloc[similar_indices]
 
+def recommend_recipes_for_many(recipe_indices, n_recommendations=5, aggregation="mean"):
+    """
+    Birden çok tarife (örn. favorilerin tamamına) birlikte benzeyen tarifleri önerir
+    
+    Benzerlikler tarif başına birleştirilir (mean, sum, max); verilen tarifler sonuca dahil edilmez.
+    """
+    recipes, index = load_similarity_index()
+    similar_indices, scores = index.cok_tohumlu_benzerler(recipe_indices, n_recommendations, aggregation)
+    
+    recommendations = recipes.iloc[similar_indices].copy()
+    recommendations['Similarity'] = scores
+    return recommendations
+
 def recommend_recipes_turkish(recipe_index, n_recommendations=5):
     """
     Türkçe tarif önerileri yapar
@@ -0,0 +1,45 @@
+"""
+Kullanıcı popülasyonu analizi (BKİ, bazal metabolizma, kalori ve makro dağılımları)
+
+Kullanıcılar sunucu tarafı imleçle parça parça okunur; bellek kullanımı
+kullanıcı sayısından bağımsızdır. Aynı rapor yöneticiler için
+GET /api/nutrition/ai/analytics/users üzerinden de alınabilir.
+
+Kullanım (proje kök dizininden):
+    python -m script.user_analytics --chunk-size 5000 --output analiz.json
+"""
+
+import argparse
+import json
+
+from app.core.config import settings
+from app.db.base import SessionLocal
+# User ilişkilerindeki tüm modeller eşleyici kurulmadan önce yüklenmiş olmalı
+import app.models  # noqa: F401
+import app.models.nutrition  # noqa: F401
+import app.models.post  # noqa: F401
+from app.services.user_analytics import kullanici_analizi
+
+def main():
+    parser = argparse.ArgumentParser(description="Kullanıcı popülasyonu analizi")
+    parser.add_argument("--chunk-size", type=int, default=settings.ANALYTICS_CHUNK_SIZE,
+                        help="Veritabanından bir seferde okunan kullanıcı sayısı")
+    parser.add_argument("--output", help="Raporun yazılacağı JSON dosyası (verilmezse ekrana yazılır)")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        rapor = kullanici_analizi(db, parca_boyutu=args.chunk_size)
+    finally:
+        db.close()
+
+    metin = json.dumps(rapor, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(metin)
+        print(f"Rapor yazıldı: {args.output} ({rapor['users']} kullanıcı)")
+    else:
+        print(metin)
+
+if __name__ == "__main__":
+    main()
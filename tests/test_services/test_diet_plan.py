@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# Diyet planı çözücüsünün öğün etiketlerini, öğün kategorilerini, süre bütçesini ve kurulum zamanını doğrular
+
+import sys
+import os
+
+# Proje kök dizinini Python path'ine ekle
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, project_root)
+
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from app.models.nutrition_model import artefaktlari_hazirla
+from app.models.recipe_filter import RecipeFilterIndex
+from app.services import diet_plan
+from app.services.diet_plan import DietPlanSolver
+
+HEDEFLER = {"calories": 2000, "protein_g": 100, "carbs_g": 250, "fat_g": 70}
+
+def tarifler(satirlar):
+    """(kategori, etiketler, kalori) listesinden makroları kaloriyle orantılı küçük veri seti"""
+    kaloriler = np.array([kalori for _, _, kalori in satirlar], dtype=float)
+    return pd.DataFrame({
+        "RecipeId": np.arange(len(satirlar)) + 1000,
+        "Name": [f"Tarif {i}" for i in range(len(satirlar))],
+        "RecipeCategory": [kategori for kategori, _, _ in satirlar],
+        "Keywords": [etiketler for _, etiketler, _ in satirlar],
+        "Calories": kaloriler,
+        "ProteinContent": kaloriler * 0.05,
+        "CarbohydrateContent": kaloriler * 0.125,
+        "FatContent": kaloriler * 0.035,
+    })
+
+def cozucu(veri, **parametreler):
+    return DietPlanSolver(veri, filtre_indeksi=RecipeFilterIndex(veri), **parametreler)
+
+def test_ogunler_kendi_kategorilerinden_secilir():
+    rng = np.random.default_rng(0)
+    satirlar = []
+    for kategori, etiket, kalori in (("Breakfast", 'c("Breakfast")', 500), ("Lunch/Snacks", 'c("Lunch")', 700),
+                                     ("Stew", 'c("Dinner Party")', 600), ("Snacks", 'c("Easy")', 200)):
+        satirlar += [(kategori, etiket, float(k)) for k in rng.normal(kalori, 60, size=30).clip(50)]
+    veri = tarifler(satirlar)
+
+    plan = cozucu(veri, aday_sayisi=30, en_iyi_aday=4).plan(HEDEFLER, gun_sayisi=3, tohum=1, butce_ms=10_000)
+
+    beklenen = {"Breakfast": {"Breakfast"}, "Lunch": {"Lunch/Snacks"}, "Dinner": {"Stew"},
+                "Snack": {"Snacks", "Lunch/Snacks"}}
+    for gun in plan["days"]:
+        assert [ogun["meal_type"] for ogun in gun["meals"]] == ["Breakfast", "Lunch", "Dinner", "Snack"]
+        for ogun in gun["meals"]:
+            assert ogun["RecipeCategory"] in beklenen[ogun["meal_type"]]
+    # Hafta içinde tarif tekrar etmez
+    kimlikler = [ogun["RecipeId"] for gun in plan["days"] for ogun in gun["meals"]]
+    assert len(kimlikler) == len(set(kimlikler))
+
+def test_atlanan_ogun_sonraki_ogunlerin_etiketini_kaydirmaz():
+    # Akşam yemeğine uyan tek tarif öğle yemeğinde kullanıldığı için akşam öğünü atlanır
+    veri = tarifler([
+        ("Breakfast", 'c("Breakfast")', 450.0),
+        ("Stew", 'c("Lunch")', 650.0),
+        ("Snacks", 'c("Easy")', 180.0),
+    ])
+    plan = cozucu(veri, aday_sayisi=10, en_iyi_aday=1).plan(HEDEFLER, gun_sayisi=1, tohum=0, butce_ms=10_000)
+
+    ogunler = [(ogun["meal_type"], ogun["RecipeCategory"]) for ogun in plan["days"][0]["meals"]]
+    assert ogunler == [("Breakfast", "Breakfast"), ("Lunch", "Stew"), ("Snack", "Snacks")]
+    assert plan["days"][0]["totals"]["calories"] == 1280.0
+
+def test_butce_asilinca_plan_acgozlu_tamamlanir():
+    rng = np.random.default_rng(2)
+    veri = tarifler([("Main Dish", 'c("Easy")', float(k)) for k in rng.uniform(100, 900, size=200)])
+    solver = cozucu(veri, aday_sayisi=50, en_iyi_aday=8)
+
+    plan = solver.plan(HEDEFLER, gun_sayisi=2, atistirmalik_sayisi=2, tohum=0, butce_ms=0)
+
+    assert plan["budget_exceeded"]
+    for gun in plan["days"]:
+        assert [ogun["meal_type"] for ogun in gun["meals"]] == ["Breakfast", "Lunch", "Dinner", "Snack", "Snack"]
+
+def test_gun_plani_butceyi_ogun_basina_kontrol_eder():
+    rng = np.random.default_rng(3)
+    veri = tarifler([("Main Dish", 'c("Easy")', float(k)) for k in rng.uniform(100, 900, size=200)])
+    solver = cozucu(veri, aday_sayisi=50, en_iyi_aday=8)
+    hedef = np.array([2000.0, 100.0, 250.0, 70.0])
+    ogunler = [("Breakfast", 0.3), ("Lunch", 0.4), ("Dinner", 0.3)]
+
+    secim, acgozlu = solver.gun_plani(hedef, ogunler, np.empty(0, dtype=np.int64), rng, son_an=0.0)
+    assert acgozlu
+    assert [tip for tip, _ in secim] == ["Breakfast", "Lunch", "Dinner"]
+
+    secim, acgozlu = solver.gun_plani(hedef, ogunler, np.empty(0, dtype=np.int64), rng, son_an=None)
+    assert not acgozlu
+    assert len({satir for _, satir in secim}) == 3
+
+def test_cozucu_hazirlik_adiminda_kurulur_istekte_yalnizca_aranir():
+
+    veri = tarifler([("Breakfast", 'c("Breakfast")', 400.0), ("Stew", 'c("Lunch")', 600.0)])
+    artifacts = SimpleNamespace(version="test-hazirlik", veri=veri, filtre_indeksi=RecipeFilterIndex(veri))
+    try:
+        # Model yüklenirken/etkinleşirken çalışan hazırlık adımları çözücüyü kurar
+        artefaktlari_hazirla(artifacts)
+        cozucu = diet_plan.plan_cozucusu(artifacts)
+        assert isinstance(cozucu, DietPlanSolver)
+        assert diet_plan.plan_cozucusu(artifacts) is cozucu
+    finally:
+        diet_plan._cozuculer.pop("test-hazirlik", None)
+
+def test_kurulmamis_cozucu_istekte_kurulmaz():
+
+    veri = tarifler([("Breakfast", 'c("Breakfast")', 400.0)])
+    artifacts = SimpleNamespace(version="test-eksik", veri=veri, filtre_indeksi=RecipeFilterIndex(veri))
+    try:
+        # İstek yolunda None döner, kurulum arka planda yapılır
+        assert diet_plan.plan_cozucusu(artifacts) is None
+        for _ in range(200):
+            if "test-eksik" in diet_plan._cozuculer:
+                break
+            time.sleep(0.01)
+        assert isinstance(diet_plan.plan_cozucusu(artifacts), DietPlanSolver)
+    finally:
+        diet_plan._cozuculer.pop("test-eksik", None)
+
+def test_hedefi_sifir_olan_besinin_sapmasi_none():
+    sapmalar = diet_plan.sapma_yuzdeleri(np.array([1800.0, 110.0, 12.0, 140.0]), np.array([2000.0, 100.0, 0.0, 140.0]))
+    assert sapmalar == {"calories": -10.0, "protein_g": 10.0, "carbs_g": None, "fat_g": 0.0}
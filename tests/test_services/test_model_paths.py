@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# Yönetici uç noktasından yüklenen model/veri yollarının yapılandırılmış dizinlerle sınırlandığını doğrular
+
+import sys
+import os
+
+# Proje kök dizinini Python path'ine ekle
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, project_root)
+
+from app.core.config import settings
+from app.models.nutrition_model import izinli_model_yolu, izinli_veri_yolu
+
+def dizinler(tmp_path, monkeypatch):
+    modeller, veriler = tmp_path / "models", tmp_path / "data"
+    modeller.mkdir()
+    veriler.mkdir()
+    (modeller / "v2.pkl").write_bytes(b"")
+    (veriler / "dataset.csv").write_text("Name\n")
+    (tmp_path / "disarida.pkl").write_bytes(b"")
+    os.symlink(tmp_path / "disarida.pkl", modeller / "bag.pkl")
+    monkeypatch.setattr(settings, "NUTRITION_MODELS_DIR", str(modeller))
+    monkeypatch.setattr(settings, "NUTRITION_DATA_DIR", str(veriler))
+    return modeller, veriler
+
+def test_model_adi_veya_dizin_altindaki_yol_kabul_edilir(tmp_path, monkeypatch):
+    modeller, _ = dizinler(tmp_path, monkeypatch)
+    assert izinli_model_yolu("v2.pkl") == os.path.realpath(modeller / "v2.pkl")
+    assert izinli_model_yolu(str(modeller / "v2.pkl")) == os.path.realpath(modeller / "v2.pkl")
+
+def test_dizin_disindaki_model_yollari_reddedilir(tmp_path, monkeypatch):
+    modeller, _ = dizinler(tmp_path, monkeypatch)
+    assert izinli_model_yolu("../disarida.pkl") is None
+    assert izinli_model_yolu(str(tmp_path / "disarida.pkl")) is None
+    # Dizin içindeki sembolik bağ dışarıyı gösteriyorsa da reddedilir
+    assert izinli_model_yolu("bag.pkl") is None
+    assert izinli_model_yolu("yok.pkl") is None
+    assert izinli_model_yolu(".") is None
+
+def test_veri_yolu_ayni_kurala_uyar(tmp_path, monkeypatch):
+    _, veriler = dizinler(tmp_path, monkeypatch)
+    assert izinli_veri_yolu("dataset.csv") == os.path.realpath(veriler / "dataset.csv")
+    assert izinli_veri_yolu("../models/v2.pkl") is None
+    assert izinli_veri_yolu("/etc/passwd") is None
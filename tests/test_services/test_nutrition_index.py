@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# IVF komşu indeksinin tam KNN aramasına göre isabetini (recall) küçük sentetik veride doğrular
+
+import sys
+import os
+
+# Proje kök dizinini Python path'ine ekle
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, project_root)
+
+import numpy as np
+from sklearn.neighbors import NearestNeighbors
+
+from app.models.nutrition_index import ExactKNNIndex, IVFIndex, indeks_olustur
+
+def kumeli_veri(n=2000, boyut=6, kume=12, sorgu=50, seed=0):
+    """Ölçeklenmiş besin uzayına benzeyen kümeli veri ve gürültülü sorgular"""
+    rng = np.random.default_rng(seed)
+    merkezler = rng.normal(0, 3, size=(kume, boyut))
+    veriler = merkezler[rng.integers(0, kume, size=n)] + rng.normal(0, 0.5, size=(n, boyut))
+    sorgular = veriler[rng.choice(n, size=sorgu, replace=False)] + rng.normal(0, 0.1, size=(sorgu, boyut))
+    return veriler.astype(np.float32), sorgular.astype(np.float32)
+
+def recall(tahmin, gercek):
+    return float(np.mean([len(np.intersect1d(t, g)) / len(g) for t, g in zip(tahmin, gercek)]))
+
+def tam_indeks(veriler):
+    return ExactKNNIndex(NearestNeighbors().fit(veriler))
+
+def test_tum_kumeler_taranirsa_sonuc_tam_aramayla_ayni():
+    veriler, sorgular = kumeli_veri()
+    gercek = tam_indeks(veriler).search(sorgular, 10)
+    ivf = IVFIndex(veriler, nlist=16, nprobe=16)
+    assert recall(ivf.search(sorgular, 10), gercek) == 1.0
+
+def test_recall_nprobe_ile_artar():
+    veriler, sorgular = kumeli_veri()
+    gercek = tam_indeks(veriler).search(sorgular, 10)
+    ivf = IVFIndex(veriler, nlist=32)
+    isabetler = [recall(ivf.search(sorgular, 10, nprobe=nprobe), gercek) for nprobe in (1, 4, 32)]
+    assert isabetler == sorted(isabetler)
+    assert isabetler[1] >= 0.9
+    assert isabetler[2] == 1.0
+
+def test_sonuclar_uzakliga_gore_sirali():
+    veriler, sorgular = kumeli_veri()
+    sonuc = IVFIndex(veriler, nlist=16, nprobe=4).search(sorgular, 10)
+    uzakliklar = np.linalg.norm(veriler[sonuc] - sorgular[:, None, :], axis=2)
+    assert np.all(np.diff(uzakliklar, axis=1) >= -1e-5)
+
+def test_k_satir_sayisini_asarsa_tum_satirlar_doner():
+    veriler, sorgular = kumeli_veri(n=20, kume=2, sorgu=3)
+    sonuc = IVFIndex(veriler, nlist=4, nprobe=1).search(sorgular, 50)
+    assert sonuc.shape == (3, 20)
+    assert all(sorted(satir.tolist()) == list(range(20)) for satir in sonuc)
+
+def test_oklid_disi_metrikte_tam_aramaya_donulur():
+    veriler, _ = kumeli_veri(n=100)
+    knn = NearestNeighbors(metric="manhattan").fit(veriler)
+    assert isinstance(indeks_olustur(knn, backend="ivf"), ExactKNNIndex)
+    assert isinstance(indeks_olustur(NearestNeighbors().fit(veriler), backend="ivf", nlist=4), IVFIndex)
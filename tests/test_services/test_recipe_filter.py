@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# Öneri filtre maskelerini (aralıklar, boş değerler, içermeli/içermemeli, öğün) ve maskeli aramayı doğrular
+
+import sys
+import os
+
+# Proje kök dizinini Python path'ine ekle
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, project_root)
+
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import NearestNeighbors
+
+from app.models.nutrition_index import ExactKNNIndex, IVFIndex
+from app.models.nutrition_model import MealType, OGUN_IFADELERI, RecommendationFilter
+from app.models.recipe_filter import RecipeFilterIndex
+
+def ornek_tarifler():
+    return pd.DataFrame({
+        "Name": ["Oat Porridge", "Chicken Salad", "Beef Stew", "Breakfast Burrito", "Apple Pie", "Peanut Snack"],
+        "RecipeCategory": ["Breakfast", "Lunch/Snacks", "Stew", "Lunch/Snacks", "Dessert", "Snacks"],
+        "Keywords": ['c("Breakfast", "Easy")', 'c("Low Protein", "Easy")', 'c("High Protein")',
+                     'c("Mexican")', 'c("Easy")', np.nan],
+        "RecipeIngredientParts": ['c("oats", "milk")', 'c("chicken", "lettuce")', 'c("beef", "carrot")',
+                                  'c("egg", "tortilla")', 'c("apple", "flour")', 'c("peanut", "honey")'],
+        "Calories": [150.0, 320.0, 540.0, np.nan, 410.0, 200.0],
+        "ProteinContent": [5.0, 28.0, 35.0, 20.0, 3.0, np.nan],
+    })
+
+def maske(indeks, filtre):
+    return np.flatnonzero(indeks.maske(
+        filtre.anahtar(), filtre.araliklar(), icermeli=filtre.include_keywords,
+        icermemeli=filtre.exclude_keywords, ogun_ifadeleri=OGUN_IFADELERI.get(filtre.meal_type, [])
+    )).tolist()
+
+def test_araliklar_sinirlari_icerir_ve_bos_degerleri_eler():
+    indeks = RecipeFilterIndex(ornek_tarifler())
+    assert maske(indeks, RecommendationFilter(kalori_min=200, kalori_max=410)) == [1, 4, 5]
+    assert maske(indeks, RecommendationFilter(kalori_max=1000)) == [0, 1, 2, 4, 5]
+    assert maske(indeks, RecommendationFilter(protein_min=20, kalori_max=600)) == [1, 2]
+
+def test_icermeli_ifadelerin_hepsi_icermemeli_ifadelerin_hicbiri():
+    indeks = RecipeFilterIndex(ornek_tarifler())
+    assert maske(indeks, RecommendationFilter(include_keywords=["easy"])) == [0, 1, 4]
+    assert maske(indeks, RecommendationFilter(include_keywords=["easy", "chicken"])) == [1]
+    # Çok kelimeli ifade kelimelerin tümünü ister
+    assert maske(indeks, RecommendationFilter(include_keywords=["high protein"])) == [2]
+    assert maske(indeks, RecommendationFilter(exclude_keywords=["protein", "apple"])) == [0, 3, 5]
+    assert maske(indeks, RecommendationFilter(include_keywords=["easy"], exclude_keywords=["oats"])) == [1, 4]
+
+def test_ogun_tipi_yalnizca_kategori_ve_etiketlerden():
+    indeks = RecipeFilterIndex(ornek_tarifler())
+    # "Breakfast Burrito" adı kahvaltı sayılmaz; kategori/etiket belirler
+    assert maske(indeks, RecommendationFilter(meal_type=MealType.KAHVALTI)) == [0]
+    assert maske(indeks, RecommendationFilter(meal_type=MealType.ARA_OGUN)) == [1, 3, 5]
+    assert maske(indeks, RecommendationFilter(meal_type=MealType.ARA_OGUN, kalori_max=250)) == [5]
+
+def test_ayni_filtre_onbellekten_salt_okunur_doner():
+    indeks = RecipeFilterIndex(ornek_tarifler(), onbellek_boyutu=1)
+    filtre = RecommendationFilter(include_keywords=["Easy", "chicken"])
+    ayni = RecommendationFilter(include_keywords=["chicken", "easy"])
+    assert filtre.anahtar() == ayni.anahtar()
+    ilk = indeks.maske(filtre.anahtar(), {}, icermeli=filtre.include_keywords)
+    assert indeks.maske(ayni.anahtar(), {}, icermeli=ayni.include_keywords) is ilk
+    assert not ilk.flags.writeable
+    indeks.maske("baska", {"Calories": (None, 100)})
+    assert filtre.anahtar() not in indeks._maskeler
+
+def test_maskeli_arama_yalnizca_maskedeki_satirlari_dondurur():
+    rng = np.random.default_rng(1)
+    veriler = rng.normal(size=(500, 4)).astype(np.float32)
+    sorgular = rng.normal(size=(20, 4)).astype(np.float32)
+    maske_dizisi = rng.random(500) < 0.2
+    adaylar = np.flatnonzero(maske_dizisi)
+
+    tam = ExactKNNIndex(NearestNeighbors().fit(veriler)).search(sorgular, 5, maske=maske_dizisi)
+    uzakliklar = np.linalg.norm(veriler[adaylar][None, :, :] - sorgular[:, None, :], axis=2)
+    beklenen = adaylar[np.argsort(uzakliklar, axis=1, kind="stable")[:, :5]]
+    assert np.array_equal(np.asarray(tam), beklenen)
+
+    # Tüm kümeler tarandığında IVF de aynı sonucu verir
+    ivf = IVFIndex(veriler, nlist=8, nprobe=8).search(sorgular, 5, maske=maske_dizisi)
+    assert np.array_equal(ivf, beklenen)
+    # Az kümede de sonuçlar maskenin dışına çıkmaz ve k dolar
+    ivf = IVFIndex(veriler, nlist=8, nprobe=1).search(sorgular, 5, maske=maske_dizisi)
+    assert ivf.shape == (20, 5) and maske_dizisi[ivf].all()
+
+def test_maske_k_dan_az_satir_birakirsa_hepsi_doner():
+    veriler = np.arange(40, dtype=np.float32).reshape(20, 2)
+    maske_dizisi = np.zeros(20, dtype=bool)
+    maske_dizisi[[3, 7]] = True
+    sorgu = veriler[:1]
+    assert sorted(ExactKNNIndex(NearestNeighbors().fit(veriler)).search(sorgu, 5, maske=maske_dizisi)[0]) == [3, 7]
+    assert sorted(IVFIndex(veriler, nlist=4, nprobe=1).search(sorgu, 5, maske=maske_dizisi)[0]) == [3, 7]
+    maske_dizisi[:] = False
+    assert len(IVFIndex(veriler, nlist=4).search(sorgu, 5, maske=maske_dizisi)[0]) == 0
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# Anahtar kelime indeksinin eski iterrows taramasıyla aynı sonucu verdiğini doğrular
+
+import sys
+import os
+
+# Proje kök dizinini Python path'ine ekle
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, project_root)
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from script.diet_list_make import (
+    RecipeKeyword,
+    RecipeKeywordIndex,
+    check_recipe_keyword,
+    filter_recipes_by_keyword,
+    search_recipes_by_keywords
+)
+
+def sample_recipes():
+    """Alt dize, çok kelimeli ifade, sütunlar arası ve boş değer durumlarını içeren küçük veri"""
+    return pd.DataFrame({
+        "Name": ["Fried Chicken Livers", "Chicken Salad", "Pineapple Cake", None,
+                 "Livers and Onions", "Chickens on Toast", "Beef Stew", "Rice"],
+        "RecipeIngredientParts": ['c("chicken livers", "flour")', 'c("chicken", "lettuce")', 'c("pineapple", "sugar")',
+                                  'c("apple", "cinnamon")', 'c("beef livers", "onions")', 'c("bread")',
+                                  'c("beef", "carrot")', "character(0)"],
+        "Description": ["Crispy.", "Light lunch with livers on the side", np.nan, "Baked apple",
+                        "Old chicken recipe", "Toast < 30 Mins", "Slow cooked beef.", "Plain rice"]
+    }, index=[10, 11, 12, 13, 14, 15, 16, 17])
+
+def scan_rows(recipes, keyword):
+    """Eski filtre: her satır için check_recipe_keyword"""
+    return [row for row, (_, recipe) in enumerate(recipes.iterrows()) if check_recipe_keyword(recipe, keyword)]
+
+@pytest.mark.parametrize("keyword", [
+    "Chicken Livers", "chicken", "Apple", "livers", "< 30 Mins", "c", "c(", "Beef Stew",
+    "on", "Onions", "missing", RecipeKeyword.CHICKEN_LIVERS, RecipeKeyword.APPLE, RecipeKeyword.ONIONS
+])
+def test_rows_match_old_scan(keyword):
+    recipes = sample_recipes()
+    index = RecipeKeywordIndex(recipes)
+    assert index.rows(keyword).tolist() == scan_rows(recipes, keyword)
+
+def test_phrase_does_not_match_words_across_columns():
+    recipes = sample_recipes()
+    index = RecipeKeywordIndex(recipes)
+    # "Chicken Salad" açıklamasında "livers" geçse de ifade olarak eşleşmez
+    assert index.rows("Chicken Livers").tolist() == [0]
+
+def test_filter_returns_same_frame_as_old_scan():
+    recipes = sample_recipes()
+    filtered = filter_recipes_by_keyword(recipes, RecipeKeyword.CHICKEN_LIVERS)
+    assert filtered.index.tolist() == recipes.index[scan_rows(recipes, RecipeKeyword.CHICKEN_LIVERS)].tolist()
+    assert filter_recipes_by_keyword(recipes, "missing").empty
+
+def test_query_combines_keyword_rows():
+    recipes = sample_recipes()
+    result = search_recipes_by_keywords(recipes, all_of=["chicken"], any_of=["livers", "toast"], none_of=["salad"])
+    expected = [
+        row for row in range(len(recipes))
+        if row in scan_rows(recipes, "chicken")
+        and (row in scan_rows(recipes, "livers") or row in scan_rows(recipes, "toast"))
+        and row not in scan_rows(recipes, "salad")
+    ]
+    assert result.index.tolist() == recipes.index[expected].tolist()
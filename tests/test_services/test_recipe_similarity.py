@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# Kısmi en iyi k seçiminin eşitlik sırasını ve çok tohumlu benzerlik sorgularını doğrular
+
+import sys
+import os
+
+# Proje kök dizinini Python path'ine ekle
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, project_root)
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.models.recipe_similarity import RecipeSimilarityIndex, en_iyi_k, tfidf_indeksi_olustur
+from script import diet_list_make
+
+MALZEMELER = [
+    "chicken garlic onion",
+    "chicken garlic onion",
+    "chicken rice",
+    "beef onion carrot",
+    "garlic butter bread",
+    "rice beans corn",
+    "apple sugar flour",
+    "chicken garlic",
+    "beef carrot potato",
+    "sugar butter flour",
+]
+
+@pytest.fixture(scope="module")
+def indeks(tmp_path_factory):
+    dizin = tmp_path_factory.mktemp("tfidf")
+    return RecipeSimilarityIndex(tfidf_indeksi_olustur(str(dizin / "recipes.csv"), MALZEMELER, str(dizin / "index")))
+
+def kaba_kuvvet(indeks, tohumlar, n, birlestirme):
+    """Yoğun matrisle tüm katalog üzerinde birleşik skor; eşitlikte küçük satır önce"""
+    matris = indeks.matris.toarray().astype(np.float64)
+    benzerlik = matris[sorted(set(tohumlar))] @ matris.T
+    birlesik = {"mean": benzerlik.mean(axis=0), "sum": benzerlik.sum(axis=0), "max": benzerlik.max(axis=0)}[birlestirme]
+    adaylar = [i for i in range(len(matris)) if i not in tohumlar and birlesik[i] > 0]
+    adaylar.sort(key=lambda i: (-round(birlesik[i], 5), i))
+    return adaylar[:n], birlesik[adaylar[:n]]
+
+def test_en_iyi_k_esit_skorlarda_kucuk_konum_once():
+    skorlar = np.array([1.0, 3.0, 3.0, 2.0, 3.0])
+    assert en_iyi_k(skorlar, 2).tolist() == [1, 2]
+    assert en_iyi_k(skorlar, 4).tolist() == [1, 2, 4, 3]
+    assert en_iyi_k(skorlar, 10).tolist() == [1, 2, 4, 3, 0]
+    assert en_iyi_k(skorlar, 0).tolist() == []
+
+def test_en_iyi_k_esitlik_anahtarina_gore_siralar():
+    skorlar = np.array([1.0, 3.0, 3.0, 2.0, 3.0])
+    anahtar = np.array([0, 50, 40, 0, 30])
+    assert en_iyi_k(skorlar, 3, anahtar).tolist() == [4, 2, 1]
+
+def test_en_iyi_k_tam_siralamayla_ayni():
+    rng = np.random.default_rng(3)
+    # Az sayıda farklı değer: çok sayıda eşitlik
+    skorlar = rng.integers(0, 20, size=1000).astype(np.float32)
+    anahtar = rng.permutation(1000)
+    for k in (1, 7, 50, 999, 1000):
+        beklenen = np.lexsort((anahtar, -skorlar))[:k]
+        assert en_iyi_k(skorlar, k, anahtar).tolist() == beklenen.tolist()
+
+def test_tek_tarif_benzerleri_kendisini_icermez(indeks):
+    satirlar, skorlar = indeks.benzerler(0, 3)
+    # Aynı malzemeli tarif 1 tam benzerlikle ilk sırada
+    assert satirlar.tolist()[0] == 1
+    assert skorlar[0] == pytest.approx(1.0, abs=1e-5)
+    assert 0 not in satirlar.tolist()
+
+@pytest.mark.parametrize("birlestirme", ["mean", "sum", "max"])
+def test_cok_tohumlu_benzerler_tohumlari_dislar(indeks, birlestirme):
+    tohumlar = [0, 3, 3]
+    satirlar, skorlar = indeks.cok_tohumlu_benzerler(tohumlar, 5, birlestirme)
+    beklenen_satirlar, beklenen_skorlar = kaba_kuvvet(indeks, tohumlar, 5, birlestirme)
+    assert not set(satirlar.tolist()) & set(tohumlar)
+    assert satirlar.tolist() == beklenen_satirlar
+    assert np.allclose(skorlar, beklenen_skorlar, atol=1e-5)
+    assert np.all(np.diff(skorlar) <= 1e-6)
+
+def test_ortak_malzemesi_olmayanlar_aday_olmaz(indeks):
+    satirlar, _ = indeks.cok_tohumlu_benzerler([6], 20)
+    # "apple sugar flour" yalnızca "sugar butter flour" ile malzeme paylaşır
+    assert satirlar.tolist() == [9]
+
+def test_bilinmeyen_birlestirme_reddedilir(indeks):
+    with pytest.raises(ValueError):
+        indeks.cok_tohumlu_benzerler([0, 1], 3, "median")
+
+def test_az_benzer_tarif_varsa_oneri_n_e_tamamlanir(indeks, monkeypatch):
+    tarifler = pd.DataFrame({"Name": [f"Tarif {i}" for i in range(len(MALZEMELER))]})
+    monkeypatch.setattr(diet_list_make, "load_similarity_index", lambda: (tarifler, indeks))
+    # Tarif 6'nın ortak malzemeli tek komşusu 9; kalanlar satır sırasıyla eklenir
+    oneriler = diet_list_make.recommend_recipes(6, 4)
+    assert oneriler.index.tolist() == [9, 0, 1, 2]
+    assert len(diet_list_make.recommend_recipes(6, 50)) == len(MALZEMELER) - 1
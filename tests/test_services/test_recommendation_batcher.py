@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# Öneri mikro-partileyicisinin gruplama ve kuyruk (backpressure) davranışını doğrular
+
+import sys
+import os
+
+# Proje kök dizinini Python path'ine ekle
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, project_root)
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.core.exceptions import ServiceUnavailableException
+from app.models.nutrition_model import RecommendationFilter
+from app.services import recommendation_batcher as batcher_modulu
+from app.services.inference_pool import InferencePool
+
+class KayitliHavuz(InferencePool):
+    """Süreç açmadan her partiyi kaydeden havuz; satır i için komşular girdi[0] * 100 + [0, n)"""
+
+    def __init__(self, en_fazla_bekleyen=64, hata=None):
+        super().__init__(surec_sayisi=0, en_fazla_bekleyen=en_fazla_bekleyen)
+        self.partiler = []
+        self.hata = hata
+        self.bekleyen_gozlemleri = []
+
+    async def komsu_indeksleri(self, artifacts, girdiler, n_neighbors, filtre=None):
+        self.partiler.append((artifacts, list(girdiler), n_neighbors, filtre))
+        self.bekleyen_gozlemleri.append(self._bekleyen)
+        await asyncio.sleep(0)
+        if self.hata is not None:
+            raise self.hata
+        return [np.arange(n_neighbors) + int(girdi[0]) * 100 for girdi in girdiler]
+
+@pytest.fixture
+def havuz(monkeypatch):
+    havuz = KayitliHavuz()
+    monkeypatch.setattr(batcher_modulu, "inference_pool", havuz)
+    return havuz
+
+def test_surum_ve_filtreye_gore_gruplar(havuz):
+    a, b = object(), object()
+    dusuk_kalori = RecommendationFilter(kalori_max=300)
+
+    async def calistir():
+        batcher = batcher_modulu.RecommendationBatcher(pencere_ms=20, en_buyuk_parti=64)
+        return await asyncio.gather(
+            batcher.komsular(a, [1], 3),
+            batcher.komsular(a, [2], 5),
+            batcher.komsular(b, [3], 2),
+            batcher.komsular(a, [4], 2, dusuk_kalori),
+            # Koşulsuz filtre filtresiz sorguyla aynı partiye girer
+            batcher.komsular(a, [5], 1, RecommendationFilter()),
+        ), batcher
+
+    sonuclar, batcher = asyncio.run(calistir())
+
+    assert [s.tolist() for s in sonuclar] == [
+        [100, 101, 102], [200, 201, 202, 203, 204], [300, 301], [400, 401], [500]
+    ]
+    gruplar = {(id(artifacts), filtre is not None): (girdiler, n) for artifacts, girdiler, n, filtre in havuz.partiler}
+    assert gruplar == {
+        (id(a), False): ([[1], [2], [5]], 5),
+        (id(a), True): ([[4]], 2),
+        (id(b), False): ([[3]], 2),
+    }
+    assert batcher.istatistikler()["batches"] == 3
+    assert batcher.istatistikler()["queries"] == 5
+
+def test_en_buyuk_partiye_ulasinca_pencere_beklenmez(havuz):
+    async def calistir():
+        batcher = batcher_modulu.RecommendationBatcher(pencere_ms=60_000, en_buyuk_parti=3)
+        return await asyncio.wait_for(
+            asyncio.gather(*(batcher.komsular("v1", [i], 1) for i in range(3))), timeout=5
+        )
+
+    sonuclar = asyncio.run(calistir())
+    assert [s.tolist() for s in sonuclar] == [[0], [100], [200]]
+    assert len(havuz.partiler) == 1
+
+def test_kuyruk_dolunca_reddeder_ve_parti_bitince_yer_acar(monkeypatch):
+    havuz = KayitliHavuz(en_fazla_bekleyen=2)
+    monkeypatch.setattr(batcher_modulu, "inference_pool", havuz)
+
+    async def calistir():
+        batcher = batcher_modulu.RecommendationBatcher(pencere_ms=20, en_buyuk_parti=64)
+        ilk = [asyncio.ensure_future(batcher.komsular("v1", [i], 1)) for i in range(2)]
+        await asyncio.sleep(0)
+        # İki sorgu kuyruktayken üçüncüsü partiye alınmadan reddedilir
+        with pytest.raises(ServiceUnavailableException):
+            await batcher.komsular("v1", [9], 1)
+        await asyncio.gather(*ilk)
+        # Parti tamamlanınca yer açılır
+        return await batcher.komsular("v1", [3], 1)
+
+    assert asyncio.run(calistir()).tolist() == [300]
+    assert havuz.reddedilen == 1
+    assert havuz.bekleyen_gozlemleri == [2, 1]
+    assert havuz._bekleyen == 0
+
+def test_hata_tum_partiye_iletilir_ve_yer_birakilir(monkeypatch):
+    havuz = KayitliHavuz(en_fazla_bekleyen=4, hata=RuntimeError("model hatası"))
+    monkeypatch.setattr(batcher_modulu, "inference_pool", havuz)
+
+    async def calistir():
+        batcher = batcher_modulu.RecommendationBatcher(pencere_ms=5, en_buyuk_parti=64)
+        return await asyncio.gather(*(batcher.komsular("v1", [i], 1) for i in range(3)), return_exceptions=True)
+
+    sonuclar = asyncio.run(calistir())
+    assert all(isinstance(sonuc, RuntimeError) for sonuc in sonuclar)
+    assert havuz._bekleyen == 0
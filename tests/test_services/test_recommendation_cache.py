@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# Öneri önbelleğinin girdi yuvarlamasını (anahtar kovaları) ve sürüm temizliğini doğrular
+
+import sys
+import os
+
+# Proje kök dizinini Python path'ine ekle
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, project_root)
+
+import numpy as np
+
+from app.services.recommendation_cache import RecommendationCache, adimlari_coz
+
+def test_adimlar_virgulle_ayrilmis_metinden_okunur():
+    assert adimlari_coz("10, 1,0.5,") == (10.0, 1.0, 0.5)
+
+def test_ayni_kovadaki_girdiler_ayni_anahtari_alir():
+    onbellek = RecommendationCache(adimlar=(10, 1, 0))
+    assert onbellek.yuvarla([504, 12.4, 3.14159]) == (500.0, 12.0, 3.14159)
+    assert onbellek.yuvarla([496, 11.6, 3.14159]) == onbellek.yuvarla([504, 12.4, 3.14159])
+    assert onbellek.yuvarla([506, 12.4, 3.14159]) == (510.0, 12.0, 3.14159)
+    # Adımı 0 olan değer yuvarlanmaz; -0.0 ile 0.0 aynı anahtara düşer
+    assert onbellek.yuvarla([-0.4, -0.4, 1.0]) == onbellek.yuvarla([0.4, 0.4, 1.0])
+    # Boyut uyuşmazsa girdi yuvarlanmadan kullanılır
+    assert onbellek.yuvarla([1.26, 2.5]) == (1.26, 2.5)
+
+def test_anahtar_surum_komsu_sayisi_ve_filtreyi_ayirir():
+    onbellek = RecommendationCache(adimlar=(10,))
+    yuvarlanmis = onbellek.yuvarla([504])
+    anahtar = onbellek.anahtar("v1", yuvarlanmis, 5, None)
+    onbellek.al(anahtar)
+    onbellek.koy(anahtar, [3, 1, 2])
+    assert onbellek.al(onbellek.anahtar("v1", onbellek.yuvarla([498]), 5, None)).tolist() == [3, 1, 2]
+    assert onbellek.al(onbellek.anahtar("v1", yuvarlanmis, 6, None)) is None
+    assert onbellek.al(onbellek.anahtar("v1", yuvarlanmis, 5, '{"ogun": "lunch"}')) is None
+    assert onbellek.al(onbellek.anahtar("v2", yuvarlanmis, 5, None)) is None
+    istatistik = onbellek.istatistikler()
+    assert (istatistik["hits"], istatistik["misses"]) == (1, 4)
+
+def test_saklanan_indeksler_salt_okunur_kopyadir():
+    onbellek = RecommendationCache(adimlar=(1,))
+    anahtar = onbellek.anahtar("v1", (1.0,), 2, None)
+    onbellek.al(anahtar)
+    indeksler = np.array([4, 5])
+    onbellek.koy(anahtar, indeksler)
+    indeksler[0] = 99
+    sonuc = onbellek.al(anahtar)
+    assert sonuc.tolist() == [4, 5]
+    assert not sonuc.flags.writeable
+
+def test_son_gorulen_surumlerin_disina_dusen_surum_silinir():
+    onbellek = RecommendationCache(adimlar=(1,), en_fazla_surum=2)
+    for surum in ("v1", "v2"):
+        anahtar = onbellek.anahtar(surum, (1.0,), 1, None)
+        onbellek.al(anahtar)
+        onbellek.koy(anahtar, [0])
+    # v1 yeniden görülünce en eski sürüm v2 olur
+    onbellek.al(onbellek.anahtar("v1", (2.0,), 1, None))
+    onbellek.al(onbellek.anahtar("v3", (1.0,), 1, None))
+
+    assert onbellek.al(onbellek.anahtar("v1", (1.0,), 1, None)).tolist() == [0]
+    assert onbellek.istatistikler()["version_invalidations"] == 1
+    assert [anahtar[0] for anahtar in onbellek._onbellek.keys()] == ["v1"]
+
+def test_devreden_cikan_surumun_sonucu_yazilmaz():
+    onbellek = RecommendationCache(adimlar=(1,), en_fazla_surum=1)
+    eski = onbellek.anahtar("v1", (1.0,), 1, None)
+    onbellek.al(eski)
+    # Arama sürerken yeni sürüm hizmete girer
+    onbellek.al(onbellek.anahtar("v2", (1.0,), 1, None))
+    onbellek.koy(eski, [7])
+    assert len(onbellek._onbellek) == 0
+
+def test_boyut_sifirsa_onbellek_kapali():
+    onbellek = RecommendationCache(boyut=0, adimlar=(1,))
+    anahtar = onbellek.anahtar("v1", (1.0,), 1, None)
+    onbellek.koy(anahtar, [1])
+    assert not onbellek.etkin
+    assert onbellek.al(anahtar) is None